@@ -1,15 +1,37 @@
+import time
+
+# Measured from the very top so the rerun budget covers the whole script
+RERUN_STARTED = time.perf_counter()
+
 import streamlit as st
-import numpy as np
-from PIL import Image
-import json
-import requests
-from datetime import datetime, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-import pyttsx3
-from googletrans import Translator
+from datetime import datetime
+import io
+import logging
 import os
-import time
+import queue
+import random
+from concurrent.futures import Future
+from app_data import crop_calendar, crop_database, default_market_data, disease_database, indian_cities, market_base_prices
+from localization import load_bundle
+from translation_cache import TranslationMemory
+from result_cache import ResultCache, make_key
+from charts import CHART_BACKEND, CHART_FORMAT, ChartCache
+from market_cache import SnapshotCache, create_backend
+from symptom_matcher import SymptomMatcher
+from community_store import CommunityStore
+from tts import audio_format, disease_advice
+from audio_pack import load_pack
+
+# Modules that pull in NumPy, PIL, pandas, requests, TensorFlow or pyttsx3 are
+# imported inside the get_* factories below, on first use, and each factory
+# runs once per process (st.cache_resource). The modules imported above are
+# light; they import matplotlib and googletrans themselves only when needed.
+# See perf_budget.py for the measured import and rerun budgets.
+
+logger = logging.getLogger("agrisathi")
+
+# Warn when a rerun takes longer than this
+RERUN_BUDGET_MS = float(os.environ.get("AGRISATHI_RERUN_BUDGET_MS", "1000"))
 
 # Set page configuration
 st.set_page_config(
@@ -95,688 +117,409 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# UI Translation
-ui_text = {
-    "en": {
-        "title": "AgriSathi - Smart Crop Advisory",
-        "welcome": "Welcome to your digital farming assistant",
-        "disease_detection": "Disease Detection",
-        "crop_advisory": "Crop Advisory",
-        "market_prices": "Market Prices",
-        "weather_info": "Weather Info",
-        "soil_health": "Soil Health",
-        "select_city": "Select your district/city",
-        "select_language": "Select Language",
-        "select_crop": "Select your crop",
-        "take_picture": "Take Picture of Plant",
-        "upload_image": "Or upload image",
-        "analyze": "Analyze Plant Health",
-        "prediction_result": "Detection Result",
-        "advice": "Recommended Action",
-        "prevention": "Prevention Tips",
-        "weather_forecast": "Weather Forecast",
-        "soil_tips": "Soil Health Tips",
-        "market_trends": "Price Trends",
-        "submit_feedback": "Submit Feedback",
-        "feedback_placeholder": "Share your experience or suggestions...",
-        "voice_output": "Listen to Advice",
-        "soil_type": "Soil Type",
-        "best_season": "Best Season",
-        "water_needs": "Water Needs",
-        "ph_level": "Optimal pH Level",
-        "common_pests": "Common Pests",
-        "expert_help": "Connect with Expert",
-        "alert": "Important Alert",
-        "rain_alert": "Heavy rain expected in next 3 days. Harvest mature crops immediately.",
-        "temp_alert": "High temperature warning. Water plants in early morning or late evening.",
-        "wind_alert": "Strong winds expected. Secure loose structures and protect young plants.",
-        "phone_label": "Phone Number",
-        "question_label": "Your Question",
-        "submit_question": "Submit Question",
-        "thank_you": "Thank you! An expert will contact you within 24 hours.",
-        "real_time_data": "Real-time Data",
-        "last_updated": "Last updated",
-        "refresh_data": "Refresh Data",
-        "expert_advice": "Expert Advice",
-        "community_forum": "Community Forum",
-        "gov_schemes": "Government Schemes",
-        "weather_warnings": "Weather Warnings",
-        "market_analysis": "Market Analysis",
-        "crop_calendar": "Crop Calendar"
-    },
-    "hi": {
-        "title": "AgriSathi - स्मार्ट फसल सलाह",
-        "welcome": "आपके डिजिटल फार्मिंग सहायक में आपका स्वागत है",
-        "disease_detection": "रोग पहचान",
-        "crop_advisory": "फसल सलाह",
-        "market_prices": "बाजार मूल्य",
-        "weather_info": "मौसम जानकारी",
-        "soil_health": "मृदा स्वास्थ्य",
-        "select_city": "अपना जिला/शहर चुनें",
-        "select_language": "भाषा चुनें",
-        "select_crop": "अपनी फसल चुनें",
-        "take_picture": "पौधे की तस्वीर लें",
-        "upload_image": "या छवि अपलोड करें",
-        "analyze": "पौधे का स्वास्थ्य जांचें",
-        "prediction_result": "परिणाम",
-        "advice": "सुझाव",
-        "prevention": "रोकथाम के उपाय",
-        "weather_forecast": "मौसम पूर्वानुमान",
-        "soil_tips": "मृदा स्वास्थ्य सुझाव",
-        "market_trends": "मूल्य रुझान",
-        "submit_feedback": "प्रतिक्रिया भेजें",
-        "feedback_placeholder": "अपना अनुभव या सुझाव साझा करें...",
-        "voice_output": "सलाह सुनें",
-        "soil_type": "मिट्टी का प्रकार",
-        "best_season": "उपयुक्त मौसम",
-        "water_needs": "पानी की आवश्यकता",
-        "ph_level": "उपयुक्त pH स्तर",
-        "common_pests": "सामान्य कीट",
-        "expert_help": "विशेषज्ञ से संपर्क करें",
-        "alert": "महत्वपूर्ण चेतावनी",
-        "rain_alert": "अगले 3 दिनों में भारी बारिश की संभावना। पके हुए फसलों की तुरंत कटाई करें।",
-        "temp_alert": "उच्च तापमान चेतावनी। पौधों को सुबह जल्दी या शाम को पानी दें।",
-        "wind_alert": "तेज हवाओं की संभावना। ढीली संरचनाओं को सुरक्षित करें और युवा पौधों की रक्षा करें।",
-        "phone_label": "फोन नंबर",
-        "question_label": "आपका प्रश्न",
-        "submit_question": "प्रश्न भेजें",
-        "thank_you": "धन्यवाद! एक विशेषज्ञ 24 घंटे के भीतर आपसे संपर्क करेगा।",
-        "real_time_data": "रीयल-टाइम डेटा",
-        "last_updated": "अंतिम अपडेट",
-        "refresh_data": "डेटा रिफ्रेश करें",
-        "expert_advice": "विशेषज्ञ सलाह",
-        "community_forum": "कम्युनिटी फोरम",
-        "gov_schemes": "सरकारी योजनाएं",
-        "weather_warnings": "मौसम चेतावनी",
-        "market_analysis": "बाजार विश्लेषण",
-        "crop_calendar": "फसल कैलेंडर"
-    },
-    "pa": {
-        "title": "AgriSathi - ਸਮਾਰਟ ਫਸਲ ਸਲਾਹ",
-        "welcome": "ਤੁਹਾਡੇ ਡਿਜੀਟਲ ਖੇਤੀ ਸहਾਇਕ ਵਿੱਚ ਸਵਾਗਤ ਹੈ",
-        "disease_detection": "ਰੋਗ ਪਛਾਣ",
-        "crop_advisory": "ਫਸਲ ਸलਾਹ",
-        "market_prices": "ਬਾਜ਼ਾਰ ਮੁੱਲ",
-        "weather_info": "ਮੌਸਮ ਜਾਣਕਾਰੀ",
-        "soil_health": "ਮਿੱਟੀ ਦਾ ਸਿਹਤ",
-        "select_city": "ਆਪਣਾ ਜ਼ਿਲ੍ਹਾ/ਸ਼ਹਿਰ ਚੁਣੋ",
-        "select_language": "ਭਾਸ਼ਾ ਚੁਣੋ",
-        "select_crop": "ਆਪਣੀ ਫਸल ਚੁਣੋ",
-        "take_picture": "ਪੌਦੇ ਦੀ ਤਸਵੀਰ ਲਓ",
-        "upload_image": "ਜਾਂ ਚਿੱਤਰ ਅੱਪਲੋਡ ਕਰੋ",
-        "analyze": "ਪੌਦੇ ਦੀ ਸਿਹਤ ਦੀ ਜਾਂਚ ਕਰੋ",
-        "prediction_result": "ਨਤੀਜਾ",
-        "advice": "ਸਿਫਾਰਸ਼",
-        "prevention": "ਰੋਕਥਾਮ ਦੇ ਉਪਾਅ",
-        "weather_forecast": "ਮੌਸਮ ਦਾ ਪੂਰਵਾਨੁਮਾਨ",
-        "soil_tips": "ਮਿੱਟੀ ਦੀ ਸਿਹਤ ਲਈ ਸਲਾਹ",
-        "market_trends": "ਕੀਮਤ ਰੁਝਾਨ",
-        "submit_feedback": "ਪ੍ਰਤਿਕਿਰਿਆ ਦਿਓ",
-        "feedback_placeholder": "ਆਪਣਾ ਤਜਰਬਾ ਜਾਂ ਸੁਝਾਅ ਸਾਂਝਾ ਕਰੋ...",
-        "voice_output": "ਸलਾਹ ਸੁਣੋ",
-        "soil_type": "ਮਿੱਟੀ ਦੀ ਕਿਸਮ",
-        "best_season": "ਵਧੀਆ ਮੌਸਮ",
-        "water_needs": "ਪਾਣੀ ਦੀ ਲੋੜ",
-        "ph_level": "ਵਧੀਆ pH ਪੱਧਰ",
-        "common_pests": "ਆਮ ਕੀੜੇ",
-        "expert_help": "ਮਾਹਿਰ ਨਾਲ ਜੁੜੋ",
-        "alert": "ਮਹੱਤਵਪੂਰਨ ਚੇਤਾਵਨੀ",
-        "rain_alert": "ਅਗਲੇ 3 ਦਿਨਾਂ ਵਿੱਚ ਭਾਰੀ ਬਾਰਸ਼ ਦੀ ਸੰਭਾਵਨਾ। ਪੱਕੇ ਹੋਏ ਫਸਲਾਂ ਦੀ ਤੁਰੰਤ ਕਟਾਈ ਕਰੋ।",
-        "temp_alert": "ਉੱਚ ਤਾਪਮਾਨ ਚੇਤਾਵਨੀ। ਪੌਦਿਆਂ ਨੂੰ ਸਵੇਰੇ ਜਲਦੀ ਜਾਂ ਸ਼ਾਮ ਨੂੰ ਪਾਣੀ ਦਿਓ।",
-        "wind_alert": "ਤੇਜ਼ ਹਵਾਵਾਂ ਦੀ ਉਮੀਦ ਹੈ। ਢਿੱਲੀਆਂ structureਾਂ ਨੂੰ ਸੁਰੱਖਿਅਤ ਕਰੋ ਅਤੇ ਨੌਜਵਾਨ ਪੌਦਿਆਂ ਦੀ ਰੱਖਿਆ ਕਰੋ।",
-        "phone_label": "ਫੋਨ ਨੰਬਰ",
-        "question_label": "ਤੁਹਾਡਾ ਸਵਾਲ",
-        "submit_question": "ਸਵਾਲ ਦਾਖਲ ਕਰੋ",
-        "thank_you": "ਧੰਨਵਾਦ! ਇੱਕ ਮਾਹਿਰ 24 ਘੰਟੇ ਦੇ ਅੰਦਰ ਤੁਹਾਡੇ ਨਾਲ ਸੰਪਰਕ ਕਰੇਗਾ।",
-        "real_time_data": "ਰੀਅਲ-ਟਾਈਮ ਡੇਟਾ",
-        "last_updated": "ਆਖਰੀ ਅੱਪਡੇਟ",
-        "refresh_data": "ਡੇਟਾ ਤਾਜ਼ਾ ਕਰੋ",
-        "expert_advice": "ਮਾਹਿਰ ਸਲਾਹ",
-        "community_forum": "ਕਮਿਊਨਿਟੀ ਫੋਰਮ",
-        "gov_schemes": "ਸਰਕਾਰੀ ਸਕੀਮਾਂ",
-        "weather_warnings": "ਮੌਸਮ ਚੇਤਾਵਨੀ",
-        "market_analysis": "ਮਾਰਕੀਟ ਵਿਸ਼ਲੇਸ਼ਣ",
-        "crop_calendar": "ਫਸਲ ਕੈਲੰਡਰ"
-    }
-}
-
-# Initialize translator
-translator = Translator()
+# Text-to-speech worker pool and clip cache, shared by all sessions
+@st.cache_resource
+def get_speech_service():
+    from tts import SpeechService
+    
+    return SpeechService()
 
-# Initialize text-to-speech engine
-try:
-    tts_engine = pyttsx3.init()
-    tts_available = True
-except:
-    tts_available = False
+# Translation memory shared by all sessions; the translator only sees unseen strings
+@st.cache_resource
+def get_translation_memory():
+    return TranslationMemory()
 
 # Function to translate text
 def translate_text(text, dest_lang):
-    try:
-        if dest_lang == "en":
-            return text
-        translated = translator.translate(text, dest=dest_lang)
-        return translated.text
-    except:
+    if dest_lang == "en":
         return text
+    return get_translation_memory().translate(text, dest_lang)
+
+# Function to translate a list of texts with at most one translator call
+def translate_texts(texts, dest_lang):
+    if dest_lang == "en":
+        return texts
+    return get_translation_memory().translate_many(texts, dest_lang)
+
+# Localized strings for one language, mmapped from the prebuilt bundle once per process
+@st.cache_resource
+def get_locale(lang_code):
+    # Without a current `python localization.py build`, the bundle is compiled
+    # in memory and the tip/scheme lists go through the translation memory
+    return load_bundle(lang_code, translate=translate_texts)
 
-# Function to speak text
+# Prebuilt clips (python audio_pack.py build); None when no pack has been built
+@st.cache_resource
+def get_audio_pack():
+    return load_pack()
+
+# Function to speak text: returns a Future of the audio clip, synthesized off the request thread
 def speak_text(text, lang):
-    if not tts_available:
-        return
-        
-    try:
-        # Set voice properties based on language
-        if lang == "hi":
-            # Try to set Hindi voice if available
-            voices = tts_engine.getProperty('voices')
-            for voice in voices:
-                if "hindi" in voice.name.lower() or "india" in voice.name.lower():
-                    tts_engine.setProperty('voice', voice.id)
-                    break
-        elif lang == "pa":
-            # Try to set Punjabi voice if available
-            voices = tts_engine.getProperty('voices')
-            for voice in voices:
-                if "punjabi" in voice.name.lower() or "india" in voice.name.lower():
-                    tts_engine.setProperty('voice', voice.id)
-                    break
-        
-        tts_engine.say(text)
-        tts_engine.runAndWait()
-    except Exception as e:
-        st.sidebar.warning("Voice output not available")
+    pack = get_audio_pack()
+    clip = pack.get(text, lang) if pack is not None else None
+    if clip is not None:
+        ready = Future()
+        ready.set_result(clip)
+        return ready
+    return get_speech_service().synthesize(text, lang)
 
-# Weather API Integration
-def get_weather_data(city_name):
+# Micro-batching knobs for the shared inference queue
+MAX_BATCH_SIZE = int(os.environ.get("AGRISATHI_MAX_BATCH_SIZE", "16"))
+MAX_WAIT_MS = float(os.environ.get("AGRISATHI_MAX_WAIT_MS", "10"))
+
+# Out-of-process inference (inference_pool.py); 0 runs the model on a thread of this process instead
+INFERENCE_WORKERS = int(os.environ.get("AGRISATHI_INFERENCE_WORKERS", "1"))
+INFERENCE_SLOTS = int(os.environ.get("AGRISATHI_INFERENCE_SLOTS", "64"))
+INFERENCE_DEADLINE = float(os.environ.get("AGRISATHI_INFERENCE_DEADLINE", "30"))
+INFERENCE_MAX_REQUESTS = int(os.environ.get("AGRISATHI_INFERENCE_MAX_REQUESTS", "0"))
+MODEL_LOAD_TIMEOUT = 600
+
+# Leaves cropped out of a whole-plant photo and classified separately; 0 classifies the whole frame
+MAX_LEAVES = int(os.environ.get("AGRISATHI_MAX_LEAVES", "6"))
+
+def load_classifier(name, spec):
     """
-    Fetch weather data from OpenWeatherMap API
-    Note: You need to sign up for a free API key at https://openweathermap.org/
+    Load and warm up one model version for the registry, returning the
+    (model, preprocessor, inference queue, leaf tiler) that analyze_image takes.
     """
-    # Replace with your actual API key
-    API_KEY = "YOUR_OPENWEATHERMAP_API_KEY"
+    from leaf_segmentation import LeafTiler
+    from preprocessing import ImagePreprocessor
+    
+    if INFERENCE_WORKERS:
+        from inference_pool import InferencePool
+        
+        pool = InferencePool(
+            workers=INFERENCE_WORKERS,
+            slots=INFERENCE_SLOTS,
+            max_batch_size=MAX_BATCH_SIZE,
+            deadline=INFERENCE_DEADLINE,
+            max_requests=INFERENCE_MAX_REQUESTS,
+            model_path=spec["model"],
+            classes_path=spec["classes"],
+            backend=spec["backend"]
+        ).start()
+        try:
+            pool.wait_ready(MODEL_LOAD_TIMEOUT)
+        except Exception:
+            pool.shutdown()
+            raise
+        # The pool stands in for both the model (labels, version) and the queue
+        preprocessor = ImagePreprocessor(pool.input_shape, max_batch_size=MAX_BATCH_SIZE)
+        return pool, preprocessor, pool, LeafTiler(pool.input_shape, max_leaves=MAX_LEAVES)
+    
+    from disease_model import DiseaseModel
+    from inference_queue import BatchingQueue
     
-    if API_KEY == "YOUR_OPENWEATHERMAP_API_KEY":
-        # Return mock data if no API key is provided
-        return get_mock_weather_data(city_name)
+    model = DiseaseModel(spec["model"], spec["classes"], backend=spec["backend"])
+    model.warmup()
+    preprocessor = ImagePreprocessor(model.input_shape, max_batch_size=MAX_BATCH_SIZE)
+    inference_queue = BatchingQueue(
+        model.predict,
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=MAX_WAIT_MS,
+        collate_fn=preprocessor.collate
+    ).start()
+    return model, preprocessor, inference_queue, LeafTiler(model.input_shape, max_leaves=MAX_LEAVES)
+
+def close_classifier(classifier):
+    """Release a model version the registry has swapped out"""
+    inference_queue = classifier[2]
+    if INFERENCE_WORKERS:
+        inference_queue.shutdown()
+    else:
+        inference_queue.stop()
+
+MODEL_POLL_SECONDS = float(os.environ.get("AGRISATHI_MODEL_POLL_SECONDS", "10"))
+
+# Disease detection models, shared by every session of this server process
+@st.cache_resource
+def get_model_registry():
+    """Model versions from models.json (see model_registry.py), loading in the background from the first call"""
+    from model_registry import ModelRegistry
     
+    return ModelRegistry(
+        load_classifier,
+        close_classifier,
+        poll_seconds=MODEL_POLL_SECONDS,
+        drain_seconds=2 * INFERENCE_DEADLINE
+    ).start()
+
+def get_classifier():
+    """(version name, classifier) for this session's share of model traffic, or None if no model is available"""
+    if "model_bucket" not in st.session_state:
+        # Drawn once, so a session keeps its model version while the traffic split is unchanged
+        st.session_state.model_bucket = random.random()
     try:
-        # First, get the coordinates for the city
-        geo_url = f"http://api.openweathermap.org/geo/1.0/direct?q={city_name},IN&limit=1&appid={API_KEY}"
-        geo_response = requests.get(geo_url).json()
-        
-        if not geo_response:
-            return get_mock_weather_data(city_name)
-            
-        lat = geo_response[0]['lat']
-        lon = geo_response[0]['lon']
-        
-        # Then, get the weather data
-        weather_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={API_KEY}&units=metric"
-        weather_response = requests.get(weather_url).json()
-        
-        if 'list' not in weather_response:
-            return get_mock_weather_data(city_name)
-            
-        # Process the weather data
-        current_weather = weather_response['list'][0]
-        forecast_data = []
-        
-        # Get one forecast per day for the next 5 days
-        for i in range(0, min(40, len(weather_response['list'])), 8):
-            forecast = weather_response['list'][i]
-            forecast_data.append({
-                'day': datetime.fromtimestamp(forecast['dt']).strftime('%a'),
-                'temp': round(forecast['main']['temp']),
-                'humidity': forecast['main']['humidity'],
-                'rain_chance': forecast.get('pop', 0) * 100,  # Probability of precipitation
-                'description': forecast['weather'][0]['description'],
-                'wind_speed': forecast['wind']['speed'],
-                'icon': forecast['weather'][0]['icon']
-            })
-        
-        return {
-            'city': city_name,
-            'current_temp': round(current_weather['main']['temp']),
-            'current_humidity': current_weather['main']['humidity'],
-            'current_description': current_weather['weather'][0]['description'],
-            'current_wind': current_weather['wind']['speed'],
-            'current_icon': current_weather['weather'][0]['icon'],
-            'forecast': forecast_data,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
+        return get_model_registry().select(st.session_state.model_bucket, timeout=INFERENCE_DEADLINE)
     except Exception as e:
-        st.error(f"Error fetching weather data: {e}")
-        return get_mock_weather_data(city_name)
+        st.sidebar.warning(f"Disease detection model not available: {e}")
+        return None
 
-def get_mock_weather_data(city_name):
-    """Generate mock weather data for demonstration purposes"""
-    # Different weather patterns based on city
-    if city_name.lower() in ["chennai", "madras"]:
-        base_temp = 32
-        rain_chance = 60
-        wind_speed = 12
-    elif city_name.lower() in ["mumbai", "bombay"]:
-        base_temp = 30
-        rain_chance = 70
-        wind_speed = 15
-    elif city_name.lower() in ["delhi", "new delhi"]:
-        base_temp = 28
-        rain_chance = 20
-        wind_speed = 10
-    elif city_name.lower() in ["bangalore", "bengaluru"]:
-        base_temp = 26
-        rain_chance = 40
-        wind_speed = 8
-    elif city_name.lower() in ["jorethang", "gangtok", "darjeeling"]:
-        base_temp = 20
-        rain_chance = 80
-        wind_speed = 18
-    else:
-        base_temp = 28
-        rain_chance = 50
-        wind_speed = 10
+# Budget for the shared prediction cache
+RESULT_CACHE_MB = int(os.environ.get("AGRISATHI_RESULT_CACHE_MB", "64"))
+RESULT_CACHE_TTL = int(os.environ.get("AGRISATHI_RESULT_CACHE_TTL", "3600"))
+
+@st.cache_resource
+def get_result_cache():
+    """Process-wide LRU of predictions keyed by image hash + model version"""
+    return ResultCache(max_bytes=RESULT_CACHE_MB * 1024 * 1024, ttl_seconds=RESULT_CACHE_TTL)
+
+# Capture size requested from the farmer's camera: the browser downscales before uploading
+CAMERA_RESOLUTION = os.environ.get("AGRISATHI_CAMERA_RESOLUTION", "480p")
+INGEST_QUALITY = int(os.environ.get("AGRISATHI_INGEST_QUALITY", "85"))
+# Frames are kept at this multiple of the model input so single leaves can still be tiled at full resolution
+INGEST_SCALE = int(os.environ.get("AGRISATHI_INGEST_SCALE", "3"))
+
+def ingest_image(raw_bytes, preprocessor):
+    """
+    Compact JPEG (INGEST_SCALE x model resolution) of an uploaded file or camera frame,
+    so tiling, the preview and the result cache only ever handle a few kilobytes.
+    """
+    return preprocessor.compress(io.BytesIO(raw_bytes), quality=INGEST_QUALITY, scale=INGEST_SCALE)
+
+def analyze_image(raw_bytes, classifier, cache, record=None):
+    """
+    Run disease detection on the bytes of an uploaded file or camera frame.
+    Every leaf found in the frame is classified as its own tile and the
+    per-leaf predictions are combined. The cache is keyed by the raw bytes,
+    so a repeated image is served without ingesting, decoding or inference;
+    otherwise record(latency seconds, top confidence) is called for the
+    model version's stats.
+    """
+    model, preprocessor, inference_queue, tiler = classifier
+    # Everything that shapes the result besides the image itself
+    key = make_key(raw_bytes, f"{model.version}:ingest-{INGEST_SCALE}x-q{INGEST_QUALITY}:leaves-{tiler.max_leaves}")
+    result = cache.get(key)
+    if result is not None:
+        return result
     
-    # Generate forecast data
-    days = ["Today", "Mon", "Tue", "Wed", "Thu"]
-    forecast_data = []
+    import numpy as np
+    from disease_model import has_real_labels
+    from leaf_segmentation import aggregate
     
-    for i, day in enumerate(days):
-        temp_variation = np.random.randint(-3, 4)
-        rain_variation = np.random.randint(-20, 21)
-        wind_variation = np.random.randint(-5, 6)
-        
-        forecast_data.append({
-            'day': day,
-            'temp': base_temp + temp_variation,
-            'humidity': 60 + np.random.randint(-15, 16),
-            'rain_chance': max(0, min(100, rain_chance + rain_variation)),
-            'wind_speed': max(0, wind_speed + wind_variation),
-            'description': 'Partly cloudy',
-            'icon': '02d' if rain_chance < 50 else '10d'
-        })
+    started = time.perf_counter()
+    image_bytes = ingest_image(raw_bytes, preprocessor)
+    pixels = np.asarray(preprocessor.decode(io.BytesIO(image_bytes), scale=INGEST_SCALE))
+    tiles, boxes, weights = tiler.tiles(pixels)
     
-    return {
-        'city': city_name,
-        'current_temp': forecast_data[0]['temp'],
-        'current_humidity': forecast_data[0]['humidity'],
-        'current_description': forecast_data[0]['description'],
-        'current_wind': forecast_data[0]['wind_speed'],
-        'current_icon': '02d',
-        'forecast': forecast_data,
-        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Submitted together, so the queue runs the tiles (and other sessions' images) as one batch
+    futures = [inference_queue.submit(tile) for tile in tiles]
+    probs = np.stack([future.result(INFERENCE_DEADLINE) for future in futures])
+    result = {
+        "predictions": model.top_k(aggregate(probs, weights), k=3)[0],
+        "leaves": [leaf[0] for leaf in model.top_k(probs, k=1)] if len(tiles) > 1 else [],
+        # The ingested frame is already a small JPEG; with several leaves, show which is which
+        "preview": tiler.annotate(pixels, boxes) if len(tiles) > 1 else image_bytes,
+        # Without crop/disease names in classes.json no prediction can be matched to advice
+        "labelled": has_real_labels(model.labels)
     }
+    if record is not None:
+        record(time.perf_counter() - started, result["predictions"][0][1])
+    cache.put(key, result)
+    return result
+
+def match_disease(label, crop):
+    """
+    Map a model class label onto a disease_database entry for the selected crop.
+    Labels named "Crop___Disease" (PlantVillage style) only match their own crop.
+    """
+    if crop not in disease_database:
+        return None
+    if "___" in label:
+        label_crop, label = label.split("___", 1)
+        if not label_crop.replace("_", " ").lower().startswith(crop.lower()):
+            return None
+    normalized = label.replace("_", " ").lower()
+    for disease in disease_database[crop]:
+        if disease.lower() in normalized:
+            return disease
+    return None
+
+# Weather API Integration, shared by all sessions
+@st.cache_resource
+def get_weather_service():
+    from weather import WeatherService
+    
+    return WeatherService()
+
+# Keep forecasts for every city in indian_cities warm in the background
+WEATHER_PREFETCH = os.environ.get("AGRISATHI_WEATHER_PREFETCH", "1") == "1"
+
+@st.cache_resource
+def get_weather_refresher():
+    from weather import ForecastRefresher
+    
+    return ForecastRefresher(get_weather_service(), indian_cities).start()
+
+def get_weather_data(city_name):
+    """
+    Fetch weather data from OpenWeatherMap API (see weather.py)
+    Forecasts are cached per city for the provider's 3-hour step
+    """
+    return get_weather_service().get(city_name)
+
+# Rendered charts, shared by every session that sees the same data snapshot
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache()
+
+def show_chart(chart):
+    if CHART_BACKEND == "plotly":
+        st.plotly_chart(chart, width="stretch")
+    elif CHART_FORMAT == "svg":
+        st.image(chart.decode("utf-8"), width="stretch")
+    else:
+        st.image(chart, width="stretch")
+
+# Historical prices (see market_store.py for ingestion)
+MARKET_HISTORY_DAYS = int(os.environ.get("AGRISATHI_MARKET_HISTORY_DAYS", "365"))
+
+@st.cache_resource
+def get_market_store():
+    from market_store import MarketStore
+    
+    return MarketStore()
+
+# Mock market feed; analytics are kept per process by the trend tracker
+@st.cache_resource
+def get_trend_tracker():
+    from market_analytics import TrendTracker
+    
+    tracker = TrendTracker(list(market_base_prices))
+    # Seed with the base prices so the first fetch already has a trend
+    tracker.update_all(list(market_base_prices.values()))
+    return tracker
 
 # Market Price API Integration
-def get_market_prices():
+def fetch_market_prices():
     """
     Fetch real-time market prices from API
     In a real implementation, this would connect to a market data API
     """
+    # This is a placeholder for actual API integration
+    # For demo purposes, we'll use mock data that changes slightly each time
+    import numpy as np
+    
+    tracker = get_trend_tracker()
+    
+    # Simulate small price fluctuations for every crop at once
+    base_prices = np.array(list(market_base_prices.values()), dtype=np.float64)
+    price_change = np.random.uniform(-2, 2, size=len(base_prices))
+    new_prices = np.maximum(5, base_prices + price_change)
+    
+    # Trend, moving averages and volatility are updated incrementally per tick
+    tracker.update_all(new_prices)
+    return {
+        "data": tracker.snapshot(),
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+# One market snapshot per AGRISATHI_MARKET_TTL seconds, shared by all sessions
+# (and by all replicas when AGRISATHI_REDIS_URL points at a Redis-compatible server)
+@st.cache_resource
+def get_market_cache():
+    return SnapshotCache(fetch_market_prices, backend=create_backend())
+
+def get_market_prices():
+    """Current market snapshot; only fetched from the API when it is stale"""
     try:
-        # This is a placeholder for actual API integration
-        # For demo purposes, we'll use mock data that changes slightly each time
-        
-        crops = ["Rice", "Wheat", "Tomato", "Potato", "Maize", "Sugarcane"]
-        base_prices = [40, 30, 25, 20, 22, 15]
-        
-        market_data = []
-        for i, crop in enumerate(crops):
-            # Simulate small price fluctuations
-            price_change = np.random.uniform(-2, 2)
-            new_price = max(5, base_prices[i] + price_change)
-            
-            # Determine trend
-            if price_change > 0.5:
-                trend = "↑"
-                trend_class = "market-up"
-            elif price_change < -0.5:
-                trend = "↓"
-                trend_class = "market-down"
-            else:
-                trend = "→"
-                trend_class = "market-same"
-                
-            market_data.append({
-                "Crop": crop,
-                "Price (₹/kg)": round(new_price, 1),
-                "Trend": trend,
-                "TrendClass": trend_class
-            })
-            
-        return {
-            "data": market_data,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        return get_market_cache().get()
         
     except Exception as e:
         st.error(f"Error fetching market data: {e}")
         # Return default data if API fails
         return {
-            "data": [
-                {"Crop": "Rice", "Price (₹/kg)": 40, "Trend": "→", "TrendClass": "market-same"},
-                {"Crop": "Wheat", "Price (₹/kg)": 30, "Trend": "→", "TrendClass": "market-same"},
-                {"Crop": "Tomato", "Price (₹/kg)": 25, "Trend": "→", "TrendClass": "market-same"},
-                {"Crop": "Potato", "Price (₹/kg)": 20, "Trend": "→", "TrendClass": "market-same"},
-                {"Crop": "Maize", "Price (₹/kg)": 22, "Trend": "→", "TrendClass": "market-same"},
-                {"Crop": "Sugarcane", "Price (₹/kg)": 15, "Trend": "→", "TrendClass": "market-same"}
-            ],
+            "data": default_market_data,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-# Crop database with information for multiple crops
-crop_database = {
-    "Rice": {
-        "soil_type": "Clayey loam",
-        "season": "Kharif (June-October)",
-        "water_requirements": "High",
-        "ph_range": "5.0-6.5",
-        "common_pests": "Stem borer, Brown plant hopper",
-        "hi": {
-            "soil_type": "चिकनी दोमट मिट्टी",
-            "season": "खरीफ (जून-अक्टूबर)",
-            "water_requirements": "उच्च",
-            "ph_range": "5.0-6.5",
-            "common_pests": "तना छेदक, भूरा प्लांट हॉपर"
-        },
-        "pa": {
-            "soil_type": "ਚਿਕੀ ਦੋਮਟ ਮਿੱਟੀ",
-            "season": "ਖਰੀਫ (ਜੂਨ-ਅਕਤੂਬਰ)",
-            "water_requirements": "ਉੱਚ",
-            "ph_range": "5.0-6.5",
-            "common_pests": "ਤਣਾ ਬੋरर, ਬ੍ਰਾਊਨ ਪਲਾਂਟ ਹੌਪਰ"
-        }
-    },
-    "Wheat": {
-        "soil_type": "Well-drained loamy soil",
-        "season": "Rabi (November-April)",
-        "water_requirements": "Medium",
-        "ph_range": "6.0-7.5",
-        "common_pests": "Aphids, Armyworm",
-        "hi": {
-            "soil_type": "अच्छी जल निकासी वाली दोमट मिट्टी",
-            "season": "रबी (नवंबर-अप्रैल)",
-            "water_requirements": "मध्यम",
-            "ph_range": "6.0-7.5",
-            "common_pests": "एफिड्स, आर्मीवर्म"
-        },
-        "pa": {
-            "soil_type": "ਚੰਗੀ ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਦੋਮਟ ਮਿੱਟੀ",
-            "season": "ਰਬੀ (ਨਵੰਬर-ਅਪ੍ਰੈਲ)",
-            "water_requirements": "ਦਰਮਿਆਨਾ",
-            "ph_range": "6.0-7.5",
-            "common_pests": "ਐਫਿਡ, ਆਰਮੀਵਰਮ"
-        }
-    },
-    "Tomato": {
-        "soil_type": "Well-drained sandy loam",
-        "season": "Year-round with irrigation",
-        "water_requirements": "Medium",
-        "ph_range": "6.0-6.8",
-        "common_pests": "Whiteflies, Tomato fruit borer",
-        "hi": {
-            "soil_type": "अच्छी जल निकासी वाली बलुई दोमट मिट्टी",
-            "season": "सिंचाई के साथ साल भर",
-            "water_requirements": "मध्यम",
-            "ph_range": "6.0-6.8",
-            "common_pests": "व्हाइटफ्लाइज़, टमाटर फल बोरर"
-        },
-        "pa": {
-            "soil_type": "ਚੰਗी ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਰੇਤਲੀ ਦੋमਟ ਮਿੱਟੀ",
-            "season": "ਸਿੰਜਾਈ ਨਾਲ ਸਾਲ ਭਰ",
-            "water_requirements": "ਦਰਮਿਆਨਾ",
-            "ph_range": "6.0-6.8",
-            "common_pests": "ਵ੍ਹਾਈਟਫਲਾਈਜ਼, ਟਮਾਟਰ ਫਲ ਬੋरਰ"
-        }
-    },
-    "Potato": {
-        "soil_type": "Well-drained sandy loam",
-        "season": "Rabi (October-March)",
-        "water_requirements": "Medium",
-        "ph_range": "5.0-6.5",
-        "common_pests": "Colorado potato beetle, Aphids",
-        "hi": {
-            "soil_type": "अच्छी जल निकासी वाली बलुई दोमट मिट्टी",
-            "season": "रबी (अक्टूबर-मार्च)",
-            "water_requirements": "मध्यम",
-            "ph_range": "5.0-6.5",
-            "common_pests": "कोलोराडो आलू बीटल, एफिड्स"
-        },
-        "pa": {
-            "soil_type": "ਚੰਗੀ ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਰੇਤਲੀ ਦੋਮਟ ਮਿੱਟੀ",
-            "season": "ਰਬੀ (ਅਕਤੂਬर-ਮਾਰਚ)",
-            "water_requirements": "ਦਰਮਿਆਨਾ",
-            "ph_range": "5.0-6.5",
-            "common_pests": "ਕੋਲੋਰਾਡੋ ਆਲੂ ਬੀਟਲ, ਐਫਿਡ"
-        }
-    },
-    "Maize": {
-        "soil_type": "Well-drained loamy soil",
-        "season": "Kharif (June-September)",
-        "water_requirements": "Medium",
-        "ph_range": "5.5-7.0",
-        "common_pests": "Stem borer, Armyworm",
-        "hi": {
-            "soil_type": "अच्छी जल निकासी वाली दोमट मिट्टी",
-            "season": "खरीफ (जून-सितंबर)",
-            "water_requirements": "मध्यम",
-            "ph_range": "5.5-7.0",
-            "common_pests": "तना छेदक, आर्मीवर्म"
-        },
-        "pa": {
-            "soil_type": "ਚੰਗੀ ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਦੋਮਟ ਮਿੱਟੀ",
-            "season": "ਖਰੀਫ (ਜੂਨ-ਸਤੰਬਰ)",
-            "water_requirements": "ਦਰਮਿਆਨਾ",
-            "ph_range": "5.5-7.0",
-            "common_pests": "ਤਣਾ ਬੋरर, ਆਰਮੀਵਰਮ"
-        }
-    },
-    "Sugarcane": {
-        "soil_type": "Deep rich loamy soil",
-        "season": "Year-round with irrigation",
-        "water_requirements": "High",
-        "ph_range": "6.0-7.5",
-        "common_pests": "Top borer, Scale insects",
-        "hi": {
-            "soil_type": "गहरी उपजाऊ दोमट मिट्टी",
-            "season": "सिंचाई के साथ साल भर",
-            "water_requirements": "उच्च",
-            "ph_range": "6.0-7.5",
-            "common_pests": "टॉप बोरर, स्केल कीट"
-        },
-        "pa": {
-            "soil_type": "ਡੂੰਘੀ ਅਮੀਰ ਦੋਮਟ ਮਿੱਟੀ",
-            "season": "ਸਿੰਜਾਈ ਨਾਲ ਸਾਲ ਭਰ",
-            "water_requirements": "ਉੱਚ",
-            "ph_range": "6.0-7.5",
-            "common_pests": "ਟਾਪ ਬੋਰਰ, ਸਕੇਲ ਕੀੜੇ"
-        }
-    }
-}
+# Questions and forum posts, written by one background writer per process
+FORUM_PAGE_SIZE = 10
 
-# Disease database with information for multiple crops
-disease_database = {
-    "Tomato": {
-        "Early Blight": {
-            "symptoms": "Dark spots with concentric rings on leaves, stems and fruits",
-            "treatment": "Apply chlorothalonil or copper-based fungicides",
-            "prevention": "Rotate crops, remove infected plants, ensure good air circulation",
-            "hi": {
-                "symptoms": "पत्तियों, तनों और फलों पर केंद्रित छल्ले वाले काले धब्बे",
-                "treatment": "क्लोरोथालोनिल या तांबे आधारित कवकनाशी लगाएं",
-                "prevention": "फसलों का रोटेशन, संक्रमित पौधों को हटाना, अच्छा वायु संचार सुनिश्चित करना"
-            },
-            "pa": {
-                "symptoms": "ਪੱਤੀਆਂ, ਡੰਡੀਆਂ ਅਤੇ ਫਲਾਂ 'ਤੇ ਕੇਂਦਰਿਤ ਰਿੰਗਾਂ ਵਾਲੇ ਡਾਰਕ ਧੱਬੇ",
-                "treatment": "ਕਲੋਰੋਥਾਲੋਨਿਲ ਜਾਂ ਤਾਂਬੇ-ਅਧਾਰਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
-                "prevention": "ਫਸਲਾਂ ਦੀ ਘੁੰਮਾਓ, ਸੰਕਰਮਿਤ ਪੌਦਿਆਂ ਨੂੰ ਹਟਾਓ, ਚੰਗੀ ਹਵਾ ਪ੍ਰਣਾਲੀ ਨੂੰ ਯਕੀਨੀ ਬਣਾਓ"
-            }
-        },
-        "Late Blight": {
-            "symptoms": "Water-soaked lesions that turn brown and papery",
-            "treatment": "Apply fungicides containing mancozeb or metalaxyl",
-            "prevention": "Avoid overhead watering, remove volunteer plants",
-            "hi": {
-                "symptoms": "पानी से लथपथ घाव जो भूरे और कागजी हो जाते हैं",
-                "treatment": "मैंकोजेब या मेटालाक्सिल युक्त कवकनाशी लगाएं",
-                "prevention": "ओवरहेड वाटरिंग से बचें, स्वयंसेवक पौधों को हटा दें"
-            },
-            "pa": {
-                "symptoms": "ਪਾਣੀ ਨਾਲ ਭਿੱਜੇ ਘਾਉ ਜੋ ਭੂਰੇ ਅਤੇ ਕਾਗਜ਼ੀ ਹੋ ਜਾਂਦੇ ਹਨ",
-                "treatment": "ਮੈਨਕੋਜ਼ੇਬ ਜਾਂ ਮੈਟਾਲਾਕਸੀਲ ਯੁਕਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
-                "prevention": "ਓਓਵਰਹੈਡ ਵਾਟਰਿੰਗ ਤੋਂ ਬਚੋ, ਰੁੱਖੇ ਪੌਦੇ ਹਟਾਓ"
-            }
-        }
-    },
-    "Potato": {
-        "Late Blight": {
-            "symptoms": "Dark, water-soaked spots on leaves with white mold under wet conditions",
-            "treatment": "Apply fungicides containing chlorothalonil or mancozeb",
-            "prevention": "Plant resistant varieties, avoid overhead irrigation",
-            "hi": {
-                "symptoms": "गीली परिस्थितियों में सफेद मोल्ड के साथ पत्तियों पर काले, पानी से लथपथ धब्बे",
-                "treatment": "क्लोरोथालोनिल या मैंकोजेब युक्त कवकनाशी लगाएं",
-                "prevention": "प्रतिरोधी किस्में लगाएं, ओवरहेड सिंचाई से बचें"
-            },
-            "pa": {
-                "symptoms": "ਗਿੱਲੀ ਹਾਲਤ ਵਿੱਚ ਚਿੱਟੇ ਮੋਲਡ ਨਾਲ ਪੱਤੀਆਂ 'ਤੇ ਡਾਰ크, ਪਾਣੀ ਨਾਲ ਭਿੱਜੇ ਧੱਬੇ",
-                "treatment": "ਕਲੋਰੋਥਾਲੋਨਿਲ ਜਾਂ ਮੈਨਕੋਜ਼ੇਬ ਯੁਕਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
-                "prevention": "ਪ੍ਰਤੀਰੋਧਕ ਕਿਸਮਾਂ ਲਗਾਓ, ਓਵਰਹੈਡ ਸਿੰਜਾਈ ਤੋਂ ਬਚੋ"
-            }
-        }
-    },
-    "Rice": {
-        "Blast": {
-            "symptoms": "Spindle-shaped lesions with gray centers and brown margins",
-            "treatment": "Apply fungicides containing tricyclazole or azoxystrobin",
-            "prevention": "Use resistant varieties, avoid excessive nitrogen fertilization",
-            "hi": {
-                "symptoms": "ग्रे सेंटर और भूरे मार्जिन के साथ स्पिंडल के आकार के घाव",
-                "treatment": "ट्राइसाइक्लाजोल या एज़ोक्सिस्ट्रोबिन युक्त कवकनाशी लगाएं",
-                "prevention": "प्रतिरोधी किस्मों का उपयोग करें, अत्यधिक नाइट्रोजन निषेचन से बचें"
-            },
-            "pa": {
-                "symptoms": "ਸਲੇਟੀ ਸੈਂਟਰ ਅਤੇ ਭੂਰੇ ਮਾਰਜਿਨ ਨਾਲ ਸਪਿੰਡਲ-ਆਕਾਰ ਦੇ ਘਾਉ",
-                "treatment": "ਟ੍ਰਾਈਸਾਈਕਲਾਜ਼ੋਲ ਜਾਂ ਅਜ਼ੋਕਸੀਸਟ੍ਰੋਬਿਨ ਯੁਕਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
-                "prevention": "ਪ੍ਰਤੀਰੋਧਕ ਕਿਸਮਾਂ ਦੀ ਵਰਤੋਂ ਕਰੋ, ਜ਼ਿਆਦਾ ਨਾਈਟ੍ਰੋਜਨ ਖਾਦ ਤੋਂ ਬਚੋ"
-            }
-        }
-    }
-}
+@st.cache_resource
+def get_community_store():
+    return CommunityStore()
 
-# Indian cities with coordinates for weather data
-indian_cities = [
-    "Jorethang", "Gangtok", "Darjeeling", "Kolkata", "Mumbai", "Delhi", "Chennai", 
-    "Bangalore", "Hyderabad", "Pune", "Ahmedabad", "Jaipur", "Lucknow", "Bhopal",
-    "Patna", "Chandigarh", "Dehradun", "Shimla", "Agartala", "Guwahati", "Dispur"
-]
+# Keyword automaton and symptom index, built once per process from disease_database
+@st.cache_resource
+def get_symptom_matcher():
+    return SymptomMatcher()
 
-# Function to process farmer queries
 def process_farmer_query(query, lang_code="en"):
     """
-    A simple rule-based function to process farmer queries.
-    This is a basic example. A real system would use a proper NLP library.
+    Extract intent, crops and symptoms from a farmer's question in one pass
+    and rank the diseases whose symptoms match (see symptom_matcher.py).
     """
-    query_lower = query.lower()
-    
-    # Define keywords for intents and entities
-    keywords = {
-        'crops': ['tomato', 'potato', 'rice', 'wheat', 'maize', 'sugarcane', 'फसल', 'टमाटर', 'आलू', 'गेहूं', 'चावल', 'ਮਕੀ', 'ਗੰਨਾ', 'ਫਸਲ', 'ਟਮਾਟਰ', 'ਆਲੂ'],
-        'symptoms': ['yellow', 'spot', 'wilting', 'hole', ' insect', 'pest', 'पीला', 'धब्बे', 'मुरझाना', 'कीट', 'ਕੀੜਾ', 'ਪੀਲਾ', 'ਧੱਬੇ', 'ਮੁਰਝਾਨਾ'],
-        'intent_question': ['how', 'what', 'why', 'when', 'where', 'कैसे', 'क्या', 'क्यों', 'कब', 'ਕਿਵੇਂ', 'ਕੀ', 'ਕਿਉਂ', 'ਕਦੋਂ'],
-        'intent_problem': ['problem', 'issue', 'wrong', 'help', 'समस्या', 'मदद', 'ਮੁਸ਼ਕਲ', 'ਸਮੱਸਿਆ', 'ਮਦਦ']
-    }
-    
-    # Simple intent classification
-    intent = "unknown"
-    for word in keywords['intent_question']:
-        if word in query_lower:
-            intent = "question"
-            break
-    for word in keywords['intent_problem']:
-        if word in query_lower:
-            intent = "problem"
-            break
-            
-    # Simple entity extraction
-    detected_crops = []
-    for crop in keywords['crops']:
-        if crop in query_lower:
-            detected_crops.append(crop)
-            
-    detected_symptoms = []
-    for symptom in keywords['symptoms']:
-        if symptom in query_lower:
-            detected_symptoms.append(symptom)
-    
-    return {
-        "intent": intent,
-        "crops": detected_crops,
-        "symptoms": detected_symptoms,
-        "original_query": query
-    }
+    return get_symptom_matcher().analyze(query)
 
 # Main app
 def main():
     # Initialize session state for data caching
-    if 'weather_data' not in st.session_state:
-        st.session_state.weather_data = None
-    if 'market_data' not in st.session_state:
-        st.session_state.market_data = None
+    if 'forum_cursors' not in st.session_state:
+        st.session_state.forum_cursors = [None]
     if 'last_refresh' not in st.session_state:
         st.session_state.last_refresh = None
+    if 'disease_result' not in st.session_state:
+        st.session_state.disease_result = None
+    
+    if WEATHER_PREFETCH:
+        get_weather_refresher()
+    # Starts the TTS workers, which resolve each language's voice once; with a
+    # current audio pack they are only started if a clip is ever missing
+    audio_pack = get_audio_pack()
+    if audio_pack is None or not audio_pack.is_current:
+        get_speech_service()
     
     # Language selection at the top
     col1, col2, col3 = st.columns([3, 1, 1])
     with col1:
-        st.markdown(f'<h1 class="main-header">{ui_text["en"]["title"]}</h1>', unsafe_allow_html=True)
-        st.markdown(f'<p style="text-align: center; font-size: 1.2rem;">{ui_text["en"]["welcome"]}</p>', unsafe_allow_html=True)
+        st.markdown(f'<h1 class="main-header">{get_locale("en")["title"]}</h1>', unsafe_allow_html=True)
+        st.markdown(f'<p style="text-align: center; font-size: 1.2rem;">{get_locale("en")["welcome"]}</p>', unsafe_allow_html=True)
     
     with col2:
         st.write("")  # spacer
     
     with col3:
         language = st.selectbox(
-            ui_text["en"]["select_language"],
+            get_locale("en")["select_language"],
             ["English", "Hindi", "Punjabi"],
             key="lang_select"
         )
     
     lang_code = "en" if language == "English" else "hi" if language == "Hindi" else "pa"
+    text = get_locale(lang_code)
     
     # Sidebar with user info
     with st.sidebar:
         st.header("Farmer Information")
         city = st.selectbox(
-            ui_text[lang_code]["select_city"],
+            text["select_city"],
             indian_cities,
             index=indian_cities.index("Jorethang") if "Jorethang" in indian_cities else 0
         )
         
         selected_crop = st.selectbox(
-            ui_text[lang_code]["select_crop"],
+            text["select_crop"],
             list(crop_database.keys())
         )
         
-        # Refresh data button
-        if st.button(ui_text[lang_code]["refresh_data"], use_container_width=True):
-            st.session_state.weather_data = None
-            st.session_state.market_data = None
+        # Refresh data button: shared data is refetched only if it is stale
+        if st.button(text["refresh_data"], use_container_width=True):
             st.session_state.last_refresh = datetime.now()
-            st.rerun()
         
         if st.session_state.last_refresh:
-            st.caption(f"{ui_text[lang_code]['last_updated']}: {st.session_state.last_refresh.strftime('%H:%M:%S')}")
+            st.caption(f"{text['last_updated']}: {st.session_state.last_refresh.strftime('%H:%M:%S')}")
         
         st.markdown("---")
-        st.header(ui_text[lang_code]["expert_help"])
-        phone = st.text_input(ui_text[lang_code]["phone_label"], placeholder="+91XXXXXXXXXX")
-        question = st.text_area(ui_text[lang_code]["question_label"], placeholder=ui_text[lang_code]["feedback_placeholder"])
-        if st.button(ui_text[lang_code]["submit_question"]):
+        st.header(text["expert_help"])
+        phone = st.text_input(text["phone_label"], placeholder="+91XXXXXXXXXX")
+        question = st.text_area(text["question_label"], placeholder=text["feedback_placeholder"])
+        if st.button(text["submit_question"]):
             if phone and question:
                 # Process the query
                 analysis = process_farmer_query(question, lang_code)
+                # Stored by the background writer; this does not wait for the commit
+                get_community_store().add_question(phone, question, lang_code, analysis)
                 
                 # Show the user what we understood
                 st.write("**We understood:**")
@@ -785,172 +528,173 @@ def main():
                 st.write(f"**Symptoms:** {', '.join(analysis['symptoms']) if analysis['symptoms'] else 'None detected'}")
                 
                 # Try to give an automated response if it's a common problem
-                if analysis['crops'] and analysis['symptoms']:
-                    crop = analysis['crops'][0]
-                    if crop in disease_database:
-                        st.info("**Based on your description, this might help:**")
-                        # In a real system, you would match symptoms to diseases here
-                        for disease, info in disease_database[crop].items():
-                            st.write(f"**{disease}**")
-                            if lang_code == "en":
-                                st.write(f"Treatment: {info['treatment']}")
-                            else:
-                                st.write(f"उपचार: {info[lang_code]['treatment']}" if lang_code == 'hi' else f"ਇਲਾਜ: {info[lang_code]['treatment']}")
-                            break # Just show the first one for demo
+                if analysis['diseases']:
+                    st.info("**Based on your description, this might help:**")
+                    for candidate in analysis['diseases'][:3]:
+                        crop, disease = candidate['crop'], candidate['disease']
+                        st.write(f"**{disease}** ({crop})")
+                        st.write(f"{text['symptoms']}: {text.disease(crop, disease, 'symptoms')}")
+                        st.write(f"{text['treatment']}: {text.disease(crop, disease, 'treatment')}")
                 
-                st.success(ui_text[lang_code]["thank_you"])
+                st.success(text["thank_you"])
             else:
                 st.warning("Please provide both phone number and question")
     
     # Main content with tabs
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        ui_text[lang_code]["disease_detection"],
-        ui_text[lang_code]["crop_advisory"],
-        ui_text[lang_code]["market_prices"],
-        ui_text[lang_code]["weather_info"],
-        ui_text[lang_code]["soil_health"],
-        ui_text[lang_code]["expert_advice"]
+        text["disease_detection"],
+        text["crop_advisory"],
+        text["market_prices"],
+        text["weather_info"],
+        text["soil_health"],
+        text["expert_advice"]
     ])
     
     # Tab 1: Disease Detection
     with tab1:
-        st.header(ui_text[lang_code]["disease_detection"])
+        st.header(text["disease_detection"])
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader(ui_text[lang_code]["take_picture"])
-            st.camera_input("", key="camera_input")
+            st.subheader(text["take_picture"])
+            camera_frame = st.camera_input("", key="camera_input", resolution=CAMERA_RESOLUTION)
             
-            st.subheader(ui_text[lang_code]["upload_image"])
+            st.subheader(text["upload_image"])
             uploaded_file = st.file_uploader("", type=["jpg", "jpeg", "png"], label_visibility="collapsed")
             
-            if st.button(ui_text[lang_code]["analyze"], use_container_width=True):
-                if uploaded_file is not None:
-                    # Simulate disease detection
-                    image = Image.open(uploaded_file)
-                    st.image(image, caption="Uploaded Image", use_column_width=True)
-                    
-                    # For demo purposes, randomly select a disease
-                    if selected_crop in disease_database:
-                        diseases = list(disease_database[selected_crop].keys())
-                        detected_disease = np.random.choice(diseases)
-                        
-                        st.subheader(ui_text[lang_code]["prediction_result"])
-                        st.warning(detected_disease)
-                        
-                        st.subheader(ui_text[lang_code]["advice"])
-                        if lang_code == "en":
-                            st.info(disease_database[selected_crop][detected_disease]["treatment"])
-                        else:
-                            st.info(disease_database[selected_crop][detected_disease][lang_code]["treatment"])
-                        
-                        st.subheader(ui_text[lang_code]["prevention"])
-                        if lang_code == "en":
-                            st.info(disease_database[selected_crop][detected_disease]["prevention"])
-                        else:
-                            st.info(disease_database[selected_crop][detected_disease][lang_code]["prevention"])
-                        
-                        # Voice output button
-                        if st.button(ui_text[lang_code]["voice_output"]):
-                            advice_text = f"{selected_crop} disease detected: {detected_disease}. Treatment: {disease_database[selected_crop][detected_disease]['treatment']}. Prevention: {disease_database[selected_crop][detected_disease]['prevention']}"
-                            speak_text(advice_text, lang_code)
+            # A camera frame takes precedence; clearing it falls back to the upload
+            image_source = camera_frame or uploaded_file
+            
+            if st.button(text["analyze"], use_container_width=True):
+                if image_source is not None:
+                    # Loaded once per process; later sessions and reruns get the cached instance
+                    selected = get_classifier()
+                    if selected is None:
+                        st.error("Disease detection model is not loaded")
                     else:
-                        st.info("No diseases known for this crop or healthy plant detected")
+                        model_name, classifier = selected
+                        registry = get_model_registry()
+                        try:
+                            st.session_state.disease_result = analyze_image(
+                                image_source.getvalue(), classifier, get_result_cache(),
+                                record=lambda latency, confidence: registry.record(model_name, latency, confidence)
+                            )
+                        except (queue.Full, TimeoutError, RuntimeError) as e:
+                            # Saturated, timed out, or a worker crashed or failed the request: fail fast
+                            # rather than hold this session's thread, and count it against the version
+                            logger.warning("Disease detection with model %s failed: %s", model_name, e)
+                            registry.record(model_name, error=True)
+                            st.warning(text["analysis_busy"])
                 else:
-                    st.warning("Please upload an image first")
+                    st.warning("Please take a picture or upload an image first")
+            
+            # The result lives in session state so reruns (e.g. the voice button) do not redo the work
+            result = st.session_state.disease_result
+            if image_source is None:
+                st.session_state.disease_result = None
+            elif result is not None:
+                st.image(result["preview"], caption="Uploaded Image", use_column_width=True)
+                
+                predictions = result["predictions"]
+                top_label, top_prob = predictions[0]
+                detected_disease = match_disease(top_label, selected_crop)
+                
+                st.subheader(text["prediction_result"])
+                st.warning(f"{detected_disease or top_label} ({top_prob:.0%})")
+                for label, prob in predictions[1:]:
+                    st.caption(f"{label}: {prob:.0%}")
+                if result["leaves"]:
+                    st.caption(f"{len(result['leaves'])} leaves checked: " + ", ".join(
+                        f"{number}. {label} ({prob:.0%})" for number, (label, prob) in enumerate(result["leaves"], 1)
+                    ))
+                
+                if detected_disease:
+                    st.subheader(text["advice"])
+                    st.info(text.disease(selected_crop, detected_disease, "treatment"))
+                    
+                    st.subheader(text["prevention"])
+                    st.info(text.disease(selected_crop, detected_disease, "prevention"))
+                    
+                    # Start synthesizing the advice now, so the clip is usually ready (or cached) by the time it is asked for
+                    clip = speak_text(disease_advice(text, selected_crop, detected_disease), lang_code)
+                    
+                    # Voice output button
+                    if st.button(text["voice_output"]):
+                        try:
+                            with st.spinner():
+                                audio = clip.result(timeout=30)
+                            st.audio(audio, format=audio_format(audio), autoplay=True)
+                        except Exception:
+                            st.warning("Voice output not available")
+                elif not result.get("labelled", True):
+                    st.warning("classes.json has no crop or disease names for this model, so the prediction "
+                               "cannot be matched to treatment advice. Install the model's label map to enable advice.")
+                else:
+                    st.info("No diseases known for this crop or healthy plant detected")
         
         with col2:
             st.subheader("Common Diseases")
             if selected_crop in disease_database:
-                for disease, info in disease_database[selected_crop].items():
+                for disease in disease_database[selected_crop]:
                     with st.expander(disease):
-                        if lang_code == "en":
-                            st.write("**Symptoms:**", info["symptoms"])
-                            st.write("**Treatment:**", info["treatment"])
-                            st.write("**Prevention:**", info["prevention"])
-                        else:
-                            st.write("**लक्षण:**" if lang_code == "hi" else "**ਲੱਛਣ:**", info[lang_code]["symptoms"])
-                            st.write("**उपचार:**" if lang_code == "hi" else "**ਇਲਾਜ:**", info[lang_code]["treatment"])
-                            st.write("**रोकथाम:**" if lang_code == "hi" else "**ਰੋਕਥਾਮ:**", info[lang_code]["prevention"])
+                        st.write(f"**{text['symptoms']}:**", text.disease(selected_crop, disease, "symptoms"))
+                        st.write(f"**{text['treatment']}:**", text.disease(selected_crop, disease, "treatment"))
+                        st.write(f"**{text['prevention_label']}:**", text.disease(selected_crop, disease, "prevention"))
             else:
                 st.info("No disease information available for this crop")
     
     # Tab 2: Crop Advisory
     with tab2:
-        st.header(ui_text[lang_code]["crop_advisory"])
+        st.header(text["crop_advisory"])
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader(f"{selected_crop} {ui_text[lang_code]['best_season']}")
-            if lang_code == "en":
-                st.info(crop_database[selected_crop]["season"])
-            else:
-                st.info(crop_database[selected_crop][lang_code]["season"])
+            st.subheader(f"{selected_crop} {text['best_season']}")
+            st.info(text.crop(selected_crop, "season"))
             
-            st.subheader(ui_text[lang_code]["soil_type"])
-            if lang_code == "en":
-                st.info(crop_database[selected_crop]["soil_type"])
-            else:
-                st.info(crop_database[selected_crop][lang_code]["soil_type"])
+            st.subheader(text["soil_type"])
+            st.info(text.crop(selected_crop, "soil_type"))
             
-            st.subheader(ui_text[lang_code]["water_needs"])
-            if lang_code == "en":
-                st.info(crop_database[selected_crop]["water_requirements"])
-            else:
-                st.info(crop_database[selected_crop][lang_code]["water_requirements"])
+            st.subheader(text["water_needs"])
+            st.info(text.crop(selected_crop, "water_requirements"))
         
         with col2:
-            st.subheader(ui_text[lang_code]["ph_level"])
-            if lang_code == "en":
-                st.info(crop_database[selected_crop]["ph_range"])
-            else:
-                st.info(crop_database[selected_crop][lang_code]["ph_range"])
+            st.subheader(text["ph_level"])
+            st.info(text.crop(selected_crop, "ph_range"))
             
-            st.subheader(ui_text[lang_code]["common_pests"])
-            if lang_code == "en":
-                st.info(crop_database[selected_crop]["common_pests"])
-            else:
-                st.info(crop_database[selected_crop][lang_code]["common_pests"])
+            st.subheader(text["common_pests"])
+            st.info(text.crop(selected_crop, "common_pests"))
             
             # Fertilizer recommendation
-            st.subheader("Fertilizer Recommendation" if lang_code == "en" else "उर्वरक सिफारिश" if lang_code == "hi" else "ਖਾਦ ਸਿਫਾਰਿਸ਼")
+            st.subheader(text["fertilizer_recommendation"])
             if selected_crop == "Rice":
-                st.info("N:P:K - 100:50:50 kg/ha" if lang_code == "en" else "N:P:K - 100:50:50 kg/हेक्टेयर")
+                st.info(f"N:P:K - 100:50:50 {text['hectare_unit']}")
             elif selected_crop == "Wheat":
-                st.info("N:P:K - 120:60:40 kg/ha" if lang_code == "en" else "N:P:K - 120:60:40 kg/हेक्टेयर")
+                st.info(f"N:P:K - 120:60:40 {text['hectare_unit']}")
             elif selected_crop == "Tomato":
-                st.info("N:P:K - 150:100:100 kg/ha" if lang_code == "en" else "N:P:K - 150:100:100 kg/हेक्टेयर")
+                st.info(f"N:P:K - 150:100:100 {text['hectare_unit']}")
             else:
-                st.info("N:P:K - 100:50:50 kg/ha" if lang_code == "en" else "N:P:K - 100:50:50 kg/हेक्टेयर")
+                st.info(f"N:P:K - 100:50:50 {text['hectare_unit']}")
         
         # Crop calendar
-        st.subheader(ui_text[lang_code]["crop_calendar"])
-        calendar_data = {
-            "Month": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
-            "Activity": ["Planning", "Soil Prep", "Sowing", "Irrigation", "Weeding", "Fertilization", 
-                         "Pest Control", "Harvest", "Post-Harvest", "Marketing", "Rest", "Planning"]
-        }
-        calendar_df = pd.DataFrame(calendar_data)
-        st.dataframe(calendar_df, use_container_width=True)
+        st.subheader(text["crop_calendar"])
+        st.dataframe(crop_calendar, use_container_width=True)
     
     # Tab 3: Market Prices
     with tab3:
-        st.header(ui_text[lang_code]["market_prices"])
+        st.header(text["market_prices"])
         
-        # Get market data (from cache or API)
-        if st.session_state.market_data is None:
-            with st.spinner("Fetching market data..."):
-                st.session_state.market_data = get_market_prices()
-        
-        market_data = st.session_state.market_data
+        # Get market data (from the shared snapshot, or the API when it is stale)
+        with st.spinner("Fetching market data..."):
+            market_data = get_market_prices()
         
         # Display last updated time
-        st.caption(f"{ui_text[lang_code]['last_updated']}: {market_data['timestamp']}")
+        st.caption(f"{text['last_updated']}: {market_data['timestamp']}")
         
         # Display market data
-        st.subheader(ui_text[lang_code]["real_time_data"])
+        st.subheader(text["real_time_data"])
         
         # Create a formatted table with colored trends
         for item in market_data["data"]:
@@ -964,26 +708,22 @@ def main():
             st.progress(min(100, int(item['Price (₹/kg)'] * 2)))
         
         # Price trends chart
-        st.subheader(ui_text[lang_code]["market_trends"])
-        fig, ax = plt.subplots(figsize=(10, 5))
-        crops = [item['Crop'] for item in market_data["data"]]
-        prices = [item['Price (₹/kg)'] for item in market_data["data"]]
-        colors = ['#4caf50' if '↑' in item['Trend'] else '#f44336' if '↓' in item['Trend'] else '#ff9800' for item in market_data["data"]]
-        
-        bars = ax.bar(crops, prices, color=colors)
-        ax.set_ylabel('Price (₹/kg)')
-        plt.xticks(rotation=45)
+        st.subheader(text["market_trends"])
+        show_chart(get_chart_cache().market_chart(market_data))
         
-        # Add value labels on bars
-        for bar, price in zip(bars, prices):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                    f'₹{price}', ha='center', va='bottom')
+        # Daily price history from the market store, once price feeds have been ingested
+        import numpy as np
+        import pandas as pd
         
-        st.pyplot(fig)
+        history_days, history_prices = get_market_store().daily_mean(
+            selected_crop, start=np.datetime64("today") - MARKET_HISTORY_DAYS
+        )
+        if len(history_days):
+            st.subheader(f"{selected_crop} - {text['market_trends']}")
+            st.line_chart(pd.DataFrame({"Price (₹/kg)": history_prices}, index=history_days))
         
         # Market analysis
-        st.subheader(ui_text[lang_code]["market_analysis"])
+        st.subheader(text["market_analysis"])
         st.info("""
         Current market trends show increasing prices for vegetables due to seasonal demand. 
         Grain prices are stable with slight fluctuations. Consider diversifying your crops 
@@ -992,33 +732,35 @@ def main():
     
     # Tab 4: Weather Info
     with tab4:
-        st.header(ui_text[lang_code]["weather_info"])
+        st.header(text["weather_info"])
         
-        # Get weather data (from cache or API)
-        if st.session_state.weather_data is None or st.session_state.weather_data['city'] != city:
+        # Forecasts are kept warm by the background refresher, so this is normally a memory read;
+        # an entry past its TTL (e.g. a mock forecast after a failed fetch) is fetched again
+        weather_service = get_weather_service()
+        weather_data = weather_service.cached(city, expired=False) if WEATHER_PREFETCH else None
+        if weather_data is None:
             with st.spinner("Fetching weather data..."):
-                st.session_state.weather_data = get_weather_data(city)
+                weather_data = get_weather_data(city)
         
-        weather_data = st.session_state.weather_data
-        
-        # Display last updated time
-        st.caption(f"{ui_text[lang_code]['last_updated']}: {weather_data['timestamp']}")
+        # Display last updated time and how stale the forecast is
+        age = weather_service.age(city) or 0
+        st.caption(f"{text['last_updated']}: {weather_data['timestamp']} ({int(age // 60)} min ago)")
         
         # Weather alerts - show different alerts based on weather conditions
         alert_message = None
         alert_class = "weather-alert"
         
         if weather_data['forecast'][0]['rain_chance'] > 70:
-            alert_message = ui_text[lang_code]["rain_alert"]
+            alert_message = text["rain_alert"]
             alert_class = "urgent-alert"
         elif weather_data['current_temp'] > 35:
-            alert_message = ui_text[lang_code]["temp_alert"]
+            alert_message = text["temp_alert"]
         elif weather_data['current_wind'] > 15:
-            alert_message = ui_text[lang_code]["wind_alert"]
+            alert_message = text["wind_alert"]
         
         if alert_message:
             st.markdown(f'<div class="{alert_class}">', unsafe_allow_html=True)
-            st.subheader(ui_text[lang_code]["alert"])
+            st.subheader(text["alert"])
             st.write(alert_message)
             st.markdown('</div>', unsafe_allow_html=True)
         
@@ -1026,7 +768,7 @@ def main():
         
         with col1:
             # Current weather
-            st.subheader(f"{ui_text[lang_code]['weather_forecast']} - {weather_data['city']}")
+            st.subheader(f"{text['weather_forecast']} - {weather_data['city']}")
             
             # Display current weather metrics
             col1a, col1b = st.columns(2)
@@ -1043,9 +785,11 @@ def main():
     
         with col2:
             # 5-day forecast
-            st.subheader("5-Day Forecast" if lang_code == "en" else "5-दिन का पूर्वानुमान" if lang_code == "hi" else "5-ਦਿਨ ਦਾ ਪੂਰਵਾਨੁਮਾਨ")
+            st.subheader(text["five_day_forecast"])
             
             # Create forecast dataframe
+            import pandas as pd
+            
             forecast_df = pd.DataFrame(weather_data['forecast'])
             
             # Display as a table
@@ -1060,31 +804,11 @@ def main():
             )
         
         # Weather chart
-        st.subheader("Detailed Forecast" if lang_code == "en" else "विस्तृत पूर्वानुमान" if lang_code == "hi" else "ਵਿਸਤ੍ਰਿਤ ਪੂਰਵਾਨੁਮਾਨ")
-        fig, ax = plt.subplots(figsize=(10, 5))
-        
-        days = [f['day'] for f in weather_data['forecast']]
-        temps = [f['temp'] for f in weather_data['forecast']]
-        rain = [f['rain_chance'] for f in weather_data['forecast']]
-        
-        ax.plot(days, temps, marker='o', label='Temperature (°C)', linewidth=2.5)
-        ax.set_ylabel('Temperature (°C)', color='red')
-        ax.tick_params(axis='y', labelcolor='red')
-        
-        ax2 = ax.twinx()
-        ax2.bar(days, rain, alpha=0.3, color='blue', label='Rain Chance (%)')
-        ax2.set_ylabel('Rain Chance (%)', color='blue')
-        ax2.tick_params(axis='y', labelcolor='blue')
-        ax2.set_ylim(0, 100)
-        
-        ax.set_title('5-Day Weather Forecast')
-        ax.legend(loc='upper left')
-        ax2.legend(loc='upper right')
-        
-        st.pyplot(fig)
+        st.subheader(text["detailed_forecast"])
+        show_chart(get_chart_cache().weather_chart(weather_data))
         
         # Weather warnings
-        st.subheader(ui_text[lang_code]["weather_warnings"])
+        st.subheader(text["weather_warnings"])
         if weather_data['forecast'][0]['rain_chance'] > 60:
             st.warning("Heavy rainfall expected. Consider delaying outdoor activities and protect crops from waterlogging.")
         if weather_data['current_temp'] > 33:
@@ -1094,33 +818,23 @@ def main():
     
     # Tab 5: Soil Health
     with tab5:
-        st.header(ui_text[lang_code]["soil_health"])
+        st.header(text["soil_health"])
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader(ui_text[lang_code]["soil_tips"])
-            tips = [
-                "Test soil every season for nutrient levels",
-                "Add organic compost to improve soil structure",
-                "Practice crop rotation to maintain soil health",
-                "Use cover crops to prevent erosion",
-                "Maintain proper pH levels for your crops"
-            ]
-            
-            if lang_code != "en":
-                tips = [translate_text(tip, lang_code) for tip in tips]
-                
-            for tip in tips:
+            st.subheader(text["soil_tips"])
+            # Pre-translated in the locale bundle
+            for tip in text.list("soil_tips"):
                 st.write(f"• {tip}")
             
             # Soil testing information
-            st.subheader("Soil Testing" if lang_code == "en" else "मृदा परीक्षण" if lang_code == "hi" else "ਮਿੱਟੀ ਟੈਸਟਿੰਗ")
+            st.subheader(text["soil_testing"])
             st.info("Contact your local agricultural office for soil testing services. Regular soil testing helps determine the right fertilizer composition for your farm.")
         
         with col2:
             # Soil health metrics
-            st.subheader("Your Soil Health" if lang_code == "en" else "आपका मृदा स्वास्थ्य" if lang_code == "hi" else "ਤੁਹਾਡਾ ਮਿੱਟੀ ਦਾ ਸਿਹਤ")
+            st.subheader(text["your_soil_health"])
             
             # pH level
             st.metric("pH Level", "6.2", "0.3")
@@ -1153,66 +867,72 @@ def main():
     
     # Tab 6: Expert Advice and Community
     with tab6:
-        st.header(ui_text[lang_code]["expert_advice"])
+        st.header(text["expert_advice"])
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Agricultural Tips")
-            tips = [
-                "Rotate crops to prevent soil depletion",
-                "Use organic fertilizers for sustainable farming",
-                "Implement drip irrigation to conserve water",
-                "Monitor plants regularly for early pest detection",
-                "Consider intercropping to maximize land use"
-            ]
-            
-            if lang_code != "en":
-                tips = [translate_text(tip, lang_code) for tip in tips]
-                
-            for tip in tips:
+            for tip in text.list("farming_tips"):
                 st.write(f"• {tip}")
             
             # Government schemes
-            st.subheader(ui_text[lang_code]["gov_schemes"])
-            schemes = [
-                "PM-KISAN: ₹6,000/year financial support",
-                "Soil Health Card Scheme: Free soil testing",
-                "National Mission on Sustainable Agriculture",
-                "Pradhan Mantri Fasal Bima Yojana: Crop insurance"
-            ]
-            
-            if lang_code != "en":
-                schemes = [translate_text(scheme, lang_code) for scheme in schemes]
-                
-            for scheme in schemes:
+            st.subheader(text["gov_schemes"])
+            for scheme in text.list("government_schemes"):
                 st.write(f"• {scheme}")
         
         with col2:
-            st.subheader(ui_text[lang_code]["community_forum"])
-            
-            # Sample forum posts
-            posts = [
-                {"user": "Raju Kumar", "text": "Has anyone tried the new organic pesticide? Results?"},
-                {"user": "Priya Singh", "text": "Looking for advice on tomato cultivation in rainy season"},
-                {"user": "Amandeep Singh", "text": "Sharing my success with drip irrigation - 30% water saved!"},
-                {"user": "Vikram Patel", "text": "Best time to harvest wheat in North India?"}
-            ]
-            
-            for post in posts:
-                with st.expander(f"{post['user']}: {post['text']}"):
-                    st.write("**Comments:**")
-                    st.write("- Great question! I've had good results with...")
-                    st.write("- In my experience, the best time is...")
-                    st.write("- Thanks for sharing this information!")
+            st.subheader(text["community_forum"])
             
             # Add new post
             new_post = st.text_input("Add your question or comment:")
+            pending_post = None
             if st.button("Post"):
                 if new_post:
+                    analysis = process_farmer_query(new_post, lang_code)
+                    pending_post = {
+                        "user": f"Farmer, {city}",
+                        "text": new_post,
+                        "lang": lang_code,
+                        "crop": analysis["crops"][0] if analysis["crops"] else None,
+                        "intent": analysis["intent"]
+                    }
+                    future = get_community_store().add_post(**pending_post)
+                    st.session_state.forum_cursors = [None]
+                    if future.done():
+                        pending_post = None
                     st.success("Your post has been added to the community forum!")
                 else:
                     st.warning("Please enter some text for your post.")
+            
+            # Forum posts, one indexed page at a time (newest first)
+            cursors = st.session_state.forum_cursors
+            posts, next_cursor = get_community_store().list_posts(limit=FORUM_PAGE_SIZE, before=cursors[-1])
+            if pending_post is not None:
+                # Not committed by the background writer yet; show it anyway
+                posts.insert(0, pending_post)
+            
+            for post in posts:
+                with st.expander(f"{post['user']}: {post['text']}"):
+                    posted = datetime.fromtimestamp(post.get("created_at", time.time())).strftime("%Y-%m-%d %H:%M")
+                    st.caption(f"{posted} · {post['crop']}" if post["crop"] else posted)
+            
+            col_newer, col_older = st.columns(2)
+            with col_newer:
+                if len(cursors) > 1 and st.button("← Newer posts"):
+                    cursors.pop()
+                    st.rerun()
+            with col_older:
+                if next_cursor is not None and st.button("Older posts →"):
+                    cursors.append(next_cursor)
+                    st.rerun()
+    
+    # Load the model once the page has been drawn, so the first paint does not wait for TensorFlow
+    get_model_registry()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    rerun_ms = (time.perf_counter() - RERUN_STARTED) * 1000
+    if rerun_ms > RERUN_BUDGET_MS:
+        # Expected once per process, when the first run loads the model
+        logger.warning("Rerun took %.0f ms, over the %.0f ms budget", rerun_ms, RERUN_BUDGET_MS)
\ No newline at end of file
@@ -0,0 +1,444 @@
+"""
+Static text and reference tables for AgriSathi.
+
+Everything a farmer reads on screen lives here in English, Hindi and Punjabi:
+the UI strings, the crop and disease databases and the advisory lists shown
+in the Soil Health and Expert Advice tabs. localization.py compiles these
+tables into per-language bundles. The untranslated tables at the end (cities,
+crop calendar, market defaults) are used as they are.
+"""
+
+# UI Translation
+ui_text = {
+    "en": {
+        "title": "AgriSathi - Smart Crop Advisory",
+        "welcome": "Welcome to your digital farming assistant",
+        "disease_detection": "Disease Detection",
+        "crop_advisory": "Crop Advisory",
+        "market_prices": "Market Prices",
+        "weather_info": "Weather Info",
+        "soil_health": "Soil Health",
+        "select_city": "Select your district/city",
+        "select_language": "Select Language",
+        "select_crop": "Select your crop",
+        "take_picture": "Take Picture of Plant",
+        "upload_image": "Or upload image",
+        "analyze": "Analyze Plant Health",
+        "prediction_result": "Detection Result",
+        "analysis_busy": "Many farmers are checking images right now. Please try again in a minute.",
+        "advice": "Recommended Action",
+        "prevention": "Prevention Tips",
+        "weather_forecast": "Weather Forecast",
+        "soil_tips": "Soil Health Tips",
+        "market_trends": "Price Trends",
+        "submit_feedback": "Submit Feedback",
+        "feedback_placeholder": "Share your experience or suggestions...",
+        "voice_output": "Listen to Advice",
+        "soil_type": "Soil Type",
+        "best_season": "Best Season",
+        "water_needs": "Water Needs",
+        "ph_level": "Optimal pH Level",
+        "common_pests": "Common Pests",
+        "expert_help": "Connect with Expert",
+        "alert": "Important Alert",
+        "rain_alert": "Heavy rain expected in next 3 days. Harvest mature crops immediately.",
+        "temp_alert": "High temperature warning. Water plants in early morning or late evening.",
+        "wind_alert": "Strong winds expected. Secure loose structures and protect young plants.",
+        "phone_label": "Phone Number",
+        "question_label": "Your Question",
+        "submit_question": "Submit Question",
+        "thank_you": "Thank you! An expert will contact you within 24 hours.",
+        "real_time_data": "Real-time Data",
+        "last_updated": "Last updated",
+        "refresh_data": "Refresh Data",
+        "expert_advice": "Expert Advice",
+        "community_forum": "Community Forum",
+        "gov_schemes": "Government Schemes",
+        "weather_warnings": "Weather Warnings",
+        "market_analysis": "Market Analysis",
+        "crop_calendar": "Crop Calendar",
+        "fertilizer_recommendation": "Fertilizer Recommendation",
+        "hectare_unit": "kg/ha",
+        "symptoms": "Symptoms",
+        "treatment": "Treatment",
+        "prevention_label": "Prevention",
+        "five_day_forecast": "5-Day Forecast",
+        "detailed_forecast": "Detailed Forecast",
+        "soil_testing": "Soil Testing",
+        "your_soil_health": "Your Soil Health"
+    },
+    "hi": {
+        "title": "AgriSathi - स्मार्ट फसल सलाह",
+        "welcome": "आपके डिजिटल फार्मिंग सहायक में आपका स्वागत है",
+        "disease_detection": "रोग पहचान",
+        "crop_advisory": "फसल सलाह",
+        "market_prices": "बाजार मूल्य",
+        "weather_info": "मौसम जानकारी",
+        "soil_health": "मृदा स्वास्थ्य",
+        "select_city": "अपना जिला/शहर चुनें",
+        "select_language": "भाषा चुनें",
+        "select_crop": "अपनी फसल चुनें",
+        "take_picture": "पौधे की तस्वीर लें",
+        "upload_image": "या छवि अपलोड करें",
+        "analyze": "पौधे का स्वास्थ्य जांचें",
+        "prediction_result": "परिणाम",
+        "analysis_busy": "अभी कई किसान तस्वीरें जांच रहे हैं। कृपया एक मिनट बाद फिर से प्रयास करें।",
+        "advice": "सुझाव",
+        "prevention": "रोकथाम के उपाय",
+        "weather_forecast": "मौसम पूर्वानुमान",
+        "soil_tips": "मृदा स्वास्थ्य सुझाव",
+        "market_trends": "मूल्य रुझान",
+        "submit_feedback": "प्रतिक्रिया भेजें",
+        "feedback_placeholder": "अपना अनुभव या सुझाव साझा करें...",
+        "voice_output": "सलाह सुनें",
+        "soil_type": "मिट्टी का प्रकार",
+        "best_season": "उपयुक्त मौसम",
+        "water_needs": "पानी की आवश्यकता",
+        "ph_level": "उपयुक्त pH स्तर",
+        "common_pests": "सामान्य कीट",
+        "expert_help": "विशेषज्ञ से संपर्क करें",
+        "alert": "महत्वपूर्ण चेतावनी",
+        "rain_alert": "अगले 3 दिनों में भारी बारिश की संभावना। पके हुए फसलों की तुरंत कटाई करें।",
+        "temp_alert": "उच्च तापमान चेतावनी। पौधों को सुबह जल्दी या शाम को पानी दें।",
+        "wind_alert": "तेज हवाओं की संभावना। ढीली संरचनाओं को सुरक्षित करें और युवा पौधों की रक्षा करें।",
+        "phone_label": "फोन नंबर",
+        "question_label": "आपका प्रश्न",
+        "submit_question": "प्रश्न भेजें",
+        "thank_you": "धन्यवाद! एक विशेषज्ञ 24 घंटे के भीतर आपसे संपर्क करेगा।",
+        "real_time_data": "रीयल-टाइम डेटा",
+        "last_updated": "अंतिम अपडेट",
+        "refresh_data": "डेटा रिफ्रेश करें",
+        "expert_advice": "विशेषज्ञ सलाह",
+        "community_forum": "कम्युनिटी फोरम",
+        "gov_schemes": "सरकारी योजनाएं",
+        "weather_warnings": "मौसम चेतावनी",
+        "market_analysis": "बाजार विश्लेषण",
+        "crop_calendar": "फसल कैलेंडर",
+        "fertilizer_recommendation": "उर्वरक सिफारिश",
+        "hectare_unit": "kg/हेक्टेयर",
+        "symptoms": "लक्षण",
+        "treatment": "उपचार",
+        "prevention_label": "रोकथाम",
+        "five_day_forecast": "5-दिन का पूर्वानुमान",
+        "detailed_forecast": "विस्तृत पूर्वानुमान",
+        "soil_testing": "मृदा परीक्षण",
+        "your_soil_health": "आपका मृदा स्वास्थ्य"
+    },
+    "pa": {
+        "title": "AgriSathi - ਸਮਾਰਟ ਫਸਲ ਸਲਾਹ",
+        "welcome": "ਤੁਹਾਡੇ ਡਿਜੀਟਲ ਖੇਤੀ ਸहਾਇਕ ਵਿੱਚ ਸਵਾਗਤ ਹੈ",
+        "disease_detection": "ਰੋਗ ਪਛਾਣ",
+        "crop_advisory": "ਫਸਲ ਸलਾਹ",
+        "market_prices": "ਬਾਜ਼ਾਰ ਮੁੱਲ",
+        "weather_info": "ਮੌਸਮ ਜਾਣਕਾਰੀ",
+        "soil_health": "ਮਿੱਟੀ ਦਾ ਸਿਹਤ",
+        "select_city": "ਆਪਣਾ ਜ਼ਿਲ੍ਹਾ/ਸ਼ਹਿਰ ਚੁਣੋ",
+        "select_language": "ਭਾਸ਼ਾ ਚੁਣੋ",
+        "select_crop": "ਆਪਣੀ ਫਸल ਚੁਣੋ",
+        "take_picture": "ਪੌਦੇ ਦੀ ਤਸਵੀਰ ਲਓ",
+        "upload_image": "ਜਾਂ ਚਿੱਤਰ ਅੱਪਲੋਡ ਕਰੋ",
+        "analyze": "ਪੌਦੇ ਦੀ ਸਿਹਤ ਦੀ ਜਾਂਚ ਕਰੋ",
+        "prediction_result": "ਨਤੀਜਾ",
+        "analysis_busy": "ਇਸ ਸਮੇਂ ਬਹੁਤ ਸਾਰੇ ਕਿਸਾਨ ਤਸਵੀਰਾਂ ਦੀ ਜਾਂਚ ਕਰ ਰਹੇ ਹਨ। ਕਿਰਪਾ ਕਰਕੇ ਇੱਕ ਮਿੰਟ ਬਾਅਦ ਦੁਬਾਰਾ ਕੋਸ਼ਿਸ਼ ਕਰੋ।",
+        "advice": "ਸਿਫਾਰਸ਼",
+        "prevention": "ਰੋਕਥਾਮ ਦੇ ਉਪਾਅ",
+        "weather_forecast": "ਮੌਸਮ ਦਾ ਪੂਰਵਾਨੁਮਾਨ",
+        "soil_tips": "ਮਿੱਟੀ ਦੀ ਸਿਹਤ ਲਈ ਸਲਾਹ",
+        "market_trends": "ਕੀਮਤ ਰੁਝਾਨ",
+        "submit_feedback": "ਪ੍ਰਤਿਕਿਰਿਆ ਦਿਓ",
+        "feedback_placeholder": "ਆਪਣਾ ਤਜਰਬਾ ਜਾਂ ਸੁਝਾਅ ਸਾਂਝਾ ਕਰੋ...",
+        "voice_output": "ਸलਾਹ ਸੁਣੋ",
+        "soil_type": "ਮਿੱਟੀ ਦੀ ਕਿਸਮ",
+        "best_season": "ਵਧੀਆ ਮੌਸਮ",
+        "water_needs": "ਪਾਣੀ ਦੀ ਲੋੜ",
+        "ph_level": "ਵਧੀਆ pH ਪੱਧਰ",
+        "common_pests": "ਆਮ ਕੀੜੇ",
+        "expert_help": "ਮਾਹਿਰ ਨਾਲ ਜੁੜੋ",
+        "alert": "ਮਹੱਤਵਪੂਰਨ ਚੇਤਾਵਨੀ",
+        "rain_alert": "ਅਗਲੇ 3 ਦਿਨਾਂ ਵਿੱਚ ਭਾਰੀ ਬਾਰਸ਼ ਦੀ ਸੰਭਾਵਨਾ। ਪੱਕੇ ਹੋਏ ਫਸਲਾਂ ਦੀ ਤੁਰੰਤ ਕਟਾਈ ਕਰੋ।",
+        "temp_alert": "ਉੱਚ ਤਾਪਮਾਨ ਚੇਤਾਵਨੀ। ਪੌਦਿਆਂ ਨੂੰ ਸਵੇਰੇ ਜਲਦੀ ਜਾਂ ਸ਼ਾਮ ਨੂੰ ਪਾਣੀ ਦਿਓ।",
+        "wind_alert": "ਤੇਜ਼ ਹਵਾਵਾਂ ਦੀ ਉਮੀਦ ਹੈ। ਢਿੱਲੀਆਂ structureਾਂ ਨੂੰ ਸੁਰੱਖਿਅਤ ਕਰੋ ਅਤੇ ਨੌਜਵਾਨ ਪੌਦਿਆਂ ਦੀ ਰੱਖਿਆ ਕਰੋ।",
+        "phone_label": "ਫੋਨ ਨੰਬਰ",
+        "question_label": "ਤੁਹਾਡਾ ਸਵਾਲ",
+        "submit_question": "ਸਵਾਲ ਦਾਖਲ ਕਰੋ",
+        "thank_you": "ਧੰਨਵਾਦ! ਇੱਕ ਮਾਹਿਰ 24 ਘੰਟੇ ਦੇ ਅੰਦਰ ਤੁਹਾਡੇ ਨਾਲ ਸੰਪਰਕ ਕਰੇਗਾ।",
+        "real_time_data": "ਰੀਅਲ-ਟਾਈਮ ਡੇਟਾ",
+        "last_updated": "ਆਖਰੀ ਅੱਪਡੇਟ",
+        "refresh_data": "ਡੇਟਾ ਤਾਜ਼ਾ ਕਰੋ",
+        "expert_advice": "ਮਾਹਿਰ ਸਲਾਹ",
+        "community_forum": "ਕਮਿਊਨਿਟੀ ਫੋਰਮ",
+        "gov_schemes": "ਸਰਕਾਰੀ ਸਕੀਮਾਂ",
+        "weather_warnings": "ਮੌਸਮ ਚੇਤਾਵਨੀ",
+        "market_analysis": "ਮਾਰਕੀਟ ਵਿਸ਼ਲੇਸ਼ਣ",
+        "crop_calendar": "ਫਸਲ ਕੈਲੰਡਰ",
+        "fertilizer_recommendation": "ਖਾਦ ਸਿਫਾਰਿਸ਼",
+        "hectare_unit": "kg/ਹੈਕਟੇਅਰ",
+        "symptoms": "ਲੱਛਣ",
+        "treatment": "ਇਲਾਜ",
+        "prevention_label": "ਰੋਕਥਾਮ",
+        "five_day_forecast": "5-ਦਿਨ ਦਾ ਪੂਰਵਾਨੁਮਾਨ",
+        "detailed_forecast": "ਵਿਸਤ੍ਰਿਤ ਪੂਰਵਾਨੁਮਾਨ",
+        "soil_testing": "ਮਿੱਟੀ ਟੈਸਟਿੰਗ",
+        "your_soil_health": "ਤੁਹਾਡਾ ਮਿੱਟੀ ਦਾ ਸਿਹਤ"
+    }
+}
+
+# Crop database with information for multiple crops
+crop_database = {
+    "Rice": {
+        "soil_type": "Clayey loam",
+        "season": "Kharif (June-October)",
+        "water_requirements": "High",
+        "ph_range": "5.0-6.5",
+        "common_pests": "Stem borer, Brown plant hopper",
+        "hi": {
+            "soil_type": "चिकनी दोमट मिट्टी",
+            "season": "खरीफ (जून-अक्टूबर)",
+            "water_requirements": "उच्च",
+            "ph_range": "5.0-6.5",
+            "common_pests": "तना छेदक, भूरा प्लांट हॉपर"
+        },
+        "pa": {
+            "soil_type": "ਚਿਕੀ ਦੋਮਟ ਮਿੱਟੀ",
+            "season": "ਖਰੀਫ (ਜੂਨ-ਅਕਤੂਬਰ)",
+            "water_requirements": "ਉੱਚ",
+            "ph_range": "5.0-6.5",
+            "common_pests": "ਤਣਾ ਬੋरर, ਬ੍ਰਾਊਨ ਪਲਾਂਟ ਹੌਪਰ"
+        }
+    },
+    "Wheat": {
+        "soil_type": "Well-drained loamy soil",
+        "season": "Rabi (November-April)",
+        "water_requirements": "Medium",
+        "ph_range": "6.0-7.5",
+        "common_pests": "Aphids, Armyworm",
+        "hi": {
+            "soil_type": "अच्छी जल निकासी वाली दोमट मिट्टी",
+            "season": "रबी (नवंबर-अप्रैल)",
+            "water_requirements": "मध्यम",
+            "ph_range": "6.0-7.5",
+            "common_pests": "एफिड्स, आर्मीवर्म"
+        },
+        "pa": {
+            "soil_type": "ਚੰਗੀ ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਦੋਮਟ ਮਿੱਟੀ",
+            "season": "ਰਬੀ (ਨਵੰਬर-ਅਪ੍ਰੈਲ)",
+            "water_requirements": "ਦਰਮਿਆਨਾ",
+            "ph_range": "6.0-7.5",
+            "common_pests": "ਐਫਿਡ, ਆਰਮੀਵਰਮ"
+        }
+    },
+    "Tomato": {
+        "soil_type": "Well-drained sandy loam",
+        "season": "Year-round with irrigation",
+        "water_requirements": "Medium",
+        "ph_range": "6.0-6.8",
+        "common_pests": "Whiteflies, Tomato fruit borer",
+        "hi": {
+            "soil_type": "अच्छी जल निकासी वाली बलुई दोमट मिट्टी",
+            "season": "सिंचाई के साथ साल भर",
+            "water_requirements": "मध्यम",
+            "ph_range": "6.0-6.8",
+            "common_pests": "व्हाइटफ्लाइज़, टमाटर फल बोरर"
+        },
+        "pa": {
+            "soil_type": "ਚੰਗी ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਰੇਤਲੀ ਦੋमਟ ਮਿੱਟੀ",
+            "season": "ਸਿੰਜਾਈ ਨਾਲ ਸਾਲ ਭਰ",
+            "water_requirements": "ਦਰਮਿਆਨਾ",
+            "ph_range": "6.0-6.8",
+            "common_pests": "ਵ੍ਹਾਈਟਫਲਾਈਜ਼, ਟਮਾਟਰ ਫਲ ਬੋरਰ"
+        }
+    },
+    "Potato": {
+        "soil_type": "Well-drained sandy loam",
+        "season": "Rabi (October-March)",
+        "water_requirements": "Medium",
+        "ph_range": "5.0-6.5",
+        "common_pests": "Colorado potato beetle, Aphids",
+        "hi": {
+            "soil_type": "अच्छी जल निकासी वाली बलुई दोमट मिट्टी",
+            "season": "रबी (अक्टूबर-मार्च)",
+            "water_requirements": "मध्यम",
+            "ph_range": "5.0-6.5",
+            "common_pests": "कोलोराडो आलू बीटल, एफिड्स"
+        },
+        "pa": {
+            "soil_type": "ਚੰਗੀ ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਰੇਤਲੀ ਦੋਮਟ ਮਿੱਟੀ",
+            "season": "ਰਬੀ (ਅਕਤੂਬर-ਮਾਰਚ)",
+            "water_requirements": "ਦਰਮਿਆਨਾ",
+            "ph_range": "5.0-6.5",
+            "common_pests": "ਕੋਲੋਰਾਡੋ ਆਲੂ ਬੀਟਲ, ਐਫਿਡ"
+        }
+    },
+    "Maize": {
+        "soil_type": "Well-drained loamy soil",
+        "season": "Kharif (June-September)",
+        "water_requirements": "Medium",
+        "ph_range": "5.5-7.0",
+        "common_pests": "Stem borer, Armyworm",
+        "hi": {
+            "soil_type": "अच्छी जल निकासी वाली दोमट मिट्टी",
+            "season": "खरीफ (जून-सितंबर)",
+            "water_requirements": "मध्यम",
+            "ph_range": "5.5-7.0",
+            "common_pests": "तना छेदक, आर्मीवर्म"
+        },
+        "pa": {
+            "soil_type": "ਚੰਗੀ ਤਰ੍ਹਾਂ ਨਾਲ ਸੁੱਕੀ ਦੋਮਟ ਮਿੱਟੀ",
+            "season": "ਖਰੀਫ (ਜੂਨ-ਸਤੰਬਰ)",
+            "water_requirements": "ਦਰਮਿਆਨਾ",
+            "ph_range": "5.5-7.0",
+            "common_pests": "ਤਣਾ ਬੋरर, ਆਰਮੀਵਰਮ"
+        }
+    },
+    "Sugarcane": {
+        "soil_type": "Deep rich loamy soil",
+        "season": "Year-round with irrigation",
+        "water_requirements": "High",
+        "ph_range": "6.0-7.5",
+        "common_pests": "Top borer, Scale insects",
+        "hi": {
+            "soil_type": "गहरी उपजाऊ दोमट मिट्टी",
+            "season": "सिंचाई के साथ साल भर",
+            "water_requirements": "उच्च",
+            "ph_range": "6.0-7.5",
+            "common_pests": "टॉप बोरर, स्केल कीट"
+        },
+        "pa": {
+            "soil_type": "ਡੂੰਘੀ ਅਮੀਰ ਦੋਮਟ ਮਿੱਟੀ",
+            "season": "ਸਿੰਜਾਈ ਨਾਲ ਸਾਲ ਭਰ",
+            "water_requirements": "ਉੱਚ",
+            "ph_range": "6.0-7.5",
+            "common_pests": "ਟਾਪ ਬੋਰਰ, ਸਕੇਲ ਕੀੜੇ"
+        }
+    }
+}
+
+# Disease database with information for multiple crops
+disease_database = {
+    "Tomato": {
+        "Early Blight": {
+            "symptoms": "Dark spots with concentric rings on leaves, stems and fruits",
+            "treatment": "Apply chlorothalonil or copper-based fungicides",
+            "prevention": "Rotate crops, remove infected plants, ensure good air circulation",
+            "hi": {
+                "symptoms": "पत्तियों, तनों और फलों पर केंद्रित छल्ले वाले काले धब्बे",
+                "treatment": "क्लोरोथालोनिल या तांबे आधारित कवकनाशी लगाएं",
+                "prevention": "फसलों का रोटेशन, संक्रमित पौधों को हटाना, अच्छा वायु संचार सुनिश्चित करना"
+            },
+            "pa": {
+                "symptoms": "ਪੱਤੀਆਂ, ਡੰਡੀਆਂ ਅਤੇ ਫਲਾਂ 'ਤੇ ਕੇਂਦਰਿਤ ਰਿੰਗਾਂ ਵਾਲੇ ਡਾਰਕ ਧੱਬੇ",
+                "treatment": "ਕਲੋਰੋਥਾਲੋਨਿਲ ਜਾਂ ਤਾਂਬੇ-ਅਧਾਰਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
+                "prevention": "ਫਸਲਾਂ ਦੀ ਘੁੰਮਾਓ, ਸੰਕਰਮਿਤ ਪੌਦਿਆਂ ਨੂੰ ਹਟਾਓ, ਚੰਗੀ ਹਵਾ ਪ੍ਰਣਾਲੀ ਨੂੰ ਯਕੀਨੀ ਬਣਾਓ"
+            }
+        },
+        "Late Blight": {
+            "symptoms": "Water-soaked lesions that turn brown and papery",
+            "treatment": "Apply fungicides containing mancozeb or metalaxyl",
+            "prevention": "Avoid overhead watering, remove volunteer plants",
+            "hi": {
+                "symptoms": "पानी से लथपथ घाव जो भूरे और कागजी हो जाते हैं",
+                "treatment": "मैंकोजेब या मेटालाक्सिल युक्त कवकनाशी लगाएं",
+                "prevention": "ओवरहेड वाटरिंग से बचें, स्वयंसेवक पौधों को हटा दें"
+            },
+            "pa": {
+                "symptoms": "ਪਾਣੀ ਨਾਲ ਭਿੱਜੇ ਘਾਉ ਜੋ ਭੂਰੇ ਅਤੇ ਕਾਗਜ਼ੀ ਹੋ ਜਾਂਦੇ ਹਨ",
+                "treatment": "ਮੈਨਕੋਜ਼ੇਬ ਜਾਂ ਮੈਟਾਲਾਕਸੀਲ ਯੁਕਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
+                "prevention": "ਓਓਵਰਹੈਡ ਵਾਟਰਿੰਗ ਤੋਂ ਬਚੋ, ਰੁੱਖੇ ਪੌਦੇ ਹਟਾਓ"
+            }
+        }
+    },
+    "Potato": {
+        "Late Blight": {
+            "symptoms": "Dark, water-soaked spots on leaves with white mold under wet conditions",
+            "treatment": "Apply fungicides containing chlorothalonil or mancozeb",
+            "prevention": "Plant resistant varieties, avoid overhead irrigation",
+            "hi": {
+                "symptoms": "गीली परिस्थितियों में सफेद मोल्ड के साथ पत्तियों पर काले, पानी से लथपथ धब्बे",
+                "treatment": "क्लोरोथालोनिल या मैंकोजेब युक्त कवकनाशी लगाएं",
+                "prevention": "प्रतिरोधी किस्में लगाएं, ओवरहेड सिंचाई से बचें"
+            },
+            "pa": {
+                "symptoms": "ਗਿੱਲੀ ਹਾਲਤ ਵਿੱਚ ਚਿੱਟੇ ਮੋਲਡ ਨਾਲ ਪੱਤੀਆਂ 'ਤੇ ਡਾਰ크, ਪਾਣੀ ਨਾਲ ਭਿੱਜੇ ਧੱਬੇ",
+                "treatment": "ਕਲੋਰੋਥਾਲੋਨਿਲ ਜਾਂ ਮੈਨਕੋਜ਼ੇਬ ਯੁਕਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
+                "prevention": "ਪ੍ਰਤੀਰੋਧਕ ਕਿਸਮਾਂ ਲਗਾਓ, ਓਵਰਹੈਡ ਸਿੰਜਾਈ ਤੋਂ ਬਚੋ"
+            }
+        }
+    },
+    "Rice": {
+        "Blast": {
+            "symptoms": "Spindle-shaped lesions with gray centers and brown margins",
+            "treatment": "Apply fungicides containing tricyclazole or azoxystrobin",
+            "prevention": "Use resistant varieties, avoid excessive nitrogen fertilization",
+            "hi": {
+                "symptoms": "ग्रे सेंटर और भूरे मार्जिन के साथ स्पिंडल के आकार के घाव",
+                "treatment": "ट्राइसाइक्लाजोल या एज़ोक्सिस्ट्रोबिन युक्त कवकनाशी लगाएं",
+                "prevention": "प्रतिरोधी किस्मों का उपयोग करें, अत्यधिक नाइट्रोजन निषेचन से बचें"
+            },
+            "pa": {
+                "symptoms": "ਸਲੇਟੀ ਸੈਂਟਰ ਅਤੇ ਭੂਰੇ ਮਾਰਜਿਨ ਨਾਲ ਸਪਿੰਡਲ-ਆਕਾਰ ਦੇ ਘਾਉ",
+                "treatment": "ਟ੍ਰਾਈਸਾਈਕਲਾਜ਼ੋਲ ਜਾਂ ਅਜ਼ੋਕਸੀਸਟ੍ਰੋਬਿਨ ਯੁਕਤ ਫੰਗੀਸਾਈਡਸ ਲਗਾਓ",
+                "prevention": "ਪ੍ਰਤੀਰੋਧਕ ਕਿਸਮਾਂ ਦੀ ਵਰਤੋਂ ਕਰੋ, ਜ਼ਿਆਦਾ ਨਾਈਟ੍ਰੋਜਨ ਖਾਦ ਤੋਂ ਬਚੋ"
+            }
+        }
+    }
+}
+
+# Soil health tips (Tab 5)
+soil_tips = [
+    "Test soil every season for nutrient levels",
+    "Add organic compost to improve soil structure",
+    "Practice crop rotation to maintain soil health",
+    "Use cover crops to prevent erosion",
+    "Maintain proper pH levels for your crops"
+]
+
+# Agricultural tips (Tab 6)
+farming_tips = [
+    "Rotate crops to prevent soil depletion",
+    "Use organic fertilizers for sustainable farming",
+    "Implement drip irrigation to conserve water",
+    "Monitor plants regularly for early pest detection",
+    "Consider intercropping to maximize land use"
+]
+
+# Government schemes (Tab 6)
+government_schemes = [
+    "PM-KISAN: ₹6,000/year financial support",
+    "Soil Health Card Scheme: Free soil testing",
+    "National Mission on Sustainable Agriculture",
+    "Pradhan Mantri Fasal Bima Yojana: Crop insurance"
+]
+
+# Indian cities with coordinates for weather data
+indian_cities = [
+    "Jorethang", "Gangtok", "Darjeeling", "Kolkata", "Mumbai", "Delhi", "Chennai", 
+    "Bangalore", "Hyderabad", "Pune", "Ahmedabad", "Jaipur", "Lucknow", "Bhopal",
+    "Patna", "Chandigarh", "Dehradun", "Shimla", "Agartala", "Guwahati", "Dispur"
+]
+
+# Crop calendar
+crop_calendar = {
+    "Month": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+    "Activity": ["Planning", "Soil Prep", "Sowing", "Irrigation", "Weeding", "Fertilization", 
+                 "Pest Control", "Harvest", "Post-Harvest", "Marketing", "Rest", "Planning"]
+}
+
+# Base prices (₹/kg) of the mock market feed
+market_base_prices = {
+    "Rice": 40,
+    "Wheat": 30,
+    "Tomato": 25,
+    "Potato": 20,
+    "Maize": 22,
+    "Sugarcane": 15
+}
+
+# Shown when market data cannot be fetched
+default_market_data = [
+    {"Crop": "Rice", "Price (₹/kg)": 40, "Trend": "→", "TrendClass": "market-same"},
+    {"Crop": "Wheat", "Price (₹/kg)": 30, "Trend": "→", "TrendClass": "market-same"},
+    {"Crop": "Tomato", "Price (₹/kg)": 25, "Trend": "→", "TrendClass": "market-same"},
+    {"Crop": "Potato", "Price (₹/kg)": 20, "Trend": "→", "TrendClass": "market-same"},
+    {"Crop": "Maize", "Price (₹/kg)": 22, "Trend": "→", "TrendClass": "market-same"},
+    {"Crop": "Sugarcane", "Price (₹/kg)": 15, "Trend": "→", "TrendClass": "market-same"}
+]
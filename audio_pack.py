@@ -0,0 +1,163 @@
+"""
+Pre-generated audio advisory pack.
+
+Every spoken string the app can produce from disease_database and
+crop_database (disease advice, treatment, prevention and crop advice) is
+synthesized once per language by an offline build:
+
+    python audio_pack.py build
+    python audio_pack.py info
+
+The pack is a directory that can be copied to other replicas or to offline
+kiosks as it is:
+
+    audio_pack/index.json   clip key -> id, language, offset, length, format
+    audio_pack/clips.bin    zlib-compressed clips, back to back
+
+Clips are keyed by a hash of (language, text), so the app finds a clip for
+exactly the text it would otherwise synthesize. The data file is opened with
+mmap and a clip is one slice plus a decompress: no synthesis at request time.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import zlib
+
+from app_data import crop_database, disease_database
+from localization import LANGUAGES, load_bundle, source_hash
+from tts import audio_format, crop_advice, disease_advice
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACK_DIR = os.environ.get("AGRISATHI_AUDIO_PACK", os.path.join(BASE_DIR, "audio_pack"))
+FORMAT_VERSION = 1
+
+
+def clip_key(text, lang):
+    return hashlib.sha256(f"{lang}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def collect_texts(lang):
+    """[(clip id, text)] for every spoken string in one language"""
+    text = load_bundle(lang)
+    texts = []
+    for crop, diseases in disease_database.items():
+        for disease in diseases:
+            texts.append((f"disease.{crop}.{disease}.advice", disease_advice(text, crop, disease)))
+            texts.append((f"disease.{crop}.{disease}.treatment", text.disease(crop, disease, "treatment")))
+            texts.append((f"disease.{crop}.{disease}.prevention", text.disease(crop, disease, "prevention")))
+    for crop in crop_database:
+        texts.append((f"crop.{crop}.advice", crop_advice(text, crop)))
+    return texts
+
+
+def build(pack_dir=PACK_DIR, workers=None, timeout=120):
+    """Synthesize every clip into pack_dir; returns the index"""
+    from tts import TTS_WORKERS, SpeechService
+
+    service = SpeechService(workers=workers or TTS_WORKERS)
+    try:
+        jobs = []
+        for lang in LANGUAGES:
+            for clip_id, text in collect_texts(lang):
+                # Submitted all at once so the worker pool stays busy
+                jobs.append((lang, clip_id, text, service.synthesize(text, lang)))
+
+        os.makedirs(pack_dir, exist_ok=True)
+        clips = {}
+        data_path = os.path.join(pack_dir, "clips.bin")
+        with open(data_path + ".tmp", "wb") as f:
+            for lang, clip_id, text, future in jobs:
+                key = clip_key(text, lang)
+                if key in clips:
+                    continue
+                audio = future.result(timeout)
+                compressed = zlib.compress(audio, 9)
+                clips[key] = {
+                    "id": clip_id,
+                    "lang": lang,
+                    "offset": f.tell(),
+                    "length": len(compressed),
+                    "size": len(audio),
+                    "format": audio_format(audio),
+                    "voice": service.voice(lang),
+                }
+                f.write(compressed)
+        index = {"format_version": FORMAT_VERSION, "source_hash": source_hash(), "clips": clips}
+        with open(os.path.join(pack_dir, "index.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+        # Data first, then the index that points into it
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(os.path.join(pack_dir, "index.json.tmp"), os.path.join(pack_dir, "index.json"))
+        return index
+    finally:
+        service.shutdown()
+
+
+class AudioPack:
+    """Read-only, mmapped view of a built pack"""
+
+    def __init__(self, pack_dir=PACK_DIR):
+        with open(os.path.join(pack_dir, "index.json"), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported audio pack format {index.get('format_version')}")
+        self.clips = index["clips"]
+        self.source_hash = index["source_hash"]
+        with open(os.path.join(pack_dir, "clips.bin"), "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def is_current(self):
+        """False when the text tables changed since the build (some clips will be missing)"""
+        return self.source_hash == source_hash()
+
+    def __len__(self):
+        return len(self.clips)
+
+    def get(self, text, lang):
+        """Audio bytes for text in lang, or None if the pack does not have it"""
+        entry = self.clips.get(clip_key(text, lang))
+        if entry is None:
+            return None
+        start = entry["offset"]
+        return zlib.decompress(self._data[start:start + entry["length"]])
+
+
+def load_pack(pack_dir=PACK_DIR):
+    """The pack in pack_dir, or None if it has not been built"""
+    if not os.path.exists(os.path.join(pack_dir, "index.json")):
+        return None
+    return AudioPack(pack_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the AgriSathi offline audio advisory pack")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--pack-dir", default=PACK_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Synthesis worker processes")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = build(args.pack_dir, args.workers)
+        clips = index["clips"].values()
+    else:
+        pack = load_pack(args.pack_dir)
+        if pack is None:
+            print(f"No audio pack in {args.pack_dir}", file=sys.stderr)
+            return 1
+        clips = pack.clips.values()
+        print(f"Source tables: {'current' if pack.is_current else 'changed since build'}", file=sys.stderr)
+
+    for lang in LANGUAGES:
+        entries = [clip for clip in clips if clip["lang"] == lang]
+        size = sum(clip["size"] for clip in entries)
+        stored = sum(clip["length"] for clip in entries)
+        print(f"{lang}: {len(entries)} clips, {stored} bytes ({size} uncompressed)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
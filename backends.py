@@ -0,0 +1,265 @@
+"""
+Inference backends for the disease classifier.
+
+Every backend exposes the same small interface (load, predict, input_shape,
+num_classes) so DiseaseModel does not care which runtime is underneath.
+
+    keras   - the original plant-disease-model.h5 through tf.keras
+    tflite  - a converted .tflite model (float16 or int8 weights) run by the
+              standalone tflite_runtime interpreter when it is installed
+
+TensorFlow is only imported when the Keras backend (or model conversion) is
+actually used, so a tflite replica with tflite_runtime never loads it.
+
+Convert and check accuracy parity against the .h5 model with:
+
+    python backends.py convert --quantize float16
+    python backends.py parity --tflite plant-disease-model.tflite
+    python backends.py parity --quantize float16 --quantize int8 --images samples/
+
+A converted model passes when its top-1 class agrees with the .h5 model on
+at least PARITY_MIN_AGREEMENT of the samples and no class probability moves
+by more than PARITY_MAX_DRIFT; `parity` exits 1 otherwise, so it can gate CI.
+bench_inference.py runs the same check on every tflite run.
+"""
+import argparse
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KERAS_MODEL_PATH = os.path.join(BASE_DIR, "plant-disease-model.h5")
+TFLITE_MODEL_PATH = os.path.join(BASE_DIR, "plant-disease-model.tflite")
+# Interpreter threads for the tflite backend; 0 leaves it to the runtime
+TFLITE_THREADS = int(os.environ.get("AGRISATHI_TFLITE_THREADS", "0"))
+# Accuracy parity a converted model must keep against the .h5 model
+PARITY_MIN_AGREEMENT = 0.98
+PARITY_MAX_DRIFT = 0.05
+
+
+class KerasBackend:
+    """Full TensorFlow/Keras runtime for the .h5 model"""
+
+    name = "keras"
+    default_path = KERAS_MODEL_PATH
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or self.default_path
+        self.model = None
+        self.input_shape = None
+        self.num_classes = None
+
+    def load(self):
+        import tensorflow as tf
+
+        self.model = tf.keras.models.load_model(self.model_path, compile=False)
+        self.input_shape = tuple(self.model.input_shape[1:])
+        self.num_classes = self.model.output_shape[-1]
+        return self
+
+    def predict(self, batch):
+        # Calling the model directly avoids the per-call overhead of model.predict()
+        return np.asarray(self.model(batch, training=False))
+
+
+def _load_interpreter(model_path, num_threads=None):
+    """Prefer the small tflite_runtime wheel, fall back to TensorFlow's bundled interpreter"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+class TFLiteBackend:
+    """Lightweight CPU runtime for a converted (optionally quantized) model"""
+
+    name = "tflite"
+    default_path = TFLITE_MODEL_PATH
+
+    def __init__(self, model_path=None, num_threads=None):
+        self.model_path = model_path or self.default_path
+        self.num_threads = num_threads or TFLITE_THREADS or None
+        self.interpreter = None
+        self.input_shape = None
+        self.num_classes = None
+        self._batch_size = None
+        # A tflite Interpreter must not be invoked from two threads at once
+        self._lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(
+                f"{self.model_path} not found; create it with `python backends.py convert`"
+            )
+        self.interpreter = _load_interpreter(self.model_path, self.num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(d) for d in self._input["shape"][1:])
+        self.num_classes = int(self._output["shape"][-1])
+        self._batch_size = int(self._input["shape"][0])
+        return self
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input["index"], (batch_size,) + self.input_shape)
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def predict(self, batch):
+        with self._lock:
+            self._resize(len(batch))
+            batch = _quantize(batch, self._input)
+            self.interpreter.set_tensor(self._input["index"], batch)
+            self.interpreter.invoke()
+            # Copy out: the output tensor is overwritten by the next invoke()
+            output = self.interpreter.get_tensor(self._output["index"]).copy()
+        return _dequantize(output, self._output)
+
+
+def _quantize(batch, details):
+    """Map float inputs onto an integer input tensor (full-integer models only)"""
+    dtype = details["dtype"]
+    if dtype == np.float32:
+        return np.ascontiguousarray(batch, dtype=np.float32)
+    scale, zero_point = details["quantization"]
+    info = np.iinfo(dtype)
+    return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+
+def _dequantize(output, details):
+    if output.dtype == np.float32:
+        return output
+    scale, zero_point = details["quantization"]
+    return (output.astype(np.float32) - zero_point) * scale
+
+
+BACKENDS = {
+    KerasBackend.name: KerasBackend,
+    TFLiteBackend.name: TFLiteBackend,
+}
+
+
+def create_backend(name, model_path=None):
+    """Instantiate a backend by its config name"""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown model backend '{name}', choose one of {sorted(BACKENDS)}")
+    return backend_cls(model_path)
+
+
+def convert_to_tflite(keras_path=KERAS_MODEL_PATH, output_path=TFLITE_MODEL_PATH, quantize="float16"):
+    """
+    Convert the Keras model to TFLite.
+    quantize: None (float32), "float16" (half-size weights) or "int8"
+    (dynamic-range int8 weights, float inputs/outputs).
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(keras_path, compile=False)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize in ("float16", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantize == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+    elif quantize is not None:
+        raise ValueError(f"Unsupported quantization '{quantize}'")
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    return output_path
+
+
+def check_parity(reference, candidate, samples):
+    """
+    Compare two loaded backends on the same float32 batch.
+    Returns top-1 agreement and the largest absolute probability difference.
+    """
+    expected = reference.predict(samples)
+    actual = candidate.predict(samples)
+    return {
+        "samples": len(samples),
+        "top1_agreement": float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1))),
+        "max_abs_diff": float(np.max(np.abs(expected - actual))),
+    }
+
+
+def parity_failures(result, min_agreement=PARITY_MIN_AGREEMENT, max_drift=PARITY_MAX_DRIFT):
+    """Human-readable reasons a check_parity() result misses the thresholds (empty when it passes)"""
+    failures = []
+    if result["top1_agreement"] < min_agreement:
+        failures.append(f"top-1 agreement {result['top1_agreement']:.2%} < {min_agreement:.2%}")
+    if result["max_abs_diff"] > max_drift:
+        failures.append(f"max probability drift {result['max_abs_diff']:.5f} > {max_drift}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the disease model and check backend parity")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser("convert", help="Convert the .h5 model to .tflite")
+    convert.add_argument("--keras", default=KERAS_MODEL_PATH)
+    convert.add_argument("--output", default=TFLITE_MODEL_PATH)
+    convert.add_argument("--quantize", choices=["none", "float16", "int8"], default="float16")
+
+    parity = subparsers.add_parser("parity", help="Compare .tflite models against the .h5 model; exits 1 on a miss")
+    parity.add_argument("--keras", default=KERAS_MODEL_PATH)
+    parity.add_argument("--tflite", default=TFLITE_MODEL_PATH)
+    parity.add_argument("--quantize", action="append", choices=["none", "float16", "int8"],
+                        help="Convert the .h5 model with this quantization and check that instead of --tflite; "
+                             "repeat for several")
+    parity.add_argument("--samples", type=int, default=64)
+    parity.add_argument("--images", help="Directory of leaf photos to compare on instead of random inputs")
+    parity.add_argument("--min-agreement", type=float, default=PARITY_MIN_AGREEMENT)
+    parity.add_argument("--max-drift", type=float, default=PARITY_MAX_DRIFT,
+                        help="Largest allowed absolute change of any class probability")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        quantize = None if args.quantize == "none" else args.quantize
+        path = convert_to_tflite(args.keras, args.output, quantize)
+        print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+        return 0
+
+    reference = KerasBackend(args.keras).load()
+    if args.images:
+        from preprocessing import ImagePreprocessor
+
+        files = sorted(
+            os.path.join(args.images, name) for name in os.listdir(args.images)
+            if name.lower().endswith((".jpg", ".jpeg", ".png"))
+        )[:args.samples]
+        samples = ImagePreprocessor(reference.input_shape).to_batch(files)
+    else:
+        rng = np.random.default_rng(0)
+        samples = rng.random((args.samples,) + reference.input_shape, dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.quantize:
+            candidates = {
+                quantize: convert_to_tflite(args.keras, os.path.join(tmp_dir, f"{quantize}.tflite"),
+                                            None if quantize == "none" else quantize)
+                for quantize in args.quantize
+            }
+        else:
+            candidates = {os.path.basename(args.tflite): args.tflite}
+        failed = False
+        for name, path in candidates.items():
+            result = check_parity(reference, TFLiteBackend(path).load(), samples)
+            failures = parity_failures(result, args.min_agreement, args.max_drift)
+            print(f"{name}: top-1 agreement {result['top1_agreement']:.2%} over {result['samples']} samples, "
+                  f"max |p_keras - p_tflite| {result['max_abs_diff']:.5f}: {'; '.join(failures) or 'ok'}")
+            failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
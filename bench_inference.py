@@ -0,0 +1,431 @@
+"""
+Benchmark of the disease-detection path, per backend and thread setting.
+
+    python bench_inference.py
+    python bench_inference.py --backend keras --backend tflite --threads 1 --threads 4 --images samples/
+    python bench_inference.py --compare inference-bench-1a2b3c4.json
+
+Every (backend, threads) pair runs in a fresh interpreter, so thread settings
+take effect before the runtime starts and RSS belongs to that pair alone.
+Images go through the same code as Tab 1 (agrisathi.analyze_image with the
+in-process queue, AGRISATHI_INFERENCE_WORKERS=0): ingest compression, decode
+at INGEST_SCALE, leaf tiling, inference on the tiles and aggregation. Each
+run measures:
+
+- model load: runtime import, then deserialization plus warm-up;
+- per-image latency of ingest, decode, segment (leaf tiling), inference and
+  postprocess (aggregate, top-k, preview), with p50/p95/p99, and of the whole
+  analyze_image call (total), one image at a time;
+- images/sec at batch sizes 1-64, end to end and for the forward pass alone;
+- RSS after load and peak RSS of the process;
+- for tflite, accuracy parity against the .h5 model on the corpus tiles
+  (backends.check_parity); a miss of the thresholds in backends.py makes
+  the benchmark exit 1, like a regression.
+
+The corpus is a seeded synthetic set of leaf-like JPEGs at phone, webcam and
+small resolutions, plus the photos in --images when given. The report is
+written as JSON together with the commit it was measured at. --compare
+prints the change against an earlier report and exits 1 when latency or
+throughput regressed by more than --tolerance.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64]
+STAGES = ("ingest", "decode", "segment", "inference", "postprocess", "total")
+# (width, height) of synthetic photos: phone camera, 480p camera capture, small upload
+SYNTHETIC_SIZES = [(4000, 3000), (640, 480), (320, 240)]
+# Tiles compared against the .h5 model on tflite runs
+PARITY_SAMPLES = 64
+
+
+def git_commit():
+    """(short commit, dirty) of the working tree, or ("unknown", None) outside git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip() != ""
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", None
+
+
+def synthetic_corpus(count, seed=0):
+    """[(name, JPEG bytes)] of leaf-like photos, the same for a given count and seed"""
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for i in range(count):
+        width, height = SYNTHETIC_SIZES[i % len(SYNTHETIC_SIZES)]
+        # uint8 throughout: int64 noise for a 12 MP frame would dominate peak RSS
+        image = rng.integers(0, 25, (height, width, 3), dtype=np.uint8)
+        image += rng.integers(90, 140, 3, dtype=np.uint8)
+        for _ in range(rng.integers(1, 4)):
+            center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            axes = (int(width * rng.uniform(0.1, 0.3)), int(height * rng.uniform(0.05, 0.2)))
+            green = (int(rng.integers(20, 80)), int(rng.integers(120, 200)), int(rng.integers(20, 60)))
+            cv2.ellipse(image, center, axes, float(rng.uniform(0, 180)), 0, 360, green, -1)
+            lesion = (center[0] + axes[0] // 3, center[1])
+            cv2.circle(image, lesion, max(2, axes[1] // 4), (30, 80, 120), -1)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        corpus.append((f"synthetic-{i:03d}-{width}x{height}.jpg", encoded.tobytes()))
+    return corpus
+
+
+def image_corpus(root):
+    """[(relative path, bytes)] of every photo under a directory"""
+    from scan_images import iter_directory
+
+    corpus = []
+    for name, path in iter_directory(root):
+        with open(path, "rb") as f:
+            corpus.append((name, f.read()))
+    return corpus
+
+
+def summarize(timings):
+    """p50/p95/p99/mean in milliseconds of a list of seconds"""
+    timings = sorted(timings)
+
+    def percentile(q):
+        return timings[min(len(timings) - 1, int(math.ceil(q * len(timings))) - 1)] * 1000
+
+    return {
+        "p50": round(percentile(0.50), 3),
+        "p95": round(percentile(0.95), 3),
+        "p99": round(percentile(0.99), 3),
+        "mean": round(statistics.mean(timings) * 1000, 3),
+    }
+
+
+def current_rss_mb():
+    """Resident set size right now, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def peak_rss_mb():
+    """Highest resident set size over the life of the process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _import_runtime(backend, threads):
+    """Import the runtime a backend will use and apply the thread setting; returns seconds"""
+    started = time.perf_counter()
+    if backend == "keras":
+        import tensorflow as tf
+
+        if threads:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(threads)
+    else:
+        try:
+            import tflite_runtime.interpreter  # noqa: F401
+        except ImportError:
+            import tensorflow  # noqa: F401
+    return time.perf_counter() - started
+
+
+def tflite_parity(candidate, tiles, keras_model_path):
+    """check_parity of a tflite backend against the .h5 model on uint8 tiles, or why it was skipped"""
+    import numpy as np
+
+    from backends import KerasBackend, check_parity, parity_failures
+    from preprocessing import normalize_into
+
+    try:
+        reference = KerasBackend(keras_model_path).load()
+    except ImportError as e:
+        return {"skipped": f"TensorFlow is not installed: {e}"}
+    samples = np.empty((len(tiles),) + reference.input_shape, dtype=np.float32)
+    for row, tile in zip(samples, tiles):
+        normalize_into(tile, row)
+    result = check_parity(reference, candidate, samples)
+    result["failures"] = parity_failures(result)
+    return result
+
+
+def run_config(backend, threads, model_path, corpora, batch_sizes, repeat, rounds, keras_model_path=None):
+    """Benchmark one backend/thread pair in this process; returns its report"""
+    import_s = _import_runtime(backend, threads)
+
+    import numpy as np
+
+    import agrisathi
+    from disease_model import CLASSES_PATH
+    from leaf_segmentation import aggregate
+    from preprocessing import ImagePreprocessor
+    from result_cache import ResultCache
+
+    started = time.perf_counter()
+    classifier = agrisathi.load_classifier("bench", {"model": model_path, "classes": CLASSES_PATH,
+                                                     "backend": backend})
+    load_s = time.perf_counter() - started
+    model, preprocessor, inference_queue, tiler = classifier
+    report = {
+        "backend": backend,
+        "threads": threads,
+        "model": os.path.relpath(model.model_path, BASE_DIR),
+        "model_version": model.version,
+        "runtime_import_s": round(import_s, 3),
+        "load_s": round(load_s, 3),
+        "rss_after_load_mb": current_rss_mb(),
+        "corpora": {},
+    }
+    # Never hits, so every analyze_image call does the full work
+    no_cache = ResultCache(max_bytes=0)
+    scale = agrisathi.INGEST_SCALE
+
+    def prepare(data):
+        pixels = np.asarray(preprocessor.decode(io.BytesIO(agrisathi.ingest_image(data, preprocessor)), scale=scale))
+        return tiler.tiles(pixels)
+
+    # Room for every tile of the largest batch
+    batch_preprocessor = ImagePreprocessor(model.input_shape, max_batch_size=max(batch_sizes) * max(tiler.max_leaves, 1))
+    parity_tiles = []
+    try:
+        for corpus_name, corpus in corpora.items():
+            # Per-image latency, one request at a time as in Tab 1
+            timings = {stage: [] for stage in STAGES}
+            tile_counts = []
+            for _ in range(repeat):
+                for _, data in corpus:
+                    t0 = time.perf_counter()
+                    ingested = agrisathi.ingest_image(data, preprocessor)
+                    t1 = time.perf_counter()
+                    pixels = np.asarray(preprocessor.decode(io.BytesIO(ingested), scale=scale))
+                    t2 = time.perf_counter()
+                    tiles, boxes, weights = tiler.tiles(pixels)
+                    t3 = time.perf_counter()
+                    probs = model.predict(preprocessor.collate(list(tiles)))
+                    t4 = time.perf_counter()
+                    model.top_k(aggregate(probs, weights), k=3)
+                    if len(tiles) > 1:
+                        model.top_k(probs, k=1)
+                        tiler.annotate(pixels, boxes)
+                    t5 = time.perf_counter()
+                    agrisathi.analyze_image(data, classifier, no_cache)
+                    t6 = time.perf_counter()
+                    for stage, seconds in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5)):
+                        timings[stage].append(seconds)
+                    tile_counts.append(len(tiles))
+                    if len(parity_tiles) < PARITY_SAMPLES:
+                        parity_tiles.extend(tile.copy() for tile in tiles)
+
+            # Throughput at each batch size, cycling through the corpus; all tiles of a batch in one forward pass
+            throughput = {}
+            for batch_size in batch_sizes:
+                items = [corpus[i % len(corpus)][1] for i in range(batch_size)]
+                # One untimed pass: a new batch size may resize tensors
+                prepared = [prepare(data) for data in items]
+                model.predict(batch_preprocessor.collate([tile for tiles, _, _ in prepared for tile in tiles]))
+                end_to_end, forward = [], []
+                for _ in range(rounds):
+                    t0 = time.perf_counter()
+                    prepared = [prepare(data) for data in items]
+                    batch = batch_preprocessor.collate([tile for tiles, _, _ in prepared for tile in tiles])
+                    t1 = time.perf_counter()
+                    probs = model.predict(batch)
+                    t2 = time.perf_counter()
+                    first = 0
+                    for tiles, _, weights in prepared:
+                        model.top_k(aggregate(probs[first:first + len(tiles)], weights), k=3)
+                        first += len(tiles)
+                    t3 = time.perf_counter()
+                    end_to_end.append(t3 - t0)
+                    forward.append(t2 - t1)
+                throughput[str(batch_size)] = {
+                    "end_to_end_img_s": round(batch_size / statistics.median(end_to_end), 1),
+                    "inference_img_s": round(batch_size / statistics.median(forward), 1),
+                }
+
+            report["corpora"][corpus_name] = {
+                "images": len(corpus),
+                "tiles_per_image": round(statistics.mean(tile_counts), 2),
+                "latency_ms": {stage: summarize(values) for stage, values in timings.items()},
+                "throughput": throughput,
+            }
+    finally:
+        agrisathi.close_classifier(classifier)
+    report["peak_rss_mb"] = peak_rss_mb()
+    if backend == "tflite" and parity_tiles:
+        # After the RSS reading: the reference model is not part of the measured footprint
+        report["parity"] = tflite_parity(model.backend, parity_tiles[:PARITY_SAMPLES], keras_model_path)
+    return report
+
+
+def run_worker(config):
+    """Entry point of a child process: benchmark one pair and print its report as JSON"""
+    # Tab 1's in-process path: the model runs on a queue thread of this process
+    os.environ["AGRISATHI_INFERENCE_WORKERS"] = "0"
+    os.environ["AGRISATHI_TFLITE_THREADS"] = str(config["threads"])
+    corpora = {"synthetic": synthetic_corpus(config["synthetic"], config["seed"])}
+    if config["images"]:
+        corpora["images"] = image_corpus(config["images"])
+    report = run_config(config["backend"], config["threads"], config["model"], corpora,
+                        config["batch_sizes"], config["repeat"], config["rounds"], config["keras_model"])
+    print(json.dumps(report))
+
+
+def run_isolated(config, timeout=3600):
+    """Run one pair in a fresh interpreter; failures are reported, not raised"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config)],
+                            cwd=BASE_DIR, capture_output=True, text=True, timeout=timeout)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        error = (result.stderr.strip().splitlines() or ["no output"])[-1]
+        return {"backend": config["backend"], "threads": config["threads"], "error": error}
+    return json.loads(lines[-1])
+
+
+def compare(current, previous, tolerance):
+    """[(description, old, new, change)] for every metric that got worse by more than tolerance"""
+    old_runs = {(run["backend"], run["threads"]): run for run in previous["runs"] if "error" not in run}
+    regressions = []
+    for run in current["runs"]:
+        old = old_runs.get((run["backend"], run["threads"]))
+        if old is None or "error" in run:
+            continue
+        label = f"{run['backend']}/threads={run['threads'] or 'default'}"
+        for corpus, stats in run["corpora"].items():
+            old_stats = old["corpora"].get(corpus)
+            if old_stats is None:
+                continue
+            for quantile in ("p50", "p95", "p99"):
+                new_ms = stats["latency_ms"]["total"][quantile]
+                old_ms = old_stats["latency_ms"]["total"][quantile]
+                if new_ms > old_ms * (1 + tolerance):
+                    regressions.append((f"{label} {corpus} latency {quantile} ms", old_ms, new_ms, new_ms / old_ms - 1))
+            for batch_size, rates in stats["throughput"].items():
+                old_rates = old_stats["throughput"].get(batch_size)
+                if old_rates is None:
+                    continue
+                new_rate, old_rate = rates["end_to_end_img_s"], old_rates["end_to_end_img_s"]
+                if new_rate < old_rate * (1 - tolerance):
+                    regressions.append((f"{label} {corpus} batch {batch_size} img/s", old_rate, new_rate,
+                                        new_rate / old_rate - 1))
+        if run["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+            regressions.append((f"{label} peak RSS MB", old["peak_rss_mb"], run["peak_rss_mb"],
+                                run["peak_rss_mb"] / old["peak_rss_mb"] - 1))
+    return regressions
+
+
+def main():
+    from backends import KERAS_MODEL_PATH, TFLITE_MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Benchmark the AgriSathi disease-detection path")
+    parser.add_argument("--backend", action="append", choices=["keras", "tflite"],
+                        help="Backend to measure; repeat for several (default: keras)")
+    parser.add_argument("--threads", action="append", type=int,
+                        help="Runtime thread count to measure; repeat for several, 0 = runtime default")
+    parser.add_argument("--keras-model", default=KERAS_MODEL_PATH)
+    parser.add_argument("--tflite-model", default=TFLITE_MODEL_PATH)
+    parser.add_argument("--images", help="Directory of sample photos, benchmarked as a second corpus")
+    parser.add_argument("--synthetic", type=int, default=48, help="Synthetic images in the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--repeat", type=int, default=2, help="Passes over the corpus for the latency figures")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed batches per batch size")
+    parser.add_argument("--output", "-o", help="Report path (default: inference-bench-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier report to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown for --compare")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(json.loads(args.worker))
+        return 0
+
+    commit, dirty = git_commit()
+    config = {
+        "synthetic": args.synthetic,
+        "seed": args.seed,
+        "images": os.path.abspath(args.images) if args.images else None,
+        "batch_sizes": sorted(set(args.batch_sizes)),
+        "repeat": args.repeat,
+        "rounds": args.rounds,
+    }
+    models = {"keras": args.keras_model, "tflite": args.tflite_model}
+
+    runs = []
+    for backend in args.backend or ["keras"]:
+        for threads in args.threads or [0]:
+            print(f"Benchmarking {backend} with {threads or 'default'} threads...", file=sys.stderr)
+            runs.append(run_isolated(dict(config, backend=backend, threads=threads, model=models[backend],
+                                          keras_model=models["keras"])))
+
+    import numpy
+
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "config": config,
+        "runs": runs,
+    }
+    output = args.output or f"inference-bench-{commit}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for run in runs:
+        label = f"{run['backend']:<7} threads={run['threads'] or 'default':<7}"
+        if "error" in run:
+            print(f"{label} FAILED: {run['error']}", file=sys.stderr)
+            continue
+        print(f"{label} load {run['load_s']:.2f}s incl. warm-up (+{run['runtime_import_s']:.2f}s import), "
+              f"RSS {run['rss_after_load_mb'] or 0:.0f} MB after load, {run['peak_rss_mb']:.0f} MB peak", file=sys.stderr)
+        for corpus, stats in run["corpora"].items():
+            total = stats["latency_ms"]["total"]
+            rates = ", ".join(f"{size}: {rate['end_to_end_img_s']:g}" for size, rate in stats["throughput"].items())
+            print(f"  {corpus:<9} p50 {total['p50']:.1f} ms  p95 {total['p95']:.1f} ms  p99 {total['p99']:.1f} ms  "
+                  f"img/s by batch size {rates}", file=sys.stderr)
+        parity = run.get("parity")
+        if parity and "skipped" in parity:
+            print(f"  parity    skipped: {parity['skipped']}", file=sys.stderr)
+        elif parity:
+            print(f"  parity    top-1 agreement {parity['top1_agreement']:.2%}, max drift {parity['max_abs_diff']:.5f} "
+                  f"over {parity['samples']} tiles: {'; '.join(parity['failures']) or 'ok'}", file=sys.stderr)
+    print(f"Wrote {output}", file=sys.stderr)
+
+    parity_failed = any(run.get("parity", {}).get("failures") for run in runs)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare(report, previous, args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:g} -> {new:g} ({change:+.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {previous.get('commit', args.compare)}", file=sys.stderr)
+    return 1 if parity_failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+"""
+Chart rendering for the Market Prices and Weather tabs.
+
+Charts are rendered once per data snapshot and the encoded image bytes are
+shared by every session. Figures are built with matplotlib.figure.Figure
+instead of pyplot, so they never enter pyplot's global figure registry and
+are released as soon as they have been encoded.
+
+With CHART_BACKEND = "plotly" the same charts are produced as Plotly figures
+(rendered in the browser) and the figure objects are cached instead.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+CHART_BACKEND = os.environ.get("AGRISATHI_CHART_BACKEND", "matplotlib")
+CHART_FORMAT = os.environ.get("AGRISATHI_CHART_FORMAT", "png")  # png or svg
+
+TREND_COLORS = {"↑": "#4caf50", "↓": "#f44336"}
+FLAT_COLOR = "#ff9800"
+
+
+def _trend_color(trend):
+    return next((color for arrow, color in TREND_COLORS.items() if arrow in trend), FLAT_COLOR)
+
+
+def market_key(market_data):
+    """Identifies a market snapshot: its timestamp plus the values actually plotted"""
+    return (
+        "market",
+        market_data["timestamp"],
+        tuple((item["Crop"], item["Price (₹/kg)"], item["Trend"]) for item in market_data["data"]),
+    )
+
+
+def weather_key(weather_data):
+    """Identifies a forecast snapshot: city, fetch time and the plotted values"""
+    return (
+        "weather",
+        weather_data["city"],
+        weather_data["timestamp"],
+        tuple((f["day"], f["temp"], f["rain_chance"]) for f in weather_data["forecast"]),
+    )
+
+
+def _encode(fig, fmt):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    FigureCanvasAgg(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches="tight")
+    # Drop all artists now rather than whenever the garbage collector gets to them
+    fig.clear()
+    return buffer.getvalue()
+
+
+def render_market_chart(market_data, fmt=CHART_FORMAT):
+    """Bar chart of current prices coloured by trend, as PNG/SVG bytes"""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    crops = [item['Crop'] for item in market_data["data"]]
+    prices = [item['Price (₹/kg)'] for item in market_data["data"]]
+    colors = [_trend_color(item['Trend']) for item in market_data["data"]]
+
+    bars = ax.bar(crops, prices, color=colors)
+    ax.set_ylabel('Price (₹/kg)')
+    ax.tick_params(axis='x', labelrotation=45)
+
+    # Add value labels on bars
+    for bar, price in zip(bars, prices):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                f'₹{price}', ha='center', va='bottom')
+
+    return _encode(fig, fmt)
+
+
+def render_weather_chart(weather_data, fmt=CHART_FORMAT):
+    """Temperature line over rain-chance bars for the 5-day forecast, as PNG/SVG bytes"""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+
+    days = [f['day'] for f in weather_data['forecast']]
+    temps = [f['temp'] for f in weather_data['forecast']]
+    rain = [f['rain_chance'] for f in weather_data['forecast']]
+
+    ax.plot(days, temps, marker='o', label='Temperature (°C)', linewidth=2.5)
+    ax.set_ylabel('Temperature (°C)', color='red')
+    ax.tick_params(axis='y', labelcolor='red')
+
+    ax2 = ax.twinx()
+    ax2.bar(days, rain, alpha=0.3, color='blue', label='Rain Chance (%)')
+    ax2.set_ylabel('Rain Chance (%)', color='blue')
+    ax2.tick_params(axis='y', labelcolor='blue')
+    ax2.set_ylim(0, 100)
+
+    ax.set_title('5-Day Weather Forecast')
+    ax.legend(loc='upper left')
+    ax2.legend(loc='upper right')
+
+    return _encode(fig, fmt)
+
+
+def plotly_market_chart(market_data):
+    """Plotly version of render_market_chart"""
+    import plotly.graph_objects as go
+
+    crops = [item['Crop'] for item in market_data["data"]]
+    prices = [item['Price (₹/kg)'] for item in market_data["data"]]
+    fig = go.Figure(go.Bar(
+        x=crops,
+        y=prices,
+        marker_color=[_trend_color(item['Trend']) for item in market_data["data"]],
+        text=[f'₹{price}' for price in prices],
+        textposition="outside"
+    ))
+    fig.update_layout(yaxis_title='Price (₹/kg)', xaxis_tickangle=-45, margin=dict(t=20))
+    return fig
+
+
+def plotly_weather_chart(weather_data):
+    """Plotly version of render_weather_chart"""
+    import plotly.graph_objects as go
+
+    days = [f['day'] for f in weather_data['forecast']]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=days, y=[f['rain_chance'] for f in weather_data['forecast']],
+        name='Rain Chance (%)', marker_color='blue', opacity=0.3, yaxis='y2'
+    ))
+    fig.add_trace(go.Scatter(
+        x=days, y=[f['temp'] for f in weather_data['forecast']],
+        name='Temperature (°C)', mode='lines+markers', line=dict(color='red', width=2.5)
+    ))
+    fig.update_layout(
+        title='5-Day Weather Forecast',
+        yaxis=dict(title='Temperature (°C)'),
+        yaxis2=dict(title='Rain Chance (%)', overlaying='y', side='right', range=[0, 100])
+    )
+    return fig
+
+
+class ChartCache:
+    """
+    Thread-safe LRU of rendered charts keyed by data snapshot. Concurrent
+    sessions asking for the same missing chart wait for one render.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._charts = OrderedDict()
+        self._lock = threading.Lock()
+        self._render_locks = {}
+        self.hits = 0
+        self.renders = 0
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._charts:
+                self._charts.move_to_end(key)
+                self.hits += 1
+                return self._charts[key]
+            render_lock = self._render_locks.setdefault(key, threading.Lock())
+
+        with render_lock:
+            with self._lock:
+                if key in self._charts:
+                    self.hits += 1
+                    return self._charts[key]
+            chart = render()
+            with self._lock:
+                self._charts[key] = chart
+                self.renders += 1
+                self._render_locks.pop(key, None)
+                while len(self._charts) > self.max_entries:
+                    self._charts.popitem(last=False)
+        return chart
+
+    def market_chart(self, market_data, backend=CHART_BACKEND):
+        if backend == "plotly":
+            return self.get_or_render(market_key(market_data) + ("plotly",), lambda: plotly_market_chart(market_data))
+        return self.get_or_render(market_key(market_data) + (CHART_FORMAT,), lambda: render_market_chart(market_data))
+
+    def weather_chart(self, weather_data, backend=CHART_BACKEND):
+        if backend == "plotly":
+            return self.get_or_render(weather_key(weather_data) + ("plotly",), lambda: plotly_weather_chart(weather_data))
+        return self.get_or_render(weather_key(weather_data) + (CHART_FORMAT,), lambda: render_weather_chart(weather_data))
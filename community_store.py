@@ -0,0 +1,233 @@
+"""
+Durable storage for expert-help questions and community forum posts.
+
+Everything lives in one SQLite database in WAL mode, so readers never block
+the writer and commits do not wait for fsync (synchronous=NORMAL; the WAL is
+synced at checkpoints). UI threads never touch the write path: add_question
+and add_post put the row on a queue and return a Future, and one background
+writer commits whatever has queued up as a single batched transaction.
+
+Both tables are indexed on crop, intent and creation time, and listings use
+keyset pagination (WHERE (created_at, id) < cursor ... LIMIT n), so a page
+is an index range read however long the forum grows.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get("AGRISATHI_DB", os.path.join(BASE_DIR, "agrisathi.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    phone TEXT NOT NULL,
+    question TEXT NOT NULL,
+    lang TEXT,
+    crop TEXT,
+    intent TEXT,
+    symptoms TEXT,
+    diseases TEXT
+);
+CREATE INDEX IF NOT EXISTS questions_created ON questions (created_at);
+CREATE INDEX IF NOT EXISTS questions_crop ON questions (crop, created_at);
+CREATE INDEX IF NOT EXISTS questions_intent ON questions (intent, created_at);
+
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    user TEXT NOT NULL,
+    text TEXT NOT NULL,
+    lang TEXT,
+    crop TEXT,
+    intent TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_created ON posts (created_at);
+CREATE INDEX IF NOT EXISTS posts_crop ON posts (crop, created_at);
+CREATE INDEX IF NOT EXISTS posts_intent ON posts (intent, created_at);
+"""
+
+INSERTS = {
+    "questions": "INSERT INTO questions (created_at, phone, question, lang, crop, intent, symptoms, diseases) "
+                 "VALUES (:created_at, :phone, :question, :lang, :crop, :intent, :symptoms, :diseases)",
+    "posts": "INSERT INTO posts (created_at, user, text, lang, crop, intent) "
+             "VALUES (:created_at, :user, :text, :lang, :crop, :intent)",
+}
+
+# Shown in the forum until farmers have posted anything themselves
+SAMPLE_POSTS = [
+    {"user": "Raju Kumar", "text": "Has anyone tried the new organic pesticide? Results?"},
+    {"user": "Priya Singh", "text": "Looking for advice on tomato cultivation in rainy season"},
+    {"user": "Amandeep Singh", "text": "Sharing my success with drip irrigation - 30% water saved!"},
+    {"user": "Vikram Patel", "text": "Best time to harvest wheat in North India?"}
+]
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class CommunityStore:
+    """SQLite-backed questions and forum posts with a batching background writer"""
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=256, max_delay=0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.rows_written = 0
+
+        with _connect(path) as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == 0:
+                now = time.time()
+                conn.executemany(INSERTS["posts"], [
+                    dict(post, created_at=now - i, lang="en", crop=None, intent=None)
+                    for i, post in enumerate(SAMPLE_POSTS)
+                ])
+
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._thread = threading.Thread(target=self._run, name="community-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # Writes
+
+    def _submit(self, table, row):
+        future = Future()
+        self._queue.put((table, row, future))
+        return future
+
+    def add_question(self, phone, question, lang="en", analysis=None):
+        """Queue a question for storage; the Future resolves to its row id once committed"""
+        analysis = analysis or {}
+        crops = analysis.get("crops") or []
+        return self._submit("questions", {
+            "created_at": time.time(),
+            "phone": phone,
+            "question": question,
+            "lang": lang,
+            "crop": crops[0] if crops else None,
+            "intent": analysis.get("intent"),
+            "symptoms": json.dumps(analysis.get("symptoms", []), ensure_ascii=False),
+            "diseases": json.dumps(analysis.get("diseases", []), ensure_ascii=False),
+        })
+
+    def add_post(self, user, text, lang="en", crop=None, intent=None):
+        """Queue a forum post; the Future resolves to its row id once committed"""
+        return self._submit("posts", {
+            "created_at": time.time(),
+            "user": user,
+            "text": text,
+            "lang": lang,
+            "crop": crop,
+            "intent": intent,
+        })
+
+    def _run(self):
+        conn = _connect(self.path)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            batch = [item]
+            # Gather whatever arrives within max_delay into the same transaction
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(conn, batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                break
+        conn.close()
+
+    def _write(self, conn, batch):
+        ids = []
+        try:
+            with conn:
+                for table, row, _ in batch:
+                    ids.append(conn.execute(INSERTS[table], row).lastrowid)
+        except Exception as e:
+            logger.error("Failed to write %d community rows: %s", len(batch), e)
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows_written += len(batch)
+        for (_, _, future), row_id in zip(batch, ids):
+            future.set_result(row_id)
+
+    def flush(self):
+        """Block until everything queued so far is committed"""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    # Reads
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def _page(self, table, limit, before, filters):
+        """Newest-first rows; `before` is the cursor returned with the previous page"""
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM {table} {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+        items = [dict(row) for row in rows[:limit]]
+        cursor = (items[-1]["created_at"], items[-1]["id"]) if len(rows) > limit else None
+        return items, cursor
+
+    def list_posts(self, limit=10, before=None, crop=None, intent=None):
+        """One page of forum posts, newest first: (posts, cursor of the next page or None)"""
+        return self._page("posts", limit, before, {"crop": crop, "intent": intent})
+
+    def list_questions(self, limit=50, before=None, crop=None, intent=None):
+        """One page of expert questions, newest first: (questions, cursor of the next page or None)"""
+        questions, cursor = self._page("questions", limit, before, {"crop": crop, "intent": intent})
+        for question in questions:
+            question["symptoms"] = json.loads(question["symptoms"] or "[]")
+            question["diseases"] = json.loads(question["diseases"] or "[]")
+        return questions, cursor
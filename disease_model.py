@@ -0,0 +1,137 @@
+"""
+Shared plant disease classifier for AgriSathi.
+
+The model (through one of the runtimes in backends.py) and the class map are
+loaded once per server process and the same DiseaseModel instance is handed
+to every Streamlit session.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from backends import create_backend
+from preprocessing import normalize_into, resize_to_input
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLASSES_PATH = os.path.join(BASE_DIR, "classes.json")
+
+# "keras" (full TensorFlow, .h5) or "tflite" (converted model, no TensorFlow needed)
+DEFAULT_BACKEND = os.environ.get("AGRISATHI_MODEL_BACKEND", "keras")
+
+
+def load_class_map(classes_path=CLASSES_PATH):
+    """Read classes.json and return the labels ordered by class index"""
+    with open(classes_path, "r", encoding="utf-8") as f:
+        class_map = json.load(f)
+    return [class_map[key] for key in sorted(class_map, key=int)]
+
+
+def has_real_labels(labels):
+    """False when the class map only has generated names ("class_0", ...) rather than crop/disease labels"""
+    return not all(re.fullmatch(r"class_\d+", label) for label in labels)
+
+
+def model_version(*paths):
+    """Short content hash identifying a model file + class map pair"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def top_k(probs, labels, k=3):
+    """Turn a (N, num_classes) probability matrix into [(label, prob), ...] per row"""
+    probs = np.atleast_2d(probs)
+    k = min(k, probs.shape[1])
+    # argpartition is O(num_classes); only the k winners get sorted
+    top = np.argpartition(-probs, k - 1, axis=1)[:, :k]
+    top_probs = np.take_along_axis(probs, top, axis=1)
+    order = np.argsort(-top_probs, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_probs = np.take_along_axis(top_probs, order, axis=1)
+    return [
+        [(labels[idx], float(p)) for idx, p in zip(row_idx, row_probs)]
+        for row_idx, row_probs in zip(top, top_probs)
+    ]
+
+
+class DiseaseModel:
+    """
+    Wraps an inference backend (see backends.py) together with its class
+    labels. Call load() once, then predict()/classify() from any thread.
+    """
+
+    def __init__(self, model_path=None, classes_path=CLASSES_PATH, backend=DEFAULT_BACKEND):
+        self.backend = create_backend(backend, model_path)
+        self.model_path = self.backend.model_path
+        self.classes_path = classes_path
+        self.model = None
+        self.labels = []
+        self.input_shape = None
+        self.version = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Deserialize the model and class map (no-op if already loaded)"""
+        with self._lock:
+            if self.model is not None:
+                return self
+
+            backend = self.backend.load()
+            labels = load_class_map(self.classes_path)
+
+            if backend.num_classes != len(labels):
+                raise ValueError(
+                    f"Model has {backend.num_classes} outputs but "
+                    f"{self.classes_path} lists {len(labels)} classes"
+                )
+
+            # (height, width, channels) expected by the first layer
+            self.input_shape = backend.input_shape
+            self.labels = labels
+            self.version = model_version(self.model_path, self.classes_path)
+            self.model = backend
+        return self
+
+    @property
+    def is_loaded(self):
+        return self.model is not None
+
+    def warmup(self, batch_size=1):
+        """Run a dummy forward pass so the first real request does not pay for graph tracing"""
+        self.load()
+        dummy = np.zeros((batch_size,) + self.input_shape, dtype=np.float32)
+        self.predict(dummy)
+
+    def prepare_image(self, image):
+        """Convert a PIL image into a normalized (1, H, W, C) float32 batch"""
+        self.load()
+        height, width = self.input_shape[:2]
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        batch = np.empty((1,) + self.input_shape, dtype=np.float32)
+        normalize_into(np.asarray(resize_to_input(image, (width, height))), batch[0])
+        return batch
+
+    def predict(self, batch):
+        """Return class probabilities with shape (N, num_classes)"""
+        self.load()
+        return self.model.predict(batch)
+
+    def top_k(self, probs, k=3):
+        """Turn a (N, num_classes) probability matrix into [(label, prob), ...] per row"""
+        return top_k(probs, self.labels, k)
+
+    def classify(self, batch, k=3):
+        """Predict a batch and return its top-k classes"""
+        return self.top_k(self.predict(batch), k=k)
+
+    def classify_image(self, image, k=3):
+        """Convenience wrapper for a single PIL image"""
+        return self.classify(self.prepare_image(image), k=k)[0]
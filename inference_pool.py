@@ -0,0 +1,492 @@
+"""
+Out-of-process inference for the disease model.
+
+BatchingQueue runs the model on a thread of the Streamlit server, so a
+saturated model competes with every session's script thread for the GIL
+and reruns slow down. InferencePool moves the model into worker processes:
+
+- each worker loads its own DiseaseModel once and micro-batches whatever has
+  arrived on its pipe; the parent sends each request to the live worker with
+  the fewest requests outstanding;
+- images travel through one block of shared memory, one uint8 slot per
+  in-flight request; only (request id, slot, deadline) goes over the pipe;
+- a request needs a free slot, so at most `slots` requests are in flight and
+  submit() raises PoolBusy instead of queueing without bound;
+- every request has a deadline: workers skip requests that expired while
+  queued, and the caller's Future fails with TimeoutError either way;
+- a worker that crashes, or hangs well past its requests' deadlines, is
+  replaced and only the requests it held fail. Workers are recycled after
+  max_requests, and restart_workers() swaps them all; in both cases the old
+  worker keeps serving until its replacement has loaded the model;
+- whenever fewer workers are ready or loading than configured, the monitor
+  starts more, backing off while they keep failing to load.
+
+Each worker has its own pipe rather than sharing a multiprocessing.Queue:
+a process killed while holding a shared queue's lock would wedge the others.
+
+The parent process never imports TensorFlow: labels and the model version
+come from the class map and the model file, the input shape from the first
+worker that comes up.
+"""
+import atexit
+import itertools
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from disease_model import CLASSES_PATH, DEFAULT_BACKEND, load_class_map, model_version, top_k
+
+logger = logging.getLogger(__name__)
+
+# A worker still holding requests this long past their deadline is considered hung
+HANG_GRACE = 30.0
+# Delay before starting a worker again after one failed to load, doubling up to the cap
+RESPAWN_BACKOFF = 1.0
+RESPAWN_BACKOFF_MAX = 60.0
+
+
+class PoolBusy(queue.Full):
+    """Every shared-memory slot is in use; the caller should retry later"""
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process running a request died before answering"""
+
+
+def _worker_main(conn, model_path, classes_path, backend, max_batch_size, max_requests):
+    """Worker process: load the model, then answer batches of requests until sent None"""
+    # Ctrl-C is for the server; it shuts the pool down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from disease_model import DiseaseModel
+    from preprocessing import normalize_into
+
+    try:
+        model = DiseaseModel(model_path, classes_path, backend=backend)
+        model.warmup(max_batch_size)
+    except Exception as e:
+        conn.send(("failed", repr(e)))
+        return
+    conn.send(("ready", model.input_shape, model.version))
+
+    batch_buffer = np.empty((max_batch_size,) + model.input_shape, dtype=np.float32)
+    shm, slots_view = None, None
+    served = 0
+    stop = False
+    while not stop:
+        try:
+            batch = [conn.recv()]
+            while len(batch) < max_batch_size and conn.poll():
+                batch.append(conn.recv())
+        except EOFError:
+            # The parent went away
+            break
+        if None in batch:
+            stop = True
+            batch = batch[:batch.index(None)]
+
+        now = time.monotonic()
+        live = []
+        for task in batch:
+            if task[3] > now:
+                live.append(task)
+            else:
+                # Expired while queued: answered without reading the slot
+                conn.send(("expired", task[0]))
+        if live:
+            shm_name = live[0][1]
+            if shm is None or shm.name != shm_name:
+                slots_view = None
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+                slots_view = np.ndarray((shm.size // int(np.prod(model.input_shape)),) + model.input_shape,
+                                        dtype=np.uint8, buffer=shm.buf)
+            try:
+                for row, task in zip(batch_buffer, live):
+                    normalize_into(slots_view[task[2]], row)
+                outputs = model.predict(batch_buffer[:len(live)])
+            except Exception as e:
+                for task in live:
+                    conn.send(("error", task[0], repr(e)))
+            else:
+                for row, task in zip(outputs, live):
+                    conn.send(("done", task[0], np.array(row)))
+
+        served += len(batch)
+        if max_requests and served >= max_requests > served - len(batch):
+            # Keep serving until the replacement is up and sends None
+            conn.send(("recycle", served))
+
+    slots_view = None
+    if shm is not None:
+        shm.close()
+
+
+class _Worker:
+    """Parent-side handle on one worker process"""
+
+    def __init__(self, worker_id, process, conn, replaces=None):
+        self.id = worker_id
+        self.process = process
+        self.conn = conn
+        self.replaces = replaces  # worker to retire once this one is ready
+        self.send_lock = threading.Lock()
+        self.requests = set()
+        self.ready = False
+        self.replacing = False  # a replacement is loading; keep serving until it is ready
+        self.retiring = False  # sent None; no new requests
+        self.failed = False
+
+
+class InferencePool:
+    """
+    Worker processes running the disease model, fed through shared memory.
+    Exposes version, labels, input_shape and top_k() like DiseaseModel and
+    submit()/predict() like BatchingQueue.
+    """
+
+    def __init__(self, workers=1, slots=32, max_batch_size=16, deadline=30.0, max_requests=0,
+                 model_path=None, classes_path=CLASSES_PATH, backend=DEFAULT_BACKEND):
+        from backends import create_backend
+
+        self.workers = workers
+        self.slots = slots
+        self.max_batch_size = max_batch_size
+        self.deadline = deadline
+        self.max_requests = max_requests
+        self.model_path = create_backend(backend, model_path).model_path
+        self.classes_path = classes_path
+        self.backend = backend
+        self.labels = load_class_map(classes_path)
+        self.version = model_version(self.model_path, classes_path)
+        self.input_shape = None
+
+        # spawn, not fork: the server process is full of threads
+        self._ctx = multiprocessing.get_context("spawn")
+        self._shm = None
+        self._slots_view = None
+        self._free = list(range(slots))
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._request_ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._pending = {}  # request id -> (future, slot, deadline, worker)
+        self._workers = {}  # worker id -> _Worker
+        self._startup_error = None  # set only if no worker ever loaded the model
+        self._ever_ready = False
+        self._respawn_delay = 0.0
+        self._respawn_at = 0.0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "expired": 0,
+            "rejected": 0,
+            "crashed": 0,
+            "restarts": 0,
+        }
+        self._threads = []
+
+    def start(self):
+        for _ in range(self.workers):
+            self._spawn()
+        for target, name in ((self._collect, "inference-results"), (self._monitor, "inference-monitor")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self.shutdown)
+        return self
+
+    def _spawn(self, replaces=None):
+        parent_conn, child_conn = self._ctx.Pipe()
+        worker_id = next(self._worker_ids)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.model_path, self.classes_path, self.backend,
+                  self.max_batch_size, self.max_requests),
+            name=f"inference-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        with self._lock:
+            self._workers[worker_id] = _Worker(worker_id, process, parent_conn, replaces)
+
+    def wait_ready(self, timeout=None):
+        """Block until a worker has loaded the model; raises if none could"""
+        if not self._ready.wait(timeout):
+            raise TimeoutError("No inference worker is ready yet")
+        if self._startup_error is not None:
+            raise RuntimeError(f"Inference workers failed to load the model: {self._startup_error}")
+        return self
+
+    # Requests
+
+    def submit(self, sample, deadline=None):
+        """
+        Copy one uint8 (H, W, C) sample into shared memory and return a Future
+        of its probability row. Raises PoolBusy when every slot is in use.
+        """
+        if self._stop.is_set():
+            raise RuntimeError("InferencePool is shut down")
+        self.wait_ready(self.deadline)
+        expires = time.monotonic() + (deadline or self.deadline)
+        future = Future()
+        with self._lock:
+            if not self._free:
+                self._stats["rejected"] += 1
+                raise PoolBusy(f"All {self.slots} inference slots are busy")
+            candidates = [worker for worker in self._workers.values() if not worker.retiring and not worker.failed]
+            if not candidates:
+                raise RuntimeError("No inference worker is running")
+            # Ready workers first, then the least loaded
+            worker = min(candidates, key=lambda w: (not w.ready, len(w.requests)))
+            slot = self._free.pop()
+            request_id = next(self._request_ids)
+            self._pending[request_id] = (future, slot, expires, worker)
+            worker.requests.add(request_id)
+            self._stats["submitted"] += 1
+
+        self._slots_view[slot] = sample
+        try:
+            with worker.send_lock:
+                worker.conn.send((request_id, self._shm.name, slot, expires))
+        except (OSError, ValueError) as e:
+            # The worker died under us; the monitor replaces it
+            self._finish(request_id, error=WorkerCrashed(str(e)), counter="failed")
+        return future
+
+    def predict(self, sample, timeout=None):
+        """Blocking helper: submit a sample and wait for its result until the deadline"""
+        timeout = timeout or self.deadline
+        # The monitor fails the future at the deadline; the margin only covers its polling
+        return self.submit(sample, deadline=timeout).result(timeout + 1.0)
+
+    def top_k(self, probs, k=3):
+        return top_k(probs, self.labels, k)
+
+    # Results
+
+    def _settle(self, future, result=None, error=None, counter="completed"):
+        """Resolve a future once; an answer arriving after the deadline already failed it is dropped"""
+        try:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        except InvalidStateError:
+            return
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _finish(self, request_id, result=None, error=None, counter="completed"):
+        """Free a request's slot (no worker will read it again) and resolve its future"""
+        with self._lock:
+            entry = self._pending.pop(request_id, None)
+            if entry is None:
+                return
+            future, slot, _, worker = entry
+            worker.requests.discard(request_id)
+            self._free.append(slot)
+        self._settle(future, result, error, counter)
+
+    def _collect(self):
+        while not self._stop.is_set():
+            with self._lock:
+                workers = {worker.conn: worker for worker in self._workers.values() if not worker.conn.closed}
+            if not workers:
+                time.sleep(0.1)
+                continue
+            try:
+                readable = wait(list(workers), timeout=0.5)
+            except (OSError, ValueError):
+                # A connection was closed by the monitor meanwhile
+                continue
+            for conn in readable:
+                worker = workers[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # Dead worker; the monitor fails its requests and replaces it
+                    conn.close()
+                    continue
+                try:
+                    self._handle(worker, message)
+                except Exception:
+                    # This thread delivers every result; losing it would strand all later requests
+                    logger.exception("Failed to handle %r from inference worker %d", message[0], worker.id)
+
+    def _handle(self, worker, message):
+        kind = message[0]
+        if kind == "done":
+            self._finish(message[1], result=message[2])
+        elif kind == "error":
+            self._finish(message[1], error=RuntimeError(message[2]), counter="failed")
+        elif kind == "expired":
+            self._finish(message[1], error=TimeoutError("Inference deadline passed while queued"), counter="expired")
+        elif kind == "ready":
+            _, input_shape, version = message
+            if self.input_shape is None:
+                self._open_slots(input_shape)
+            if version != self.version:
+                logger.warning("Inference worker %d loaded model %s, expected %s", worker.id, version, self.version)
+            worker.ready = True
+            with self._lock:
+                self._ever_ready = True
+                self._startup_error = None
+                self._respawn_delay = 0.0
+            self._ready.set()
+            if worker.replaces is not None:
+                self._retire(worker.replaces)
+        elif kind == "failed":
+            logger.error("Inference worker %d failed to load the model: %s", worker.id, message[1])
+            worker.failed = True
+            if worker.replaces is not None:
+                # Keep the old worker rather than end up with none
+                with self._lock:
+                    old = self._workers.get(worker.replaces)
+                if old is not None:
+                    old.replacing = False
+            with self._lock:
+                # Later failures are retried by the monitor, with a growing delay
+                self._respawn_delay = min(max(self._respawn_delay * 2, RESPAWN_BACKOFF), RESPAWN_BACKOFF_MAX)
+                self._respawn_at = time.monotonic() + self._respawn_delay
+                workers = list(self._workers.values())
+                startup_failed = not self._ever_ready and all(w.failed for w in workers)
+                if startup_failed:
+                    self._startup_error = message[1]
+            if startup_failed:
+                self._ready.set()
+        elif kind == "recycle":
+            logger.info("Inference worker %d served %d requests, recycling it", worker.id, message[1])
+            self._replace(worker)
+
+    def _open_slots(self, input_shape):
+        input_shape = tuple(input_shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * int(np.prod(input_shape)))
+        self._slots_view = np.ndarray((self.slots,) + input_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self.input_shape = input_shape
+
+    def _replace(self, worker):
+        """Start a new worker; the old one is retired as soon as the new one is ready"""
+        with self._lock:
+            if worker.replacing or worker.retiring:
+                return
+            worker.replacing = True
+            self._stats["restarts"] += 1
+        self._spawn(replaces=worker.id)
+
+    def _retire(self, worker_id):
+        with self._lock:
+            worker = self._workers.get(worker_id)
+            if worker is None:
+                return
+            worker.retiring = True
+        try:
+            with worker.send_lock:
+                worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+
+    def restart_workers(self):
+        """Replace every worker, e.g. after the model file changed, without a gap in service"""
+        with self._lock:
+            workers = [worker for worker in self._workers.values() if not worker.retiring and not worker.failed]
+        for worker in workers:
+            self._replace(worker)
+
+    def _monitor(self):
+        while not self._stop.wait(0.5):
+            now = time.monotonic()
+            with self._lock:
+                workers = list(self._workers.values())
+                overdue = [entry for entry in self._pending.values() if entry[2] < now]
+
+            # Callers stop waiting at the deadline; the slot stays taken until the worker answers
+            for future, _, _, _ in overdue:
+                self._settle(future, error=TimeoutError("Inference deadline passed"), counter="expired")
+
+            for worker in workers:
+                if worker.process.is_alive():
+                    with self._lock:
+                        deadlines = [self._pending[r][2] for r in worker.requests]
+                    if not deadlines or min(deadlines) + HANG_GRACE > now:
+                        continue
+                    logger.error("Inference worker %d is hung, killing it", worker.id)
+                    worker.process.kill()
+                    worker.process.join(5)
+                self._reap(worker)
+            self._top_up()
+
+    def _top_up(self):
+        """Start workers until as many are ready or loading as configured, e.g. after crashes or failed loads"""
+        with self._lock:
+            if not self._ever_ready or self._stop.is_set() or time.monotonic() < self._respawn_at:
+                return
+            running = sum(1 for w in self._workers.values() if not w.retiring and not w.failed)
+            missing = self.workers - running
+            self._stats["restarts"] += max(missing, 0)
+        for _ in range(missing):
+            logger.warning("Starting an inference worker (%d of %d running)", running, self.workers)
+            self._spawn()
+
+    def _reap(self, worker):
+        """Clean up after a worker process that has exited"""
+        worker.process.join(0)
+        exitcode = worker.process.exitcode
+        with self._lock:
+            self._workers.pop(worker.id, None)
+            held = list(worker.requests)
+        worker.conn.close()
+        # Whatever it held can no longer be answered, and its slots are safe to reuse
+        for request_id in held:
+            self._finish(request_id, error=WorkerCrashed(f"Inference worker {worker.id} exited with {exitcode}"),
+                         counter="failed")
+        if worker.retiring or worker.failed or self._stop.is_set():
+            return
+        logger.error("Inference worker %d exited with %s", worker.id, exitcode)
+        with self._lock:
+            self._stats["crashed"] += 1
+        # The monitor's _top_up() starts another unless a replacement is already loading
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._pending)
+            stats["free_slots"] = len(self._free)
+            stats["workers_ready"] = sum(worker.ready and not worker.retiring for worker in self._workers.values())
+        return stats
+
+    def shutdown(self, timeout=10):
+        """Stop the workers, fail whatever is still pending and free the shared memory"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        with self._lock:
+            workers = list(self._workers.values())
+        for worker in workers:
+            self._retire(worker.id)
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.conn.close()
+        with self._lock:
+            pending = list(self._pending)
+        for request_id in pending:
+            self._finish(request_id, error=RuntimeError("InferencePool is shut down"), counter="failed")
+        if self._shm is not None:
+            self._slots_view = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
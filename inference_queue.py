@@ -0,0 +1,141 @@
+"""
+Micro-batching request queue for the disease model.
+
+Streamlit runs every session in its own script thread. Instead of each thread
+calling the model with a single image, images are put on a shared queue and a
+worker thread runs them through the model in batches. A batch is flushed as
+soon as it holds max_batch_size images or the oldest image has waited
+max_wait_ms milliseconds, whichever comes first.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class BatchingQueue:
+    """
+    Collects single samples from many threads and feeds them to predict_fn
+    as one stacked batch. submit() returns a Future that resolves to the
+    prediction row for that sample.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=10, max_queue_size=0, collate_fn=np.stack):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_fn = predict_fn
+        # Builds the model input from a list of samples; ImagePreprocessor.collate
+        # normalizes uint8 samples into a preallocated buffer instead of stacking
+        self.collate_fn = collate_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "total_wait_s": 0.0,
+            "total_inference_s": 0.0,
+        }
+
+    def start(self):
+        """Start the batching worker thread (idempotent)"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the worker after it drains the samples already queued"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def submit(self, sample, block=True, timeout=None):
+        """
+        Queue one sample (e.g. an (H, W, C) array) and return a Future for its
+        prediction. Raises queue.Full if the queue is bounded and full.
+        """
+        if self._stop.is_set():
+            raise RuntimeError("BatchingQueue is stopped")
+        future = Future()
+        self._queue.put((sample, future, time.perf_counter()), block=block, timeout=timeout)
+        with self._stats_lock:
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queue.qsize())
+        return future
+
+    def predict(self, sample, timeout=None):
+        """Blocking helper: submit a sample and wait for its result"""
+        return self.submit(sample).result(timeout=timeout)
+
+    def stats(self):
+        """Snapshot of queue-depth and throughput counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_ms"] = self.max_wait * 1000.0
+        batches = stats["batches"]
+        done = stats["completed"] + stats["failed"]
+        stats["avg_batch_size"] = done / batches if batches else 0.0
+        stats["avg_wait_ms"] = stats["total_wait_s"] * 1000.0 / done if done else 0.0
+        return stats
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until the batch is full or max_wait expires"""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            # Callers may have given up on their future (e.g. a closed session)
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            try:
+                samples = self.collate_fn([item[0] for item in batch])
+                outputs = self.predict_fn(samples)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                failed = len(batch)
+            else:
+                for row, (_, future, _) in zip(outputs, batch):
+                    future.set_result(row)
+                failed = 0
+            finished = time.perf_counter()
+
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["completed"] += len(batch) - failed
+                self._stats["failed"] += failed
+                self._stats["total_wait_s"] += sum(started - queued_at for _, _, queued_at in batch)
+                self._stats["total_inference_s"] += finished - started
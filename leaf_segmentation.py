@@ -0,0 +1,109 @@
+"""
+Leaf segmentation and tiling ahead of the disease classifier.
+
+The model was trained on single, centred leaves, but farmers photograph
+whole plants. LeafTiler masks plant-coloured pixels in HSV, splits the mask
+into connected regions and crops the largest ones into their own tiles at
+model resolution. The tiles are classified as one batch and aggregate()
+combines the per-leaf predictions, weighting each leaf by its area.
+
+Everything runs on the compact ingested frame (a few hundred pixels a side)
+with OpenCV's vectorized kernels, and connectedComponentsWithStats returns
+every region's box and area in one call, so tiling costs a few milliseconds
+next to the forward pass.
+"""
+import cv2
+import numpy as np
+
+# OpenCV hue runs 0-179: ~10 is brown, ~30 yellow, ~60 green, ~90 blue-green.
+# Yellowing leaves stay in the mask; brown is left out because it is mostly
+# soil. Brown lesions are holes inside a leaf region and do not change its
+# bounding box. Grey soil, sky and deep shadow fail the saturation and
+# value floors.
+LEAF_HSV_LOW = np.array([20, 50, 30], dtype=np.uint8)
+LEAF_HSV_HIGH = np.array([95, 255, 255], dtype=np.uint8)
+
+
+def aggregate(probs, weights):
+    """One (num_classes,) probability row from per-tile rows, weighted (e.g. by leaf area)"""
+    weights = np.asarray(weights, dtype=np.float32)
+    return (weights / weights.sum()) @ np.atleast_2d(probs)
+
+
+class LeafTiler:
+    """
+    Splits an RGB frame into per-leaf uint8 tiles of the model's input shape.
+    Falls back to the whole frame when no leaf region is large enough.
+    """
+
+    def __init__(self, input_shape, max_leaves=6, min_area=0.02, margin=0.1):
+        self.height, self.width = input_shape[:2]
+        self.max_leaves = max_leaves
+        # Smallest region worth a tile, as a fraction of the frame
+        self.min_area = min_area
+        # Context kept around each leaf, as a fraction of its size
+        self.margin = margin
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+    def mask(self, pixels):
+        """uint8 mask (255 = leaf) of an (H, W, 3) RGB frame"""
+        hsv = cv2.cvtColor(pixels, cv2.COLOR_RGB2HSV)
+        mask = cv2.inRange(hsv, LEAF_HSV_LOW, LEAF_HSV_HIGH)
+        # Fill lesions and specks inside leaves, then drop isolated background specks
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self._kernel, iterations=2)
+        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+
+    def find_leaves(self, pixels):
+        """[(x, y, w, h, area)] of the largest leaf regions, largest first"""
+        if self.max_leaves < 1:
+            return []
+        _, _, stats, _ = cv2.connectedComponentsWithStats(self.mask(pixels), connectivity=8)
+        stats = stats[1:]  # row 0 is the background
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area * pixels.shape[0] * pixels.shape[1]]
+        order = np.argsort(-stats[:, cv2.CC_STAT_AREA])[:self.max_leaves]
+        return [tuple(int(v) for v in row) for row in stats[order]]
+
+    def crop_box(self, box, frame_height, frame_width):
+        """Grow a leaf's box by the margin to the model's aspect ratio, kept inside the frame"""
+        x, y, w, h = box[:4]
+        aspect = self.width / self.height
+        w, h = w * (1 + 2 * self.margin), h * (1 + 2 * self.margin)
+        if w / h < aspect:
+            w = h * aspect
+        else:
+            h = w / aspect
+        w, h = min(int(round(w)), frame_width), min(int(round(h)), frame_height)
+        cx, cy = box[0] + box[2] / 2, box[1] + box[3] / 2
+        left = int(min(max(cx - w / 2, 0), frame_width - w))
+        top = int(min(max(cy - h / 2, 0), frame_height - h))
+        return left, top, w, h
+
+    def tiles(self, pixels):
+        """
+        (tiles, boxes, weights) for an (H, W, 3) uint8 RGB frame: an
+        (N, height, width, 3) uint8 array, the crop box (x, y, w, h) of each
+        tile in the frame, and each tile's leaf area for aggregate().
+        """
+        frame_height, frame_width = pixels.shape[:2]
+        leaves = self.find_leaves(pixels)
+        if not leaves:
+            leaves = [(0, 0, frame_width, frame_height, frame_width * frame_height)]
+
+        tiles = np.empty((len(leaves), self.height, self.width, 3), dtype=np.uint8)
+        boxes = []
+        for tile, leaf in zip(tiles, leaves):
+            left, top, w, h = self.crop_box(leaf, frame_height, frame_width)
+            cv2.resize(pixels[top:top + h, left:left + w], (self.width, self.height), dst=tile,
+                       interpolation=cv2.INTER_AREA)
+            boxes.append((left, top, w, h))
+        return tiles, boxes, [leaf[4] for leaf in leaves]
+
+    def annotate(self, pixels, boxes, quality=85):
+        """JPEG of the frame with each tile's box drawn and numbered, for the preview"""
+        out = cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+        thickness = max(1, min(out.shape[:2]) // 200)
+        for number, (left, top, w, h) in enumerate(boxes, 1):
+            cv2.rectangle(out, (left, top), (left + w - 1, top + h - 1), (0, 255, 255), thickness)
+            cv2.putText(out, str(number), (left + 4 * thickness, top + 14 * thickness), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.5 * thickness, (0, 255, 255), thickness)
+        return cv2.imencode(".jpg", out, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
@@ -0,0 +1,210 @@
+"""
+Precompiled per-language message bundles.
+
+Every string in app_data (ui_text, the crop and disease databases and the
+tip/scheme lists) gets an integer message ID. The build step writes one
+shared index plus one compact binary bundle per language:
+
+    locale/index.json   message key -> ID, list key -> (first ID, count)
+    locale/<lang>.bin   header, uint32 offset table, UTF-8 string blob
+
+Bundles are opened with mmap, so every lookup is an offset-table read and a
+slice of the mapped file, with no dict walking and no translator calls at
+render time. The tip and scheme lists are translated once during the build:
+
+    python localization.py build
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from app_data import crop_database, disease_database, farming_tips, government_schemes, soil_tips, ui_text
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCALE_DIR = os.path.join(BASE_DIR, "locale")
+LANGUAGES = ("en", "hi", "pa")
+
+MAGIC = b"AGLB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHI")  # magic, format version, message count
+OFFSET = struct.Struct("<II")    # start/end of one message in the blob
+
+CROP_FIELDS = ("soil_type", "season", "water_requirements", "ph_range", "common_pests")
+DISEASE_FIELDS = ("symptoms", "treatment", "prevention")
+LISTS = {
+    "soil_tips": soil_tips,
+    "farming_tips": farming_tips,
+    "government_schemes": government_schemes,
+}
+
+
+def source_hash():
+    """Fingerprint of the source tables, stored in the index to detect stale bundles"""
+    tables = [ui_text, crop_database, disease_database, LISTS, FORMAT_VERSION]
+    payload = json.dumps(tables, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def collect_messages(lang, translate=None):
+    """
+    Return ([(key, text), ...], {list_name: (first_id, count)}) for a language.
+    Keys are enumerated from the English tables so IDs line up across
+    languages; missing translations fall back to English. `translate` is a
+    translate_many(texts, lang) callable used for the tip/scheme lists.
+    """
+    messages = []
+
+    for key, text in ui_text["en"].items():
+        messages.append(("ui." + key, ui_text[lang].get(key, text)))
+
+    for crop, info in crop_database.items():
+        localized = info.get(lang, info)
+        for field in CROP_FIELDS:
+            messages.append((f"crop.{crop}.{field}", localized.get(field, info[field])))
+
+    for crop, diseases in disease_database.items():
+        for disease, info in diseases.items():
+            localized = info.get(lang, info)
+            for field in DISEASE_FIELDS:
+                messages.append((f"disease.{crop}.{disease}.{field}", localized.get(field, info[field])))
+
+    lists = {}
+    for name, items in LISTS.items():
+        if lang != "en" and translate is not None:
+            items = translate(items, lang)
+        lists[name] = (len(messages), len(items))
+        messages.extend((f"list.{name}.{i}", text) for i, text in enumerate(items))
+
+    return messages, lists
+
+
+def encode_bundle(texts):
+    """Serialize a list of strings into the binary bundle format"""
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return (
+        HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded))
+        + struct.pack(f"<{len(offsets)}I", *offsets)
+        + b"".join(encoded)
+    )
+
+
+class LocaleBundle:
+    """
+    Read-only view over one language's bundle. `bundle["title"]` looks up a
+    ui_text key; crop(), disease() and list() cover the other tables.
+    """
+
+    def __init__(self, lang, index, buffer):
+        magic, version, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not an AgriSathi locale bundle (format {version})")
+        if count != len(index["messages"]):
+            raise ValueError(f"Bundle for '{lang}' has {count} messages, index has {len(index['messages'])}")
+        self.lang = lang
+        self._ids = index["messages"]
+        self._lists = index["lists"]
+        self._buffer = buffer
+        self._blob_start = HEADER.size + 4 * (count + 1)
+
+    def text(self, message_id):
+        start, end = OFFSET.unpack_from(self._buffer, HEADER.size + 4 * message_id)
+        return self._buffer[self._blob_start + start:self._blob_start + end].decode("utf-8")
+
+    def get(self, key, default=None):
+        message_id = self._ids.get(key)
+        return default if message_id is None else self.text(message_id)
+
+    def __getitem__(self, key):
+        return self.text(self._ids["ui." + key])
+
+    def crop(self, crop, field):
+        return self.get(f"crop.{crop}.{field}", "")
+
+    def disease(self, crop, disease, field):
+        return self.get(f"disease.{crop}.{disease}.{field}", "")
+
+    def list(self, name):
+        first, count = self._lists[name]
+        return [self.text(message_id) for message_id in range(first, first + count)]
+
+
+def build_index(messages, lists):
+    return {
+        "source_hash": source_hash(),
+        "languages": list(LANGUAGES),
+        "messages": {key: message_id for message_id, (key, _) in enumerate(messages)},
+        "lists": lists,
+    }
+
+
+def build(locale_dir=LOCALE_DIR, translate=None):
+    """Compile every language into locale_dir; returns {lang: bundle size in bytes}"""
+    os.makedirs(locale_dir, exist_ok=True)
+    sizes = {}
+    index = None
+    for lang in LANGUAGES:
+        messages, lists = collect_messages(lang, translate)
+        if index is None:
+            index = build_index(messages, lists)
+        elif lists != index["lists"]:
+            raise ValueError(f"Translated lists for '{lang}' changed length; IDs would not line up")
+        data = encode_bundle([text for _, text in messages])
+        with open(os.path.join(locale_dir, f"{lang}.bin"), "wb") as f:
+            f.write(data)
+        sizes[lang] = len(data)
+    with open(os.path.join(locale_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return sizes
+
+
+def compile_bundle(lang, translate=None):
+    """Build a bundle in memory (used when no up-to-date build is on disk)"""
+    messages, lists = collect_messages(lang, translate)
+    return LocaleBundle(lang, build_index(messages, lists), encode_bundle([text for _, text in messages]))
+
+
+def load_bundle(lang, locale_dir=LOCALE_DIR, translate=None):
+    """
+    mmap the prebuilt bundle for `lang`. Falls back to compiling it in memory
+    if the build is missing or was made from different source tables.
+    """
+    index_path = os.path.join(locale_dir, "index.json")
+    bundle_path = os.path.join(locale_dir, f"{lang}.bin")
+    if os.path.exists(index_path) and os.path.exists(bundle_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("source_hash") == source_hash():
+            with open(bundle_path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return LocaleBundle(lang, index, buffer)
+    return compile_bundle(lang, translate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile AgriSathi localization bundles")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--locale-dir", default=LOCALE_DIR)
+    parser.add_argument("--no-translate", action="store_true",
+                        help="Do not translate tip/scheme lists (they stay in English)")
+    args = parser.parse_args()
+
+    translate = None
+    if not args.no_translate:
+        from translation_cache import TranslationMemory
+        translate = TranslationMemory().translate_many
+
+    sizes = build(args.locale_dir, translate)
+    for lang, size in sizes.items():
+        print(f"{lang}: {size} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
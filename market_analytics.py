@@ -0,0 +1,197 @@
+"""
+Vectorized market analytics.
+
+Batch functions take a (commodities, ticks) price matrix and compute rolling
+means, EWMA, volatility, percent change and the up/down/flat trend for every
+commodity at once. TrendTracker keeps the same indicators incrementally: each
+new tick updates a commodity's running sums in O(1), without re-reading its
+history.
+
+Trends are reported with the "Trend" / "TrendClass" fields the Market Prices
+tab already renders.
+"""
+import threading
+
+import numpy as np
+
+# A price move smaller than this (₹/kg) counts as flat
+FLAT_THRESHOLD = 0.5
+DEFAULT_WINDOW = 7
+DEFAULT_ALPHA = 0.3
+
+TREND_ARROWS = np.array(["↑", "↓", "→"])
+TREND_CLASSES = np.array(["market-up", "market-down", "market-same"])
+
+
+def classify(change, threshold=FLAT_THRESHOLD):
+    """Map price changes to (arrows, css classes) arrays: up, down or flat"""
+    change = np.asarray(change, dtype=np.float64)
+    index = np.where(change > threshold, 0, np.where(change < -threshold, 1, 2))
+    return TREND_ARROWS[index], TREND_CLASSES[index]
+
+
+def rolling_mean(prices, window=DEFAULT_WINDOW):
+    """Simple moving average along the tick axis; the first window-1 ticks are NaN"""
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    out = np.full(prices.shape, np.nan)
+    if prices.shape[1] < window:
+        return out
+    csum = np.cumsum(prices, axis=1)
+    csum = np.concatenate([np.zeros((prices.shape[0], 1)), csum], axis=1)
+    out[:, window - 1:] = (csum[:, window:] - csum[:, :-window]) / window
+    return out
+
+
+def ewma(prices, alpha=DEFAULT_ALPHA):
+    """Exponentially weighted moving average along the tick axis"""
+    import pandas as pd
+
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    # pandas runs the recursion in C for every column at once
+    return pd.DataFrame(prices.T).ewm(alpha=alpha, adjust=False).mean().to_numpy().T
+
+
+def pct_change(prices, periods=1):
+    """Percent change versus `periods` ticks earlier; the first ticks are NaN"""
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    out = np.full(prices.shape, np.nan)
+    out[:, periods:] = (prices[:, periods:] / prices[:, :-periods] - 1.0) * 100.0
+    return out
+
+
+def volatility(prices, window=DEFAULT_WINDOW):
+    """Rolling standard deviation of tick-to-tick percent returns"""
+    returns = pct_change(prices)[:, 1:]
+    out = np.full(np.atleast_2d(prices).shape, np.nan)
+    if returns.shape[1] < window:
+        return out
+    csum = np.concatenate([np.zeros((returns.shape[0], 1)), np.cumsum(returns, axis=1)], axis=1)
+    csq = np.concatenate([np.zeros((returns.shape[0], 1)), np.cumsum(returns ** 2, axis=1)], axis=1)
+    sums = csum[:, window:] - csum[:, :-window]
+    squares = csq[:, window:] - csq[:, :-window]
+    variance = np.maximum(squares / window - (sums / window) ** 2, 0.0)
+    out[:, window:] = np.sqrt(variance)
+    return out
+
+
+def _optional(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def _rows(names, last, change, pct, sma, smoothed, vol, trends, trend_classes):
+    """One dict per commodity with the fields the Market Prices tab renders"""
+    return [
+        {
+            "Crop": name,
+            "Price (₹/kg)": round(float(last[i]), 1),
+            "Change": round(float(change[i]), 2),
+            "Change (%)": _optional(pct[i], 2),
+            "SMA": _optional(sma[i], 2),
+            "EWMA": round(float(smoothed[i]), 2),
+            "Volatility": _optional(vol[i], 3),
+            "Trend": str(trends[i]),
+            "TrendClass": str(trend_classes[i]),
+        }
+        for i, name in enumerate(names)
+    ]
+
+
+def summarize(names, prices, window=DEFAULT_WINDOW, alpha=DEFAULT_ALPHA, threshold=FLAT_THRESHOLD):
+    """
+    Latest indicators for every commodity in a (commodities, ticks) matrix,
+    as one dict per commodity with the fields the UI renders.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    last = prices[:, -1]
+    change = last - prices[:, -2] if prices.shape[1] > 1 else np.zeros(len(last))
+    trends, trend_classes = classify(change, threshold)
+    sma = rolling_mean(prices, window)[:, -1]
+    smoothed = ewma(prices, alpha)[:, -1]
+    vol = volatility(prices, window)[:, -1]
+    pct = pct_change(prices)[:, -1]
+    return _rows(names, last, change, pct, sma, smoothed, vol, trends, trend_classes)
+
+
+class TrendTracker:
+    """
+    Incremental indicators for a fixed set of commodities. Every update is
+    O(1) per commodity: a ring buffer holds the last `window` prices and
+    returns, and running sums are adjusted by the value entering and the
+    value leaving the window.
+    """
+
+    def __init__(self, names, window=DEFAULT_WINDOW, alpha=DEFAULT_ALPHA, threshold=FLAT_THRESHOLD):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.window = window
+        self.alpha = alpha
+        self.threshold = threshold
+        n = len(self.names)
+        self._prices = np.zeros((n, window))
+        self._returns = np.zeros((n, window))
+        self._price_sum = np.zeros(n)
+        self._return_sum = np.zeros(n)
+        self._return_sq_sum = np.zeros(n)
+        self._count = np.zeros(n, dtype=np.int64)
+        self.last = np.full(n, np.nan)
+        self.change = np.zeros(n)
+        self.ewma = np.full(n, np.nan)
+        self._lock = threading.Lock()
+
+    def update(self, name, price):
+        """Feed one new tick for one commodity"""
+        self.update_many([self.index[name]], [price])
+
+    def update_all(self, prices):
+        """Feed one new tick for every commodity, in `names` order"""
+        self.update_many(np.arange(len(self.names)), prices)
+
+    def update_many(self, rows, prices):
+        """Feed one tick each for the given (distinct) commodity rows"""
+        rows = np.asarray(rows, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        with self._lock:
+            count = self._count[rows]
+            slot = count % self.window
+            previous = self.last[rows]
+            has_previous = count > 0
+
+            # Simple moving average: add the new price, drop the one it overwrites
+            leaving = np.where(count >= self.window, self._prices[rows, slot], 0.0)
+            self._price_sum[rows] += prices - leaving
+            self._prices[rows, slot] = prices
+
+            # Returns feed the rolling volatility the same way
+            returns = np.where(has_previous, (prices / np.where(has_previous, previous, 1.0) - 1.0) * 100.0, 0.0)
+            return_count = np.maximum(count - 1, 0)
+            return_slot = return_count % self.window
+            leaving_return = np.where(has_previous & (return_count >= self.window),
+                                      self._returns[rows, return_slot], 0.0)
+            self._return_sum[rows] += np.where(has_previous, returns - leaving_return, 0.0)
+            self._return_sq_sum[rows] += np.where(has_previous, returns ** 2 - leaving_return ** 2, 0.0)
+            self._returns[rows, return_slot] = np.where(has_previous, returns, self._returns[rows, return_slot])
+
+            self.change[rows] = np.where(has_previous, prices - previous, 0.0)
+            self.ewma[rows] = np.where(has_previous, self.alpha * prices + (1 - self.alpha) * self.ewma[rows], prices)
+            self.last[rows] = prices
+            self._count[rows] = count + 1
+
+    def snapshot(self):
+        """Current indicators for every commodity, same fields as summarize()"""
+        with self._lock:
+            count = self._count.copy()
+            sma = np.where(count >= self.window, self._price_sum / self.window, np.nan)
+            n_returns = np.minimum(np.maximum(count - 1, 0), self.window)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = self._return_sum / n_returns
+                variance = np.maximum(self._return_sq_sum / n_returns - mean ** 2, 0.0)
+            vol = np.where(n_returns >= self.window, np.sqrt(variance), np.nan)
+            previous = self.last - self.change
+            with np.errstate(invalid="ignore", divide="ignore"):
+                pct = np.where(count > 1, self.change / previous * 100.0, np.nan)
+            trends, trend_classes = classify(self.change, self.threshold)
+            last = self.last.copy()
+            change = self.change.copy()
+            smoothed = self.ewma.copy()
+
+        return _rows(self.names, last, change, pct, sma, smoothed, vol, trends, trend_classes)
@@ -0,0 +1,180 @@
+"""
+Shared market data snapshots.
+
+Instead of every session fetching market prices for itself, one snapshot is
+fetched per refresh interval and served to all sessions. Concurrent requests
+for a stale snapshot wait for a single fetch. Snapshots live in process
+memory by default; with AGRISATHI_REDIS_URL set they are stored in a
+Redis-compatible server (Redis, Valkey, KeyDB, ...) so several app replicas
+share one snapshot and one upstream call per interval:
+
+    AGRISATHI_REDIS_URL=redis://localhost:6379/0 streamlit run agrisathi.py
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+MARKET_TTL = int(os.environ.get("AGRISATHI_MARKET_TTL", "300"))
+REDIS_URL = os.environ.get("AGRISATHI_REDIS_URL", "")
+FETCH_TIMEOUT = 30  # seconds to wait for a fetch running elsewhere
+
+
+class MemoryBackend:
+    """Snapshots in a dict; shared by the sessions of one process"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(value, fetched_at) or None"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, value, fetched_at):
+        with self._lock:
+            self._entries[key] = (value, fetched_at)
+
+    def acquire(self, key, timeout):
+        # In-process fetches are already coalesced by SnapshotCache
+        return True
+
+    def release(self, key):
+        pass
+
+
+class RedisBackend:
+    """
+    Snapshots stored as JSON in a Redis-compatible server. A short-lived
+    lock key makes one replica fetch while the others wait for its result.
+    """
+
+    def __init__(self, url=REDIS_URL, prefix="agrisathi:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._tokens = {}
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["fetched_at"]
+
+    def set(self, key, value, fetched_at):
+        payload = json.dumps({"value": value, "fetched_at": fetched_at}, ensure_ascii=False)
+        self.client.set(self.prefix + key, payload)
+
+    def acquire(self, key, timeout):
+        token = uuid.uuid4().hex
+        if self.client.set(self.prefix + key + ":lock", token, nx=True, px=int(timeout * 1000)):
+            self._tokens[key] = token
+            return True
+        return False
+
+    def release(self, key):
+        token = self._tokens.pop(key, None)
+        lock_key = self.prefix + key + ":lock"
+        # Only delete the lock if it is still ours (it may have expired and been retaken)
+        if token is not None and self.client.get(lock_key) == token.encode():
+            self.client.delete(lock_key)
+
+
+def create_backend(url=REDIS_URL):
+    return RedisBackend(url) if url else MemoryBackend()
+
+
+class SnapshotCache:
+    """
+    One snapshot per `ttl` seconds from `fetch`, shared by every caller.
+    get() returns the stored snapshot while it is fresh and otherwise
+    fetches a new one; callers arriving during a fetch wait for it. If a
+    fetch fails, the previous snapshot is served until the next attempt.
+    Snapshots must be JSON-serializable when a Redis backend is used.
+    """
+
+    def __init__(self, fetch, ttl=MARKET_TTL, backend=None, key="market", fetch_timeout=FETCH_TIMEOUT):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.key = key
+        self.fetch_timeout = fetch_timeout
+        self.fetches = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._inflight = None  # threading.Event of the fetch in progress in this process
+
+    def age(self):
+        """Seconds since the current snapshot was fetched, or None"""
+        entry = self.backend.get(self.key)
+        return time.time() - entry[1] if entry else None
+
+    def _fresh(self, entry):
+        return entry is not None and time.time() - entry[1] < self.ttl
+
+    def get(self):
+        """The current snapshot, fetching a new one only if it is stale"""
+        entry = self.backend.get(self.key)
+        if self._fresh(entry):
+            return entry[0]
+
+        with self._lock:
+            event = self._inflight
+            leader = event is None
+            if leader:
+                event = self._inflight = threading.Event()
+
+        if not leader:
+            event.wait(self.fetch_timeout)
+            entry = self.backend.get(self.key)
+            if entry is None:
+                raise RuntimeError("No market data snapshot is available yet")
+            return entry[0]
+
+        try:
+            return self._refresh(entry)
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+
+    def _refresh(self, stale):
+        if not self.backend.acquire(self.key, self.fetch_timeout):
+            # Another replica is fetching; wait for its snapshot to land
+            deadline = time.monotonic() + self.fetch_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.1)
+                entry = self.backend.get(self.key)
+                if self._fresh(entry):
+                    return entry[0]
+            if stale is not None:
+                return stale[0]
+            return self._fetch_and_store(None)
+        try:
+            # Another replica may have refreshed between our read and the lock
+            entry = self.backend.get(self.key)
+            if self._fresh(entry):
+                return entry[0]
+            return self._fetch_and_store(entry)
+        finally:
+            self.backend.release(self.key)
+
+    def _fetch_and_store(self, stale):
+        try:
+            value = self.fetch()
+        except Exception as e:
+            self.failures += 1
+            if stale is None:
+                raise
+            logger.warning("Market data fetch failed, serving the previous snapshot: %s", e)
+            return stale[0]
+        self.fetches += 1
+        self.backend.set(self.key, value, time.time())
+        return value
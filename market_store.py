@@ -0,0 +1,259 @@
+"""
+Historical market price store.
+
+Price ticks are stored column-wise as .npy files, partitioned by crop, mandi
+and month:
+
+    market_data/<crop>/<mandi>/<YYYY-MM>/timestamp.npy   int64, epoch seconds, sorted
+    market_data/<crop>/<mandi>/<YYYY-MM>/price.npy       float32, ₹/kg
+
+Each <YYYY-MM> entry is a symlink to a hidden version directory next to it.
+A write fills a new version and repoints the link in one rename, so readers
+always see a complete partition, old or new.
+
+Partitions are opened with np.load(mmap_mode="r"), so years of history for
+hundreds of commodities cost almost no resident memory, and a range query
+only touches the months it overlaps (binary search inside each one).
+
+Feeds are ingested from CSV file drops or from a JSON API:
+
+    python market_store.py ingest prices.csv
+    python market_store.py ingest-drop drop/        # ingest and archive every CSV dropped there
+    python market_store.py ingest-api http://localhost:8000/prices
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.environ.get("AGRISATHI_MARKET_STORE", os.path.join(BASE_DIR, "market_data"))
+
+COLUMNS = {"timestamp": np.int64, "price": np.float32}
+
+
+def _to_epoch_seconds(values):
+    """Accept epoch seconds, datetime64 values or date strings"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64)
+    return values.astype("datetime64[s]").astype(np.int64)
+
+
+def _month(timestamps):
+    return timestamps.astype("datetime64[s]").astype("datetime64[M]")
+
+
+class MarketStore:
+    """Columnar, month-partitioned price history with vectorized range queries"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def _partition_dir(self, crop, mandi, month):
+        return os.path.join(self.root, quote(crop, safe=""), quote(mandi, safe=""), str(month))
+
+    def crops(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(unquote(name) for name in os.listdir(self.root))
+
+    def mandis(self, crop):
+        crop_dir = os.path.join(self.root, quote(crop, safe=""))
+        if not os.path.isdir(crop_dir):
+            return []
+        return sorted(unquote(name) for name in os.listdir(crop_dir))
+
+    def _read_partition(self, path, attempts=3):
+        """Every column of a partition, all from the same version of it"""
+        for attempt in range(attempts):
+            # Resolve the link once, so a swap in between cannot mix columns of two versions
+            version = os.path.realpath(path)
+            try:
+                return {
+                    column: np.load(os.path.join(version, f"{column}.npy"), mmap_mode="r")
+                    for column in COLUMNS
+                }
+            except FileNotFoundError:
+                # That version was replaced and removed after we resolved it; resolve again
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(0.01)
+
+    def _write_partition(self, path, columns):
+        """Write all columns to a new version directory and atomically repoint the partition's link at it"""
+        parent, month = os.path.split(path)
+        os.makedirs(parent, exist_ok=True)
+        version = tempfile.mkdtemp(dir=parent, prefix=f".{month}-")
+        for column, values in columns.items():
+            np.save(os.path.join(version, f"{column}.npy"), values)
+
+        previous = None
+        if os.path.islink(path):
+            previous = os.path.realpath(path)
+        elif os.path.isdir(path):
+            # A partition written before versioning: move it aside (the one moment it is
+            # missing, which _read_partition retries over) and link it from now on
+            previous = tempfile.mkdtemp(dir=parent, prefix=f".{month}-")
+            os.replace(path, previous)
+        link = version + ".link"
+        # Relative target, so the store can be moved or mounted elsewhere
+        os.symlink(os.path.basename(version), link)
+        os.replace(link, path)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    def ingest(self, crops, mandis, timestamps, prices):
+        """
+        Add ticks given as parallel sequences. Each touched partition is merged
+        with what is already stored, sorted by time, and a tick for an existing
+        timestamp replaces the old value. Returns the number of ticks written.
+        """
+        crops = np.asarray(crops, dtype=object)
+        mandis = np.asarray(mandis, dtype=object)
+        timestamps = _to_epoch_seconds(timestamps)
+        prices = np.asarray(prices, dtype=np.float32)
+        months = _month(timestamps)
+
+        keys = np.array([f"{c}\x00{m}\x00{mo}" for c, m, mo in zip(crops, mandis, months)], dtype=object)
+        # Group rows by partition with one sort instead of a mask per partition
+        partitions, inverse = np.unique(keys, return_inverse=True)
+        grouped = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[grouped], np.arange(len(partitions) + 1))
+        for i, key in enumerate(partitions):
+            crop, mandi, month = key.split("\x00")
+            rows = grouped[bounds[i]:bounds[i + 1]]
+            path = self._partition_dir(crop, mandi, month)
+
+            new_ts, new_prices = timestamps[rows], prices[rows]
+            if os.path.exists(path):
+                old = self._read_partition(path)
+                new_ts = np.concatenate([old["timestamp"], new_ts])
+                new_prices = np.concatenate([old["price"], new_prices])
+
+            # Stable sort keeps arrival order for equal timestamps; keep the last arrival
+            order = np.argsort(new_ts, kind="stable")
+            new_ts, new_prices = new_ts[order], new_prices[order]
+            last = np.append(new_ts[1:] != new_ts[:-1], True)
+            self._write_partition(path, {"timestamp": new_ts[last], "price": new_prices[last]})
+        return len(timestamps)
+
+    def ingest_frame(self, frame):
+        """Ingest a DataFrame with crop, mandi, date (or timestamp) and price columns"""
+        time_column = "timestamp" if "timestamp" in frame.columns else "date"
+        return self.ingest(
+            frame["crop"].to_numpy(),
+            frame["mandi"].to_numpy(),
+            frame[time_column].to_numpy(),
+            frame["price"].to_numpy()
+        )
+
+    def ingest_csv(self, path):
+        import pandas as pd
+
+        return self.ingest_frame(pd.read_csv(path))
+
+    def ingest_api(self, url, timeout=(3.05, 30)):
+        """Pull a JSON list of {crop, mandi, date|timestamp, price} records"""
+        import pandas as pd
+        import requests
+
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        return self.ingest_frame(pd.DataFrame(response.json()))
+
+    def ingest_drop_dir(self, drop_dir):
+        """Ingest every CSV in drop_dir and move it to drop_dir/processed/"""
+        processed_dir = os.path.join(drop_dir, "processed")
+        os.makedirs(processed_dir, exist_ok=True)
+        total = 0
+        for name in sorted(os.listdir(drop_dir)):
+            path = os.path.join(drop_dir, name)
+            if name.lower().endswith(".csv") and os.path.isfile(path):
+                total += self.ingest_csv(path)
+                os.replace(path, os.path.join(processed_dir, name))
+        return total
+
+    def _months_between(self, crop, mandi, start, end):
+        mandi_dir = os.path.join(self.root, quote(crop, safe=""), quote(mandi, safe=""))
+        if not os.path.isdir(mandi_dir):
+            return []
+        first = None if start is None else str(_month(np.int64(start)))
+        last = None if end is None else str(_month(np.int64(end)))
+        # YYYY-MM directory names sort chronologically
+        return [
+            os.path.join(mandi_dir, month) for month in sorted(os.listdir(mandi_dir))
+            if not month.startswith(".")
+            and (first is None or month >= first) and (last is None or month <= last)
+        ]
+
+    def query(self, crop, mandi=None, start=None, end=None):
+        """
+        Ticks for a crop between start and end (inclusive), as
+        (timestamps int64[], prices float32[]) sorted by time. mandi=None
+        merges every mandi.
+        """
+        start = None if start is None else int(_to_epoch_seconds([start])[0])
+        end = None if end is None else int(_to_epoch_seconds([end])[0])
+        mandis = [mandi] if mandi is not None else self.mandis(crop)
+
+        ts_parts, price_parts = [], []
+        for name in mandis:
+            for path in self._months_between(crop, name, start, end):
+                part = self._read_partition(path)
+                ts = part["timestamp"]
+                lo = 0 if start is None else np.searchsorted(ts, start, side="left")
+                hi = len(ts) if end is None else np.searchsorted(ts, end, side="right")
+                ts_parts.append(ts[lo:hi])
+                price_parts.append(part["price"][lo:hi])
+
+        if not ts_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        timestamps = np.concatenate(ts_parts)
+        prices = np.concatenate(price_parts)
+        if len(mandis) > 1:
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, prices = timestamps[order], prices[order]
+        return timestamps, prices
+
+    def daily_mean(self, crop, mandi=None, start=None, end=None):
+        """Average price per calendar day: (days datetime64[D][], prices float32[])"""
+        timestamps, prices = self.query(crop, mandi, start, end)
+        if len(timestamps) == 0:
+            return np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.float32)
+        days, index = np.unique(timestamps // 86400, return_inverse=True)
+        sums = np.bincount(index, weights=prices)
+        counts = np.bincount(index)
+        return days.astype("datetime64[D]"), (sums / counts).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest market price feeds into the AgriSathi price store")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest = subparsers.add_parser("ingest", help="Ingest CSV files (crop, mandi, date, price)")
+    ingest.add_argument("files", nargs="+")
+    drop = subparsers.add_parser("ingest-drop", help="Ingest and archive every CSV in a drop directory")
+    drop.add_argument("drop_dir")
+    api = subparsers.add_parser("ingest-api", help="Ingest a JSON price feed")
+    api.add_argument("url")
+    args = parser.parse_args()
+
+    store = MarketStore(args.root)
+    if args.command == "ingest":
+        count = sum(store.ingest_csv(path) for path in args.files)
+    elif args.command == "ingest-drop":
+        count = store.ingest_drop_dir(args.drop_dir)
+    else:
+        count = store.ingest_api(args.url)
+    print(f"Ingested {count} price ticks into {args.root}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,398 @@
+"""
+Versioned disease classifiers with hot swap and percentage traffic splits.
+
+A JSON manifest names each model version (a model file + class map pair and
+the backend that runs it) and how much traffic each one gets:
+
+    {
+      "versions": {
+        "keras-2024-06": {"model": "plant-disease-model.h5", "classes": "classes.json", "backend": "keras"},
+        "int8-2024-07": {"model": "plant-disease-model.tflite", "classes": "classes.json", "backend": "tflite"}
+      },
+      "traffic": {"keras-2024-06": 90, "int8-2024-07": 10}
+    }
+
+Paths are relative to the manifest. Without a manifest the registry serves
+the single implicit version the app always had (plant-disease-model.h5 +
+classes.json on DEFAULT_BACKEND).
+
+The running app re-reads the manifest every few seconds. New versions, and
+versions whose files changed, are loaded and warmed up on a background
+thread and only then swapped into the routing table in one assignment, so
+requests never wait for a load. A replaced or removed version is closed
+after a drain delay. Until a version is ready its share of traffic goes to
+the others; if none of the live versions has a share, they keep the routes
+they had (or split evenly), so a loading or broken version never takes the
+service down.
+
+Routing is sticky: each session draws one bucket in [0, 1) and keeps its
+version as long as the split does not change. Every version keeps latency,
+confidence and error stats, which are logged periodically.
+
+    python model_registry.py list
+    python model_registry.py add int8-2024-07 --model plant-disease-model.tflite --backend tflite
+    python model_registry.py traffic keras-2024-06=90 int8-2024-07=10
+    python model_registry.py remove keras-2024-06
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from backends import create_backend
+from disease_model import CLASSES_PATH, DEFAULT_BACKEND, model_version
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.environ.get("AGRISATHI_MODEL_REGISTRY", os.path.join(BASE_DIR, "models.json"))
+DEFAULT_VERSION = "default"
+
+
+def default_manifest():
+    """The implicit single-version manifest used when no manifest file exists"""
+    return {
+        "versions": {
+            DEFAULT_VERSION: {
+                "model": create_backend(DEFAULT_BACKEND).model_path,
+                "classes": CLASSES_PATH,
+                "backend": DEFAULT_BACKEND,
+            }
+        },
+        "traffic": {DEFAULT_VERSION: 100},
+    }
+
+
+def read_manifest(path=MANIFEST_PATH):
+    """Manifest with absolute file paths; the default manifest if the file does not exist"""
+    if not os.path.exists(path):
+        return default_manifest()
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    versions = {}
+    for name, spec in manifest.get("versions", {}).items():
+        versions[name] = {
+            "model": os.path.join(base, spec["model"]),
+            "classes": os.path.join(base, spec.get("classes", "classes.json")),
+            "backend": spec.get("backend", DEFAULT_BACKEND),
+        }
+    return {"versions": versions, "traffic": manifest.get("traffic", {})}
+
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    """Write atomically, so a polling app never reads half a manifest"""
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def spec_fingerprint(spec):
+    """Changes whenever the spec or either of its files changes"""
+    stats = []
+    for key in ("model", "classes"):
+        try:
+            stat = os.stat(spec[key])
+            stats.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stats.append(None)
+    return json.dumps([spec, stats], sort_keys=True)
+
+
+class VersionStats:
+    """Request count, errors, recent latencies and mean top-1 confidence of one version"""
+
+    def __init__(self, window=1000):
+        self.requests = 0
+        self.errors = 0
+        self.confidence_total = 0.0
+        self.latencies = deque(maxlen=window)
+        self.loaded_at = None
+        self.load_seconds = None
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "mean_confidence": round(self.confidence_total / self.requests, 3) if self.requests else None,
+            "load_seconds": self.load_seconds,
+        }
+
+
+class ModelRegistry:
+    """
+    Routes requests across the ready model versions of a manifest. `load`
+    turns a version spec into a served object (blocking until it is warm),
+    `close` releases one; the registry never looks inside them.
+    """
+
+    def __init__(self, load, close, manifest_path=MANIFEST_PATH, poll_seconds=10, drain_seconds=60,
+                 stats_log_seconds=300):
+        self._load = load
+        self._close = close
+        self.manifest_path = manifest_path
+        self.poll_seconds = poll_seconds
+        self.drain_seconds = drain_seconds
+        self.stats_log_seconds = stats_log_seconds
+
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        # (routes, active) replaced as one tuple on every change, so readers never need the lock:
+        # routes is ((cumulative share, name), ...), active is {name: (fingerprint, served)}
+        self._table = ((), {})
+        self._loading = {}  # name -> fingerprint being loaded
+        self._traffic = {}
+        self._stats = {}
+        self._failed = {}  # name -> fingerprint that failed to load; retried once the files change
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def _active(self):
+        return self._table[1]
+
+    @property
+    def _routes(self):
+        return self._table[0]
+
+    def start(self):
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="model-registry", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for _, served in self._active.values():
+            self._close(served)
+        self._table = ((), {})
+
+    def _run(self):
+        last_log = time.monotonic()
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Could not read model registry %s: %s", self.manifest_path, e)
+            if time.monotonic() - last_log >= self.stats_log_seconds:
+                last_log = time.monotonic()
+                for name, stats in self.stats().items():
+                    logger.info("Model %s: %s", name, stats)
+
+    # Loading and swapping
+
+    def refresh(self):
+        """Re-read the manifest and start loading versions that are new or whose files changed"""
+        manifest = read_manifest(self.manifest_path)
+        versions = manifest["versions"]
+
+        with self._lock:
+            self._traffic = manifest["traffic"] or {name: 1 for name in versions}
+            removed = [name for name in self._active if name not in versions]
+            # A version dropped from the manifest mid-load is closed when its load finishes
+            for name in [name for name in self._loading if name not in versions]:
+                del self._loading[name]
+            for name, spec in versions.items():
+                fingerprint = spec_fingerprint(spec)
+                current = self._active.get(name)
+                if current is not None and current[0] == fingerprint:
+                    continue
+                if self._loading.get(name) != fingerprint and self._failed.get(name) != fingerprint:
+                    self._loading[name] = fingerprint
+                    self._stats.setdefault(name, VersionStats())
+                    threading.Thread(target=self._load_version, args=(name, spec, fingerprint),
+                                     name=f"model-load-{name}", daemon=True).start()
+            active = dict(self._active)
+            retired = [active.pop(name)[1] for name in removed]
+            self._swap(active)
+        for served in retired:
+            self._retire(served)
+
+    def _load_version(self, name, spec, fingerprint):
+        started = time.perf_counter()
+        try:
+            served = self._load(name, spec)
+        except Exception as e:
+            logger.error("Model version %s failed to load: %s", name, e)
+            with self._lock:
+                self._failed[name] = fingerprint
+                if self._loading.get(name) == fingerprint:
+                    del self._loading[name]
+            return
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            if self._loading.get(name) != fingerprint or self._stop.is_set():
+                # Superseded by a newer manifest while loading
+                replaced = served
+            else:
+                del self._loading[name]
+                active = dict(self._active)
+                replaced = active[name][1] if name in active else None
+                active[name] = (fingerprint, served)
+                self._swap(active)
+                stats = self._stats[name]
+                stats.loaded_at, stats.load_seconds = time.time(), round(elapsed, 2)
+                logger.info("Model version %s is live after %.1fs", name, elapsed)
+        if replaced is not None:
+            self._retire(replaced)
+
+    def _swap(self, active):
+        """Install a new routing table; caller holds the lock"""
+        shares = [(name, self._traffic.get(name, 0)) for name in sorted(active)]
+        if not any(share > 0 for _, share in shares):
+            # Every version with traffic is still loading or failed to load: keep serving the
+            # live ones as they were routed before, or evenly if none of them had traffic
+            previous = self._route_shares()
+            shares = [(name, previous.get(name, 0)) for name in sorted(active)]
+            if not any(share > 0 for _, share in shares):
+                shares = [(name, 1) for name in sorted(active)]
+        total = sum(share for _, share in shares)
+        routes, cumulative = [], 0.0
+        for name, share in shares:
+            if share > 0:
+                cumulative += share / total
+                routes.append((cumulative, name))
+        # One assignment, so no reader pairs the routes of one table with the versions of another
+        self._table = (tuple(routes), active)
+        if routes:
+            self._ready.notify_all()
+
+    def _route_shares(self):
+        """{version: fraction of traffic} of the current routing table"""
+        shares, previous = {}, 0.0
+        for cumulative, name in self._routes:
+            shares[name] = cumulative - previous
+            previous = cumulative
+        return shares
+
+    def _retire(self, served):
+        """Close a version once requests already routed to it have had time to finish"""
+        timer = threading.Timer(self.drain_seconds, self._close, args=(served,))
+        timer.daemon = True
+        timer.start()
+
+    # Routing
+
+    def select(self, bucket, timeout=None):
+        """(version name, served object) for a session's bucket in [0, 1)"""
+        routes, active = self._table
+        if not routes:
+            with self._ready:
+                if not self._ready.wait_for(lambda: self._routes, timeout):
+                    raise TimeoutError("No model version is ready yet")
+                routes, active = self._table
+        for cumulative, name in routes:
+            if bucket < cumulative:
+                return name, active[name][1]
+        name = routes[-1][1]
+        return name, active[name][1]
+
+    def record(self, name, latency=None, confidence=None, error=False):
+        """Account one request served by a version"""
+        with self._lock:
+            stats = self._stats.setdefault(name, VersionStats())
+            if error:
+                stats.errors += 1
+                return
+            stats.requests += 1
+            stats.latencies.append(latency)
+            stats.confidence_total += confidence
+
+    def stats(self):
+        """{version: stats} including its current share of traffic"""
+        with self._lock:
+            shares = self._route_shares()
+            loading = set(self._loading)
+            active = self._active
+            snapshot = {name: stats.snapshot() for name, stats in self._stats.items()}
+        for name, stats in snapshot.items():
+            stats["share_pct"] = round(shares.get(name, 0.0) * 100, 1)
+            stats["state"] = "loading" if name in loading else "live" if name in active else "down"
+        return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the AgriSathi model registry")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Show versions, their files and traffic shares")
+    add = commands.add_parser("add", help="Add or update a version")
+    add.add_argument("name")
+    add.add_argument("--model", required=True, help="Model file, relative to the manifest")
+    add.add_argument("--classes", default="classes.json", help="Class map, relative to the manifest")
+    add.add_argument("--backend", default=DEFAULT_BACKEND, choices=["keras", "tflite"])
+    remove = commands.add_parser("remove", help="Remove a version")
+    remove.add_argument("name")
+    traffic = commands.add_parser("traffic", help="Set the split, e.g. old=90 new=10 (must add up to 100)")
+    traffic.add_argument("shares", nargs="+")
+    args = parser.parse_args()
+
+    base = os.path.dirname(os.path.abspath(args.manifest))
+    if os.path.exists(args.manifest):
+        with open(args.manifest, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    else:
+        # Start from the version the app serves today, with paths relative to the manifest
+        manifest = default_manifest()
+        for spec in manifest["versions"].values():
+            spec["model"] = os.path.relpath(spec["model"], base)
+            spec["classes"] = os.path.relpath(spec["classes"], base)
+
+    if args.command == "add":
+        for path in (args.model, args.classes):
+            if not os.path.exists(os.path.join(base, path)):
+                print(f"{path} not found next to {args.manifest}", file=sys.stderr)
+                return 1
+        manifest["versions"][args.name] = {"model": args.model, "classes": args.classes, "backend": args.backend}
+        # New versions start with no traffic; route to them with the traffic command
+        manifest["traffic"].setdefault(args.name, 0)
+    elif args.command == "remove":
+        if args.name not in manifest["versions"]:
+            print(f"No version {args.name}", file=sys.stderr)
+            return 1
+        del manifest["versions"][args.name]
+        manifest["traffic"].pop(args.name, None)
+    elif args.command == "traffic":
+        shares = {}
+        for item in args.shares:
+            name, _, share = item.partition("=")
+            if name not in manifest["versions"]:
+                print(f"No version {name}", file=sys.stderr)
+                return 1
+            share = float(share)
+            shares[name] = int(share) if share.is_integer() else share
+        if abs(sum(shares.values()) - 100) > 1e-6:
+            print(f"Shares add up to {sum(shares.values()):g}, not 100", file=sys.stderr)
+            return 1
+        manifest["traffic"] = {name: shares.get(name, 0) for name in manifest["versions"]}
+
+    if args.command != "list":
+        if not any(manifest["traffic"].get(name, 0) > 0 for name in manifest["versions"]):
+            print("Refusing to write a manifest that routes traffic to no version", file=sys.stderr)
+            return 1
+        write_manifest(manifest, args.manifest)
+
+    for name, spec in read_manifest(args.manifest)["versions"].items():
+        try:
+            content = model_version(spec["model"], spec["classes"])
+        except OSError:
+            content = "missing"
+        share = manifest["traffic"].get(name, 0)
+        print(f"{name:<20} {share:>5g}%  {spec['backend']:<7} {content}  {spec['model']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""
+Cold-start and rerun budgets for the Streamlit app.
+
+    python perf_budget.py
+    python perf_budget.py --import-budget-ms 800 --rerun-budget-ms 500 --json
+
+Measures, and fails (exit status 1) when a budget is exceeded:
+
+- import: `import agrisathi` in a fresh interpreter, median of several runs,
+  with the slowest modules from `python -X importtime` listed;
+- first run: the first script run of a new server process, which also
+  starts the background services and loads the model;
+- rerun: the median and worst of repeated reruns of a warm session, which
+  is what every widget interaction costs.
+
+The app itself logs a warning for any rerun over AGRISATHI_RERUN_BUDGET_MS.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(BASE_DIR, "agrisathi.py")
+
+IMPORT_BUDGET_MS = float(os.environ.get("AGRISATHI_IMPORT_BUDGET_MS", "1000"))
+FIRST_RUN_BUDGET_MS = float(os.environ.get("AGRISATHI_FIRST_RUN_BUDGET_MS", "15000"))
+RERUN_BUDGET_MS = float(os.environ.get("AGRISATHI_RERUN_BUDGET_MS", "1000"))
+
+IMPORT_PROBE = (
+    "import time; started = time.perf_counter(); import agrisathi; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def measure_import(repeat=5):
+    """Milliseconds to import the app module in a fresh interpreter, one value per run"""
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def slowest_imports(limit=10):
+    """[(module, cumulative ms)] for the app's most expensive direct imports, from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import agrisathi"], cwd=BASE_DIR,
+                            capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown by indentation: agrisathi is at depth 1, its direct imports at depth 3
+        if len(name) - len(name.lstrip()) == 3:
+            modules.append((name.strip(), int(cumulative) / 1000.0))
+    modules.sort(key=lambda module: -module[1])
+    return modules[:limit]
+
+
+def measure_reruns(reruns=10, timeout=300):
+    """(first run ms, [rerun ms, ...]) for one session driven by Streamlit's AppTest"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP, default_timeout=timeout)
+    started = time.perf_counter()
+    app.run()
+    first_run = (time.perf_counter() - started) * 1000
+    if app.exception:
+        raise RuntimeError(f"App raised on first run: {app.exception[0].message}")
+
+    timings = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return first_run, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check AgriSathi import and rerun times against budgets")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--first-run-budget-ms", type=float, default=FIRST_RUN_BUDGET_MS)
+    parser.add_argument("--rerun-budget-ms", type=float, default=RERUN_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters for the import measurement")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    import_ms = statistics.median(measure_import(args.repeat))
+    first_run_ms, rerun_timings = measure_reruns(args.reruns)
+    rerun_ms = statistics.median(rerun_timings)
+
+    checks = [
+        ("import", import_ms, args.import_budget_ms),
+        ("first_run", first_run_ms, args.first_run_budget_ms),
+        ("rerun_median", rerun_ms, args.rerun_budget_ms),
+    ]
+    report = {
+        "import_ms": round(import_ms, 1),
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest_imports()},
+        "first_run_ms": round(first_run_ms, 1),
+        "rerun_median_ms": round(rerun_ms, 1),
+        "rerun_max_ms": round(max(rerun_timings), 1),
+        "budgets_ms": {name: budget for name, _, budget in checks},
+        "over_budget": [name for name, value, budget in checks if value > budget],
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, value, budget in checks:
+            status = "OK  " if value <= budget else "OVER"
+            print(f"{status} {name:<13} {value:8.1f} ms  (budget {budget:.0f} ms)")
+        print(f"     rerun_max     {report['rerun_max_ms']:8.1f} ms")
+        print("Slowest imports: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in report["slowest_imports_ms"].items()))
+    return 1 if report["over_budget"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""
+Image preprocessing for the disease model.
+
+Phone photos are 12+ MP, so decoding them at full resolution costs more than
+the model itself. JPEGs are decoded at reduced size with PIL's draft mode
+(the decoder scales by 1/2, 1/4 or 1/8 while decoding), rotated according to
+their EXIF orientation, resized to the model input and finally normalized
+straight into a preallocated float32 batch buffer.
+
+Camera frames and uploads are compacted once at ingestion: shrunk to just
+cover a small multiple of the model input and re-encoded as a small JPEG,
+which is all the rest of the pipeline (cache key, preview, leaf tiling,
+inference) ever sees.
+"""
+import io
+import threading
+
+import numpy as np
+from PIL import Image, ImageOps
+
+SCALE = np.float32(1.0 / 255.0)
+
+
+def decode_image(source, size):
+    """
+    Open an image file/file-like object and decode it no larger than needed
+    for `size` (width, height). Returns an upright RGB PIL image.
+    """
+    image = Image.open(source)
+    if image.format == "JPEG":
+        # Only ever scales down, and never below the requested size
+        image.draft("RGB", size)
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image
+
+
+def resize_to_input(image, size):
+    """Resize a decoded image to the model's (width, height)"""
+    if image.size == size:
+        return image
+    # reducing_gap lets PIL shrink in integer steps first, which is much faster on large inputs
+    return image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+
+def compress_image(image, size, quality=85):
+    """JPEG bytes of a decoded image shrunk to just cover `size` (width, height), aspect ratio kept"""
+    scale = max(size[0] / image.width, size[1] / image.height)
+    if scale < 1:
+        target = (max(size[0], round(image.width * scale)), max(size[1], round(image.height * scale)))
+        image = image.resize(target, Image.BILINEAR, reducing_gap=2.0)
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def normalize_into(pixels, out):
+    """Scale uint8 pixels to [0, 1] writing into the float32 array `out` (no temporaries)"""
+    np.multiply(pixels, SCALE, out=out, casting="unsafe")
+    return out
+
+
+class ImagePreprocessor:
+    """
+    Turns uploaded files into uint8 model-sized samples and collates those
+    samples into a reusable float32 batch buffer.
+    """
+
+    def __init__(self, input_shape, max_batch_size=16):
+        self.height, self.width, self.channels = input_shape
+        self.size = (self.width, self.height)
+        self.max_batch_size = max_batch_size
+        self._buffer = np.empty((max_batch_size, self.height, self.width, self.channels), dtype=np.float32)
+        self._buffer_lock = threading.Lock()
+
+    def decode(self, source, scale=1):
+        """Reduced-size, EXIF-corrected decode, at least `scale` times the model input"""
+        return decode_image(source, (self.width * scale, self.height * scale))
+
+    def compress(self, source, quality=85, scale=1):
+        """Small JPEG of a file at `scale` times model resolution, for storing and re-decoding cheaply"""
+        return compress_image(self.decode(source, scale), (self.width * scale, self.height * scale), quality)
+
+    def to_sample(self, image):
+        """uint8 (H, W, C) array of a decoded image at model resolution"""
+        return np.asarray(resize_to_input(image, self.size), dtype=np.uint8)
+
+    def load(self, source):
+        """Decode and resize a file in one go"""
+        return self.to_sample(self.decode(source))
+
+    def collate(self, samples):
+        """
+        Normalize a list of uint8 samples into the shared float32 buffer and
+        return a view of the filled rows. The view is only valid until the
+        next collate() call, so this is meant for a single consumer such as
+        the BatchingQueue worker thread.
+        """
+        count = len(samples)
+        if count > self.max_batch_size:
+            raise ValueError(f"Batch of {count} exceeds max_batch_size {self.max_batch_size}")
+        with self._buffer_lock:
+            batch = self._buffer[:count]
+            for row, sample in zip(batch, samples):
+                normalize_into(sample, row)
+        return batch
+
+    def to_batch(self, sources):
+        """Decode files and collate them into a fresh float32 batch"""
+        batch = np.empty((len(sources), self.height, self.width, self.channels), dtype=np.float32)
+        for row, source in zip(batch, sources):
+            normalize_into(self.load(source), row)
+        return batch
@@ -0,0 +1,98 @@
+"""
+Content-addressed cache for disease detection results.
+
+Entries are keyed by a hash of the uploaded image bytes plus the model
+version, so a re-uploaded photo (or a Streamlit rerun with the same file)
+skips decoding and inference entirely, while a model update never serves a
+stale prediction. The cache is an LRU bounded both by a TTL and by an
+approximate memory budget in bytes.
+"""
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(data, model_version):
+    """Cache key for raw image bytes under a given model version"""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{model_version}:{digest}"
+
+
+def estimate_size(value):
+    """Rough deep size in bytes of the plain containers we store"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a TTL and a memory budget"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl_seconds=3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value or None; refreshes the entry's LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size=None):
+        """Store a value, evicting least recently used entries to stay within budget"""
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
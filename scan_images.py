@@ -0,0 +1,230 @@
+"""
+Bulk offline disease scan for folders (or tar archives) of field photos.
+
+    python scan_images.py photos/ --output results.csv
+    python scan_images.py district_2024-07-01.tar.gz --output results.parquet --workers 8
+
+Images are streamed from the source, decoded in parallel at reduced size and
+classified in batches. Every finished batch is appended to a CSV journal, so
+an interrupted run picks up where it stopped when started again with the same
+output; a row cut short by a crash is dropped and scanned again. Images
+that failed (an error row) are tried again on every run; their newest row is
+the one that counts. Parquet output is written from the journal once the
+scan completes, merged with the rows of an existing Parquet file, so
+re-running a finished scan only classifies images added since and those
+that failed before.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from disease_model import DEFAULT_BACKEND, DiseaseModel
+from preprocessing import ImagePreprocessor
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+FIELDS = ["path", "label", "confidence", "decode_ms", "inference_ms", "error"]
+
+
+def iter_directory(root):
+    """Yield (relative path, file path) for every image under root, in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(dirpath, name)
+                yield os.path.relpath(path, root), path
+
+
+def iter_tar(archive):
+    """Yield (member name, bytes) for every image in a tar archive, reading it as a stream"""
+    with tarfile.open(archive, mode="r|*") as tar:
+        for member in tar:
+            if member.isfile() and member.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield member.name, tar.extractfile(member).read()
+
+
+def iter_source(source):
+    if os.path.isdir(source):
+        return iter_directory(source)
+    if tarfile.is_tarfile(source):
+        return iter_tar(source)
+    raise ValueError(f"{source} is neither a directory nor a tar archive")
+
+
+def _decode(preprocessor, data):
+    started = time.perf_counter()
+    source = io.BytesIO(data) if isinstance(data, bytes) else data
+    sample = preprocessor.load(source)
+    return sample, (time.perf_counter() - started) * 1000.0
+
+
+def decode_stream(items, preprocessor, workers):
+    """
+    Decode images on a thread pool (PIL releases the GIL while decoding) and
+    yield (key, sample, decode_ms, error) in source order. At most a few
+    images per worker are in flight so memory stays flat on huge inputs.
+    """
+    window = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        def finish():
+            key, future = pending.popleft()
+            try:
+                sample, decode_ms = future.result()
+                return key, sample, decode_ms, ""
+            except Exception as e:
+                return key, None, 0.0, f"{type(e).__name__}: {e}"
+
+        for key, data in items:
+            pending.append((key, pool.submit(_decode, preprocessor, data)))
+            if len(pending) >= window:
+                yield finish()
+        while pending:
+            yield finish()
+
+
+def repair_journal(journal_path):
+    """Cut an unfinished last row, left by a crash in the middle of a write, off the journal"""
+    with open(journal_path, "rb+") as f:
+        size = position = f.seek(0, os.SEEK_END)
+        end = 0
+        # Scan back from the end for the last complete line, a block at a time
+        while position > 0:
+            step = min(position, 1 << 16)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                end = position + newline + 1
+                break
+        if end < size:
+            f.truncate(end)
+            print(f"Dropped an incomplete last row from {journal_path}", file=sys.stderr)
+
+
+def load_completed(journal_path, parquet_path=None):
+    """
+    Paths already scanned successfully: in the journal of an interrupted run,
+    or in earlier Parquet output. Error rows (e.g. a file that could not be
+    read) do not count, so those images are retried.
+    """
+    completed = set()
+    if parquet_path and os.path.exists(parquet_path):
+        import pandas as pd
+
+        previous = pd.read_parquet(parquet_path, columns=["path", "error"])
+        completed.update(previous.loc[previous["error"].fillna("") == "", "path"])
+    if os.path.exists(journal_path):
+        repair_journal(journal_path)
+        with open(journal_path, newline="", encoding="utf-8") as f:
+            completed.update(row["path"] for row in csv.DictReader(f) if not row.get("error"))
+    return completed
+
+
+def write_parquet(journal_path, output):
+    """Merge the journal into the Parquet output (replacing it atomically) and remove the journal"""
+    import pandas as pd
+
+    results = pd.read_csv(journal_path, dtype={"path": str, "label": str, "error": str})
+    if os.path.exists(output):
+        # Rows of a re-scanned image (e.g. a crash between these two steps) keep their newest result
+        results = pd.concat([pd.read_parquet(output), results], ignore_index=True)
+        results = results.drop_duplicates("path", keep="last")
+    results["label"] = results["label"].fillna("")
+    results["error"] = results["error"].fillna("")
+    results.to_parquet(output + ".tmp", index=False)
+    os.replace(output + ".tmp", output)
+    os.remove(journal_path)
+
+
+def classify_batch(model, preprocessor, batch):
+    """Run one batch of decoded samples and return result rows"""
+    started = time.perf_counter()
+    probs = model.predict(preprocessor.collate([sample for _, sample, _ in batch]))
+    predictions = model.top_k(probs, k=1)
+    per_image_ms = (time.perf_counter() - started) * 1000.0 / len(batch)
+    return [
+        {
+            "path": key,
+            "label": top[0][0],
+            "confidence": round(top[0][1], 6),
+            "decode_ms": round(decode_ms, 2),
+            "inference_ms": round(per_image_ms, 2),
+            "error": "",
+        }
+        for (key, _, decode_ms), top in zip(batch, predictions)
+    ]
+
+
+def scan(source, output, batch_size=32, workers=4, backend=DEFAULT_BACKEND):
+    """Scan `source` and write results to `output` (.csv or .parquet). Returns the number of new images."""
+    to_parquet = output.lower().endswith(".parquet")
+    journal_path = output + ".partial.csv" if to_parquet else output
+
+    completed = load_completed(journal_path, output if to_parquet else None)
+    if completed:
+        print(f"Resuming: {len(completed)} images already scanned", file=sys.stderr)
+
+    model = DiseaseModel(backend=backend)
+    model.warmup(batch_size)
+    preprocessor = ImagePreprocessor(model.input_shape, max_batch_size=batch_size)
+
+    items = ((key, data) for key, data in iter_source(source) if key not in completed)
+    write_header = not os.path.exists(journal_path) or os.path.getsize(journal_path) == 0
+    scanned = 0
+    started = time.perf_counter()
+
+    with open(journal_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if write_header:
+            writer.writeheader()
+
+        batch = []
+        for key, sample, decode_ms, error in decode_stream(items, preprocessor, workers):
+            if error:
+                # One physical line per row, so repair_journal can tell where the last one ends
+                writer.writerow({"path": key, "label": "", "confidence": "", "decode_ms": "",
+                                 "inference_ms": "", "error": " ".join(error.split())})
+                continue
+            batch.append((key, sample, decode_ms))
+            if len(batch) == batch_size:
+                writer.writerows(classify_batch(model, preprocessor, batch))
+                # Each flushed batch is a resume point
+                f.flush()
+                scanned += len(batch)
+                batch = []
+        if batch:
+            writer.writerows(classify_batch(model, preprocessor, batch))
+            scanned += len(batch)
+
+    elapsed = time.perf_counter() - started
+    print(f"Scanned {scanned} images in {elapsed:.1f}s ({scanned / elapsed if elapsed else 0:.1f} images/s)",
+          file=sys.stderr)
+
+    if to_parquet:
+        write_parquet(journal_path, output)
+    return scanned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AgriSathi disease model over a folder or tar archive of images")
+    parser.add_argument("source", help="Directory or tar archive (.tar, .tar.gz, ...) of leaf photos")
+    parser.add_argument("--output", "-o", default="scan_results.csv", help="Result file, .csv or .parquet")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Parallel decode threads")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="Model backend: keras or tflite")
+    args = parser.parse_args()
+
+    scan(args.source, args.output, batch_size=args.batch_size, workers=args.workers, backend=args.backend)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
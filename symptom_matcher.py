@@ -0,0 +1,255 @@
+"""
+Keyword extraction and symptom-to-disease matching for farmer questions.
+
+At startup the symptom text of every disease_database entry (English, Hindi
+and Punjabi) is split into terms and put in an inverted index, term ->
+diseases. All terms, crop names and intent keywords are compiled into one
+Aho-Corasick automaton, so a question is scanned once, whatever the number
+of keywords, and only the diseases posted under the terms it contains are
+scored. Candidates are ranked by the IDF weight of their matched terms,
+with a boost for diseases of the crops named in the question.
+"""
+import math
+import unicodedata
+from collections import defaultdict, deque
+
+from app_data import disease_database
+
+LANGUAGES = ("en", "hi", "pa")
+
+# keyword -> canonical crop name (crop_database keys); whole words only, so plurals are listed
+CROP_KEYWORDS = {
+    "tomato": "Tomato", "tomatoes": "Tomato", "टमाटर": "Tomato", "ਟਮਾਟਰ": "Tomato",
+    "potato": "Potato", "potatoes": "Potato", "आलू": "Potato", "ਆਲੂ": "Potato",
+    "rice": "Rice", "paddy": "Rice", "चावल": "Rice", "धान": "Rice", "ਚੌਲ": "Rice", "ਝੋਨਾ": "Rice",
+    "wheat": "Wheat", "गेहूं": "Wheat", "ਕਣਕ": "Wheat",
+    "maize": "Maize", "corn": "Maize", "मक्का": "Maize", "ਮੱਕੀ": "Maize", "ਮਕੀ": "Maize",
+    "sugarcane": "Sugarcane", "गन्ना": "Sugarcane", "ਗੰਨਾ": "Sugarcane",
+}
+
+# General symptom words that are worth reporting even when no disease mentions them,
+# -> the inflections they take: "noun" adds plurals ("spot" matches "spots", "कीट" matches
+# "कीटों"), "verb" also adds -ed/-ing ("yellow" matches "yellowing"), None matches as written
+SYMPTOM_KEYWORDS = {
+    "yellow": "verb", "spot": "noun", "wilting": None, "hole": "noun", "insect": "noun", "pest": "noun",
+    "पीला": None, "धब्बे": None, "मुरझाना": None, "कीट": "noun",
+    "ਕੀੜਾ": None, "ਪੀਲਾ": None, "ਧੱਬੇ": None, "ਮੁਰਝਾਨਾ": None,
+}
+
+INTENT_KEYWORDS = {
+    "question": ["how", "what", "why", "when", "where", "कैसे", "क्या", "क्यों", "कब", "ਕਿਵੇਂ", "ਕੀ", "ਕਿਉਂ", "ਕਦੋਂ"],
+    "problem": ["problem", "issue", "wrong", "help", "समस्या", "मदद", "ਮੁਸ਼ਕਲ", "ਸਮੱਸਿਆ", "ਮਦਦ"],
+}
+
+# Words in the symptom descriptions that say nothing about the disease
+STOPWORDS = {
+    "with", "and", "that", "the", "on", "under", "turn", "shaped", "conditions",
+    "और", "के", "की", "का", "पर", "से", "जो", "हो", "जाते", "हैं", "में", "साथ", "वाले", "आकार",
+    "ਅਤੇ", "ਤੇ", "ਨਾਲ", "ਜੋ", "ਹੋ", "ਜਾਂਦੇ", "ਹਨ", "ਦੇ", "ਦੀ", "ਵਿੱਚ", "ਵਾਲੇ", "ਹਾਲਤ",
+}
+MIN_TERM_LENGTH = 2
+# The only endings a stem may take; anything else is a different word ("water" is not "watering")
+ENGLISH_PLURALS = ("s", "es")
+INDIC_PLURALS = ("ों", "ें", "ਾਂ", "ਆਂ")
+VERB_SUFFIXES = ("s", "ed", "ing")
+CROP_BOOST = 2.0
+
+
+def _is_word_char(ch):
+    # Indic vowel signs and viramas are combining marks, not letters, but belong to the word
+    return ch.isalnum() or unicodedata.category(ch).startswith("M")
+
+
+def tokenize(text):
+    """Lowercased words; combining marks stay attached to their word"""
+    words, current = [], []
+    for ch in text.lower():
+        if _is_word_char(ch):
+            current.append(ch)
+        elif current:
+            words.append("".join(current))
+            current = []
+    if current:
+        words.append("".join(current))
+    return words
+
+
+def _stem(word):
+    """(stem, is_verb) for a description word: English plurals and -ed/-ing forms are reduced"""
+    if not word.isascii() or len(word) <= 4:
+        return word, False
+    for ending in ("ing", "ed"):
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[:-len(ending)], True
+    if word.endswith("es") and word[:-2].endswith(("s", "x", "z", "ch", "sh", "o")):
+        return word[:-2], False
+    if word.endswith("s") and not word.endswith("ss"):
+        return word[:-1], False
+    return word, False
+
+
+def inflections(stem, kind="noun"):
+    """The stem and its whitelisted endings: plurals for nouns, plurals and -ed/-ing for verbs"""
+    if kind is None:
+        return {stem}
+    suffixes = ENGLISH_PLURALS if stem.isascii() else INDIC_PLURALS
+    if kind == "verb" and stem.isascii():
+        suffixes = suffixes + VERB_SUFFIXES
+    return {stem} | {stem + suffix for suffix in suffixes}
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick multi-pattern matcher. Patterns match whole words only;
+    inflected forms are added as patterns of their own (see inflections).
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # state -> [(pattern length, payload)]
+        self._built = False
+
+    def add(self, pattern, payload):
+        pattern = pattern.lower()
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self):
+        """Compute failure links breadth-first; outputs of suffix states are merged in"""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+        return self
+
+    def find(self, text):
+        """All (start, end, payload) matches in one pass over text"""
+        if not self._built:
+            self.build()
+        text = text.lower()
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, payload in self._output[state]:
+                start = i + 1 - length
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if i + 1 < len(text) and _is_word_char(text[i + 1]):
+                    continue
+                matches.append((start, i + 1, payload))
+        return matches
+
+
+class SymptomMatcher:
+    """Inverted index of disease symptom terms plus a single-pass keyword scanner"""
+
+    def __init__(self, diseases=disease_database, crop_keywords=CROP_KEYWORDS,
+                 symptom_keywords=SYMPTOM_KEYWORDS, intent_keywords=INTENT_KEYWORDS):
+        self.diseases = []              # disease id -> (crop, disease)
+        self.postings = defaultdict(set)  # term (stem) -> disease ids
+        self.surface = {}               # term -> the description word it was first seen as
+        self.forms = defaultdict(set)   # term -> description words and inflections that match it
+        for crop, entries in diseases.items():
+            for disease, info in entries.items():
+                disease_id = len(self.diseases)
+                self.diseases.append((crop, disease))
+                texts = [disease] + [info.get(lang, info).get("symptoms", "") for lang in LANGUAGES]
+                for text in texts:
+                    for word in tokenize(text):
+                        if len(word) >= MIN_TERM_LENGTH and word not in STOPWORDS and not word.isdigit():
+                            term, is_verb = _stem(word)
+                            self.postings[term].add(disease_id)
+                            self.surface.setdefault(term, word)
+                            self.forms[term] |= {word} | inflections(term, "verb" if is_verb else "noun")
+
+        count = len(self.diseases)
+        self.idf = {term: math.log(1.0 + count / len(ids)) for term, ids in self.postings.items()}
+        # Normalize by each disease's total term weight so long descriptions do not win by length
+        totals = [0.0] * count
+        for term, ids in self.postings.items():
+            for disease_id in ids:
+                totals[disease_id] += self.idf[term]
+        self.norms = [math.sqrt(total) or 1.0 for total in totals]
+
+        self.automaton = KeywordAutomaton()
+        for term, forms in self.forms.items():
+            for form in forms:
+                self.automaton.add(form, ("term", term))
+        for keyword, crop in crop_keywords.items():
+            self.automaton.add(keyword, ("crop", crop))
+        for keyword, kind in symptom_keywords.items():
+            for form in inflections(keyword, kind):
+                self.automaton.add(form, ("symptom", keyword))
+        for intent, keywords in intent_keywords.items():
+            for keyword in keywords:
+                self.automaton.add(keyword, ("intent", intent))
+        self.automaton.build()
+
+    def extract(self, query):
+        """Keywords found in the query: {"crops", "symptoms", "terms", "intents"}, in query order; terms are stems"""
+        found = {"crops": [], "symptoms": [], "terms": [], "intents": []}
+        kinds = {"crop": "crops", "symptom": "symptoms", "term": "terms", "intent": "intents"}
+        for _, _, (kind, value) in self.automaton.find(query):
+            values = found[kinds[kind]]
+            if value not in values:
+                values.append(value)
+        return found
+
+    def rank(self, terms, crops=(), limit=5):
+        """Diseases sharing terms with the query, best first, as dicts with crop, disease and score"""
+        scores = defaultdict(float)
+        for term in terms:
+            for disease_id in self.postings.get(term, ()):
+                scores[disease_id] += self.idf[term]
+        ranked = []
+        for disease_id, score in scores.items():
+            crop, disease = self.diseases[disease_id]
+            score /= self.norms[disease_id]
+            if crop in crops:
+                score *= CROP_BOOST
+            ranked.append({"crop": crop, "disease": disease, "score": round(score, 3)})
+        ranked.sort(key=lambda candidate: -candidate["score"])
+        return ranked[:limit]
+
+    def analyze(self, query, limit=5):
+        """Intent, crops, symptoms and ranked disease candidates for a farmer's question"""
+        found = self.extract(query)
+        intents = found["intents"]
+        intent = "problem" if "problem" in intents else "question" if "question" in intents else "unknown"
+        # Report description terms as the lexicon wrote them ("leaves", not the stem "leave")
+        symptoms = list(found["symptoms"])
+        for term in found["terms"]:
+            if term not in found["symptoms"] and self.surface[term] not in symptoms:
+                symptoms.append(self.surface[term])
+        return {
+            "intent": intent,
+            "crops": found["crops"],
+            "symptoms": symptoms,
+            "diseases": self.rank(found["terms"], found["crops"], limit),
+            "original_query": query
+        }
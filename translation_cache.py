@@ -0,0 +1,129 @@
+"""
+Persistent translation memory in front of googletrans.
+
+Translations are stored per destination language in a JSON file, loaded into
+memory once per process and consulted before any network call. Only strings
+that have never been translated are sent to the translator, in a single
+batched request, so repeat renders do no network translation at all.
+
+When a translator call fails, further calls are skipped for a short window
+(AGRISATHI_TRANSLATE_RETRY_AFTER seconds) and the English text is served
+instead, so an outage does not cost every render a network timeout.
+"""
+import asyncio
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get("AGRISATHI_TRANSLATIONS_PATH", os.path.join(BASE_DIR, "translations.json"))
+RETRY_AFTER = float(os.environ.get("AGRISATHI_TRANSLATE_RETRY_AFTER", "60"))
+
+
+def _resolve(result):
+    """googletrans 4.x returns coroutines, 3.x returns results directly"""
+    if inspect.isawaitable(result):
+        return asyncio.run(result)
+    return result
+
+
+class TranslationMemory:
+    """(text, dest_lang) -> translation store with batched miss handling"""
+
+    def __init__(self, path=DEFAULT_PATH, translator=None, retry_after=RETRY_AFTER):
+        self.path = path
+        self._translator = translator
+        self.retry_after = retry_after
+        self._retry_at = 0.0  # monotonic time before which the translator is not called
+        self._lock = threading.Lock()
+        self._memory = self._load()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Write the store atomically so a crash never leaves a half-written file"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._memory, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @property
+    def translator(self):
+        if self._translator is None:
+            from googletrans import Translator
+            self._translator = Translator()
+        return self._translator
+
+    def _translate_remote(self, texts, dest_lang):
+        """
+        One batched translator call; returns None on any failure, and without
+        calling out while a recent failure's retry window is still open
+        """
+        if time.monotonic() < self._retry_at:
+            return None
+        try:
+            results = _resolve(self.translator.translate(texts, dest=dest_lang))
+            if not isinstance(results, list):
+                results = [results]
+            translated = [r.text for r in results]
+            if len(translated) == len(texts):
+                return translated
+        except Exception:
+            pass
+        with self._lock:
+            self.failures += 1
+            self._retry_at = time.monotonic() + self.retry_after
+        return None
+
+    def translate_many(self, texts, dest_lang):
+        """Translate a list of strings, hitting the network only for unseen ones"""
+        if dest_lang == "en":
+            return list(texts)
+
+        with self._lock:
+            memory = self._memory.setdefault(dest_lang, {})
+            misses = [text for text in dict.fromkeys(texts) if text not in memory]
+            self.hits += len(texts) - len(misses)
+            self.misses += len(misses)
+
+        if misses:
+            translated = self._translate_remote(misses, dest_lang)
+            if translated is not None:
+                with self._lock:
+                    memory.update(zip(misses, translated))
+                    self._save()
+
+        # Anything still missing (translator down or backing off) falls back to the original text
+        return [memory.get(text, text) for text in texts]
+
+    def translate(self, text, dest_lang):
+        return self.translate_many([text], dest_lang)[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": sum(len(entries) for entries in self._memory.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+            }
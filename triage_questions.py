@@ -0,0 +1,160 @@
+"""
+Batch triage of farmer questions for the expert-help desk.
+
+    python triage_questions.py callcentre_2024-07-01.jsonl --output routed.jsonl
+    cat questions.jsonl | python triage_questions.py - --workers 8
+
+Each input line is a JSON object with the question under "question" (or
+"text"); any other fields (id, phone, lang, ...) are carried along. The same
+intent/crop/symptom extraction and disease ranking as the app's
+process_farmer_query runs over the batch on a process pool. Questions that
+are the same after normalization are analysed once and merged, and every
+output record is routed to an agronomist queue. Output records are grouped
+by route, most-asked questions first.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from symptom_matcher import SymptomMatcher, tokenize
+
+TEXT_FIELDS = ("question", "text")
+# Below this many unique questions the pool start-up costs more than it saves
+MIN_PARALLEL = 2000
+
+ROUTES = ("plant-protection", "agronomy", "general")
+
+_matcher = None
+
+
+def _init_worker():
+    global _matcher
+    _matcher = SymptomMatcher()
+
+
+def _analyze_chunk(questions):
+    return [_matcher.analyze(question) for question in questions]
+
+
+def normalize(question):
+    """Dedupe key: lowercased words, punctuation and spacing ignored"""
+    return " ".join(tokenize(question))
+
+
+def route(analysis):
+    """
+    Pick the agronomist queue for an analysed question: plant protection
+    when it matches a disease, agronomy when it names a crop or symptom,
+    general otherwise.
+    """
+    if analysis["diseases"]:
+        return "plant-protection", analysis["diseases"][0]["crop"]
+    if analysis["crops"] or analysis["symptoms"]:
+        return "agronomy", analysis["crops"][0] if analysis["crops"] else None
+    return "general", None
+
+
+def analyze_all(questions, workers=None, chunksize=256):
+    """Analyse a list of question strings, in order, on a process pool when it is worth it"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(questions) < MIN_PARALLEL:
+        matcher = SymptomMatcher()
+        return [matcher.analyze(question) for question in questions]
+    chunks = [questions[i:i + chunksize] for i in range(0, len(questions), chunksize)]
+    # Each worker builds its own matcher once instead of receiving it per task
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return [analysis for chunk in pool.map(_analyze_chunk, chunks) for analysis in chunk]
+
+
+def triage(records, workers=None, chunksize=256):
+    """
+    Deduplicate, analyse and route a batch of question records (dicts).
+    Returns one dict per unique question with the analysis, route, the
+    number of times it was asked and the records that asked it.
+    """
+    groups = {}
+    for record in records:
+        # Exports sometimes carry numbers or nested values in the text field
+        question = str(next((record[field] for field in TEXT_FIELDS if record.get(field)), ""))
+        key = normalize(question)
+        if not key:
+            continue
+        if key not in groups:
+            groups[key] = {"question": question, "records": []}
+        groups[key]["records"].append(record)
+
+    unique = list(groups.values())
+    analyses = analyze_all([group["question"] for group in unique], workers, chunksize)
+
+    results = []
+    for group, analysis in zip(unique, analyses):
+        queue, crop = route(analysis)
+        results.append({
+            "route": queue,
+            "crop": crop,
+            "question": group["question"],
+            "count": len(group["records"]),
+            "intent": analysis["intent"],
+            "crops": analysis["crops"],
+            "symptoms": analysis["symptoms"],
+            "diseases": analysis["diseases"],
+            "records": group["records"],
+        })
+    results.sort(key=lambda result: (ROUTES.index(result["route"]), result["crop"] or "", -result["count"]))
+    return results
+
+
+def read_jsonl(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Skipping line {line_number}: {e}", file=sys.stderr)
+            continue
+        if not isinstance(record, dict):
+            print(f"Skipping line {line_number}: expected a JSON object, got {type(record).__name__}",
+                  file=sys.stderr)
+            continue
+        yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route a JSONL batch of farmer questions to agronomist queues")
+    parser.add_argument("source", help="JSONL file of questions, or - for stdin")
+    parser.add_argument("--output", "-o", default="-", help="Routed JSONL output, or - for stdout")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--chunksize", type=int, default=256, help="Questions per worker task")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.source == "-":
+        records = list(read_jsonl(sys.stdin))
+    else:
+        with open(args.source, "r", encoding="utf-8") as f:
+            records = list(read_jsonl(f))
+
+    results = triage(records, workers=args.workers, chunksize=args.chunksize)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    counts = {queue: sum(1 for result in results if result["route"] == queue) for queue in ROUTES}
+    print(f"Triaged {len(records)} questions ({len(results)} unique) in {elapsed:.1f}s: "
+          + ", ".join(f"{queue} {count}" for queue, count in counts.items()), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
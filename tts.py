@@ -0,0 +1,180 @@
+"""
+Text-to-speech for spoken advice.
+
+Advice is synthesized to audio bytes and played on the farmer's device with
+st.audio, not on the server's speakers. pyttsx3 engines are not thread-safe
+and runAndWait() blocks, so synthesis runs in a small pool of worker
+processes, each with its own engine, and the request thread only holds a
+Future. Clips are cached by (text, lang, voice); the advice comes from the
+small, fixed disease_database, so almost every request is a cache hit.
+Voices are resolved once per language when the service starts; requests
+made before that are queued behind it rather than waited for.
+"""
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from result_cache import ResultCache
+
+TTS_WORKERS = int(os.environ.get("AGRISATHI_TTS_WORKERS", "2"))
+TTS_CACHE_MB = int(os.environ.get("AGRISATHI_TTS_CACHE_MB", "32"))
+TTS_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Substrings of voice names to look for, per language
+VOICE_HINTS = {
+    "hi": ("hindi", "india"),
+    "pa": ("punjabi", "india"),
+}
+
+_engine = None  # one pyttsx3 engine per worker process
+
+
+def _init_worker():
+    global _engine
+    import pyttsx3
+
+    _engine = pyttsx3.init()
+
+
+def _list_voices():
+    return [(voice.id, voice.name) for voice in _engine.getProperty('voices')], _engine.getProperty('voice')
+
+
+def _synthesize(text, voice):
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        if voice is not None:
+            _engine.setProperty('voice', voice)
+        _engine.save_to_file(text, path)
+        _engine.runAndWait()
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def resolve_voices(voices, default_voice, hints=VOICE_HINTS):
+    """{lang: voice id} for every hinted language; languages without a match use the default voice"""
+    resolved = {}
+    for lang, names in hints.items():
+        resolved[lang] = next(
+            (voice_id for voice_id, name in voices if any(hint in name.lower() for hint in names)),
+            default_voice
+        )
+    return resolved
+
+
+def disease_advice(text, crop, disease):
+    """Spoken advice for a detected disease, in the language of a LocaleBundle"""
+    return (
+        f"{crop}: {disease}. "
+        f"{text['treatment']}: {text.disease(crop, disease, 'treatment')}. "
+        f"{text['prevention_label']}: {text.disease(crop, disease, 'prevention')}"
+    )
+
+
+def crop_advice(text, crop):
+    """Spoken growing advice for a crop, in the language of a LocaleBundle"""
+    return (
+        f"{crop} {text['best_season']}: {text.crop(crop, 'season')}. "
+        f"{text['soil_type']}: {text.crop(crop, 'soil_type')}. "
+        f"{text['water_needs']}: {text.crop(crop, 'water_requirements')}. "
+        f"{text['ph_level']}: {text.crop(crop, 'ph_range')}. "
+        f"{text['common_pests']}: {text.crop(crop, 'common_pests')}"
+    )
+
+
+def audio_format(data):
+    """MIME type of a synthesized clip (the macOS driver writes AIFF)"""
+    return "audio/aiff" if data[:4] == b"FORM" else "audio/wav"
+
+
+def _chain(source, target):
+    """Settle target with source's outcome once source is done"""
+    def copy(future):
+        if future.cancelled():
+            target.cancel()
+        elif future.exception() is not None:
+            target.set_exception(future.exception())
+        else:
+            target.set_result(future.result())
+
+    source.add_done_callback(copy)
+
+
+class SpeechService:
+    """Pooled, cached text-to-speech: synthesize() returns a Future of audio bytes"""
+
+    def __init__(self, workers=TTS_WORKERS, cache_mb=TTS_CACHE_MB):
+        self.cache = ResultCache(max_bytes=cache_mb * 1024 * 1024, ttl_seconds=TTS_CACHE_TTL)
+        # spawn, not fork: the server process is full of threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        self._voices_future = self._pool.submit(_list_voices)
+        self._voices = None
+        self._pending = {}  # cache key -> Future of a clip being synthesized
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """False once the workers have failed to start an engine (e.g. no speech driver)"""
+        if not self._voices_future.done():
+            return True
+        return self._voices_future.exception() is None
+
+    def voice(self, lang, timeout=30):
+        """Voice id for lang; blocks until the voices are listed, so the request path only calls it once they are"""
+        if self._voices is None:
+            voices, default_voice = self._voices_future.result(timeout)
+            self._voices = dict(resolve_voices(voices, default_voice), default=default_voice)
+        return self._voices.get(lang, self._voices["default"])
+
+    def synthesize(self, text, lang):
+        """Future of the clip for text in lang; cached and in-flight clips are shared"""
+        if not self._voices_future.done():
+            # The first worker is still starting its engine: chain onto it instead of blocking the caller
+            pending = Future()
+            self._voices_future.add_done_callback(
+                lambda _: _chain(self.synthesize(text, lang), pending)
+            )
+            return pending
+        try:
+            voice = self.voice(lang)
+        except Exception as e:
+            failed = Future()
+            failed.set_exception(e)
+            return failed
+        key = hashlib.sha256(f"{lang}\x00{voice}\x00{text}".encode("utf-8")).hexdigest()
+
+        clip = self.cache.get(key)
+        if clip is not None:
+            done = Future()
+            done.set_result(clip)
+            return done
+
+        with self._lock:
+            future = self._pending.get(key)
+            leader = future is None
+            if leader:
+                future = self._pending[key] = self._pool.submit(_synthesize, text, voice)
+        if leader:
+            # Outside the lock: the callback runs right away if the clip is already done
+            future.add_done_callback(lambda f: self._finish(key, f))
+        return future
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+        if future.exception() is None:
+            clip = future.result()
+            self.cache.put(key, clip, size=len(clip))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
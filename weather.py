@@ -0,0 +1,366 @@
+"""
+Process-wide weather service for AgriSathi.
+
+One WeatherService is shared by every session:
+- a pooled requests.Session (keep-alive, bounded pool) with timeouts,
+- geocodes cached for the life of the process (cities do not move),
+- forecasts cached for 3 hours, the step of the OpenWeatherMap forecast,
+- concurrent requests for the same city coalesced into a single fetch.
+
+The API base URLs are configurable so the service can be pointed at a local
+stub server. Without an API key it serves mock data, as before.
+
+ForecastRefresher keeps every city of a fixed list warm from a background
+thread, so sessions read forecasts from memory instead of waiting on the API.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Sign up for a free API key at https://openweathermap.org/
+API_KEY = os.environ.get("OPENWEATHERMAP_API_KEY", "YOUR_OPENWEATHERMAP_API_KEY")
+API_BASE_URL = os.environ.get("OPENWEATHERMAP_BASE_URL", "https://api.openweathermap.org")
+
+FORECAST_TTL = 3 * 60 * 60  # provider publishes forecasts in 3-hour steps
+ERROR_TTL = 60  # retry a failed city after a minute instead of serving mock data for hours
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+
+def get_mock_weather_data(city_name):
+    """Generate mock weather data for demonstration purposes"""
+    # Different weather patterns based on city
+    if city_name.lower() in ["chennai", "madras"]:
+        base_temp = 32
+        rain_chance = 60
+        wind_speed = 12
+    elif city_name.lower() in ["mumbai", "bombay"]:
+        base_temp = 30
+        rain_chance = 70
+        wind_speed = 15
+    elif city_name.lower() in ["delhi", "new delhi"]:
+        base_temp = 28
+        rain_chance = 20
+        wind_speed = 10
+    elif city_name.lower() in ["bangalore", "bengaluru"]:
+        base_temp = 26
+        rain_chance = 40
+        wind_speed = 8
+    elif city_name.lower() in ["jorethang", "gangtok", "darjeeling"]:
+        base_temp = 20
+        rain_chance = 80
+        wind_speed = 18
+    else:
+        base_temp = 28
+        rain_chance = 50
+        wind_speed = 10
+
+    # Generate forecast data
+    days = ["Today", "Mon", "Tue", "Wed", "Thu"]
+    forecast_data = []
+
+    for i, day in enumerate(days):
+        temp_variation = np.random.randint(-3, 4)
+        rain_variation = np.random.randint(-20, 21)
+        wind_variation = np.random.randint(-5, 6)
+
+        forecast_data.append({
+            'day': day,
+            'temp': base_temp + temp_variation,
+            'humidity': 60 + np.random.randint(-15, 16),
+            'rain_chance': max(0, min(100, rain_chance + rain_variation)),
+            'wind_speed': max(0, wind_speed + wind_variation),
+            'description': 'Partly cloudy',
+            'icon': '02d' if rain_chance < 50 else '10d'
+        })
+
+    return {
+        'city': city_name,
+        'current_temp': forecast_data[0]['temp'],
+        'current_humidity': forecast_data[0]['humidity'],
+        'current_description': forecast_data[0]['description'],
+        'current_wind': forecast_data[0]['wind_speed'],
+        'current_icon': '02d',
+        'forecast': forecast_data,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def parse_forecast(city_name, weather_response):
+    """Turn an OpenWeatherMap 5-day/3-hour response into the app's weather dict"""
+    current_weather = weather_response['list'][0]
+    forecast_data = []
+
+    # Get one forecast per day for the next 5 days
+    for i in range(0, min(40, len(weather_response['list'])), 8):
+        forecast = weather_response['list'][i]
+        forecast_data.append({
+            'day': datetime.fromtimestamp(forecast['dt']).strftime('%a'),
+            'temp': round(forecast['main']['temp']),
+            'humidity': forecast['main']['humidity'],
+            'rain_chance': forecast.get('pop', 0) * 100,  # Probability of precipitation
+            'description': forecast['weather'][0]['description'],
+            'wind_speed': forecast['wind']['speed'],
+            'icon': forecast['weather'][0]['icon']
+        })
+
+    return {
+        'city': city_name,
+        'current_temp': round(current_weather['main']['temp']),
+        'current_humidity': current_weather['main']['humidity'],
+        'current_description': current_weather['weather'][0]['description'],
+        'current_wind': current_weather['wind']['speed'],
+        'current_icon': current_weather['weather'][0]['icon'],
+        'forecast': forecast_data,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+class WeatherService:
+    """Cached, pooled and coalesced access to the OpenWeatherMap API"""
+
+    def __init__(self, api_key=API_KEY, base_url=API_BASE_URL, forecast_ttl=FORECAST_TTL,
+                 timeout=REQUEST_TIMEOUT, pool_size=10):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.forecast_ttl = forecast_ttl
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._geocodes = {}   # city -> (lat, lon), never expires
+        self._forecasts = {}  # city -> (weather dict, fetched_at, ttl)
+        self._lock = threading.Lock()
+        self._inflight = {}   # city -> threading.Event of the fetch in progress
+
+    @property
+    def has_api_key(self):
+        return bool(self.api_key) and self.api_key != "YOUR_OPENWEATHERMAP_API_KEY"
+
+    def cached(self, city_name, expired=True):
+        """Forecast from memory, or None; with expired=False only one still within its TTL"""
+        with self._lock:
+            entry = self._forecasts.get(city_name)
+        if entry is None or (not expired and time.monotonic() - entry[1] >= entry[2]):
+            return None
+        return entry[0]
+
+    def age(self, city_name):
+        """Seconds since the cached forecast for a city was fetched, or None"""
+        with self._lock:
+            entry = self._forecasts.get(city_name)
+        return time.monotonic() - entry[1] if entry else None
+
+    def expiry(self, city_name):
+        """(seconds until the cached forecast expires, its TTL) for a city, or None"""
+        with self._lock:
+            entry = self._forecasts.get(city_name)
+        return (entry[1] + entry[2] - time.monotonic(), entry[2]) if entry else None
+
+    def get(self, city_name, max_age=None):
+        """
+        Weather for a city, from cache when it is fresh. If another thread is
+        already fetching this city, wait for its result instead of fetching again.
+        """
+        ttl = self.forecast_ttl if max_age is None else max_age
+        while True:
+            with self._lock:
+                entry = self._forecasts.get(city_name)
+                if entry and time.monotonic() - entry[1] < min(ttl, entry[2]):
+                    return entry[0]
+                event = self._inflight.get(city_name)
+                if event is None:
+                    event = self._inflight[city_name] = threading.Event()
+                    leader = True
+                else:
+                    leader = False
+
+            if not leader:
+                event.wait(sum(self.timeout) * 2)
+                with self._lock:
+                    entry = self._forecasts.get(city_name)
+                if entry:
+                    return entry[0]
+                continue
+
+            try:
+                data, ok = self._fetch(city_name)
+                with self._lock:
+                    self._forecasts[city_name] = (data, time.monotonic(), self.forecast_ttl if ok else ERROR_TTL)
+                return data
+            finally:
+                with self._lock:
+                    del self._inflight[city_name]
+                event.set()
+
+    def refresh(self, city_name):
+        """Fetch a city now regardless of the cache"""
+        return self.get(city_name, max_age=0)
+
+    def is_geocoded(self, city_name):
+        with self._lock:
+            return city_name in self._geocodes
+
+    def geocode(self, city_name):
+        with self._lock:
+            if city_name in self._geocodes:
+                return self._geocodes[city_name]
+        response = self.session.get(
+            f"{self.base_url}/geo/1.0/direct",
+            params={"q": f"{city_name},IN", "limit": 1, "appid": self.api_key},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            return None
+        coords = (results[0]['lat'], results[0]['lon'])
+        with self._lock:
+            self._geocodes[city_name] = coords
+        return coords
+
+    def _fetch(self, city_name):
+        """Returns (weather dict, ok); ok is False when mock data stands in for a failed fetch"""
+        if not self.has_api_key:
+            # Return mock data if no API key is provided
+            return get_mock_weather_data(city_name), True
+        try:
+            coords = self.geocode(city_name)
+            if coords is None:
+                return get_mock_weather_data(city_name), True
+            lat, lon = coords
+            response = self.session.get(
+                f"{self.base_url}/data/2.5/forecast",
+                params={"lat": lat, "lon": lon, "appid": self.api_key, "units": "metric"},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            weather_response = response.json()
+            if 'list' not in weather_response:
+                return get_mock_weather_data(city_name), False
+            return parse_forecast(city_name, weather_response), True
+        except Exception as e:
+            logger.warning("Error fetching weather data for %s: %s", city_name, e)
+            return get_mock_weather_data(city_name), False
+
+
+class RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per `per` seconds"""
+
+    def __init__(self, rate, per=60.0):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, cost=1):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                await asyncio.sleep((cost - self._tokens) * self.per / self.rate)
+
+
+class ForecastRefresher:
+    """
+    Background thread running an asyncio loop that re-fetches every city
+    shortly before its forecast expires. Each entry is judged by its own TTL,
+    so a mock forecast stored after a failed fetch is retried after ERROR_TTL,
+    and the loop sleeps until the next entry falls due. Requests are
+    staggered, bounded by max_concurrency and by a calls-per-minute budget
+    (the free OpenWeatherMap plan allows 60). The blocking fetches go through
+    the shared WeatherService, so they reuse its connection pool and
+    coalesce with on-demand requests for the same city.
+    """
+
+    def __init__(self, service, cities, lead=FORECAST_TTL * 0.1, max_concurrency=4,
+                 calls_per_minute=50):
+        self.service = service
+        self.cities = list(cities)
+        # Refresh this long before expiry, capped at a tenth of the entry's TTL
+        self.lead = lead
+        self.max_concurrency = max_concurrency
+        self.calls_per_minute = calls_per_minute
+        self.last_sweep = None
+        self.failures = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        limiter = RateLimiter(self.calls_per_minute)
+        while not self._stop.is_set():
+            await self.sweep(limiter)
+            self.last_sweep = datetime.now()
+            # Sleep until the earliest entry falls due, waking up promptly on stop()
+            deadline = time.monotonic() + self.next_due()
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                await asyncio.sleep(min(deadline - time.monotonic(), 1.0))
+
+    def time_left(self, city):
+        """Seconds until a city is due for refresh (<= 0 when due now)"""
+        expiry = self.service.expiry(city)
+        if expiry is None:
+            return 0
+        left, ttl = expiry
+        return left - min(self.lead, ttl * 0.1)
+
+    def next_due(self):
+        """Seconds until the next city is due"""
+        # A city with no entry at all (its fetch raised) is retried like a failed fetch
+        waits = [ERROR_TTL if self.service.expiry(city) is None else self.time_left(city)
+                 for city in self.cities]
+        return max(min(waits, default=ERROR_TTL), 0.1)
+
+    async def sweep(self, limiter):
+        """Refresh every city whose cached forecast is missing or due to expire"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        due = [city for city in self.cities if self.time_left(city) <= 0]
+        # Spread the first requests out instead of bursting them all at once
+        spacing = 60.0 / self.calls_per_minute
+
+        async def refresh(position, city):
+            await asyncio.sleep(position * spacing)
+            if self._stop.is_set():
+                return
+            # A never-seen city also costs a geocode call
+            cost = 1 if self.service.is_geocoded(city) else 2
+            await limiter.acquire(cost if self.service.has_api_key else 0)
+            async with semaphore:
+                try:
+                    await asyncio.to_thread(self.service.refresh, city)
+                except Exception as e:
+                    self.failures += 1
+                    logger.warning("Background refresh of %s failed: %s", city, e)
+
+        await asyncio.gather(*(refresh(i, city) for i, city in enumerate(due)))